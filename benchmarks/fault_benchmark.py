@@ -0,0 +1,219 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from core.ai_interface import AIInterface
+from core.gemini_http_model import GeminiHttpModel
+from core.prompt_builder import PromptBuilder
+from core.response_cache import ResponseCache
+from core.retry_policy import RetryPolicy
+from core.timings import Timings
+from gemini_stub_server import StubConfig, start_server
+
+SAMPLE_DIFFS = [
+    {"file": "core/example.py", "diff": "@@ -1,1 +1,1 @@\n-old = 1\n+new = 2\n"},
+]
+
+# Four directories, each about a summary group's worth at a 200-token budget
+MAP_REDUCE_DIFFS = [
+    {"file": f"{directory}/module.py", "diff": "@@ -0,0 +1,40 @@\n" + "".join(f"+value_{line} = {line}\n" for line in range(40))}
+    for directory in ("api", "cli", "core", "services")
+]
+
+
+def percentile(values: List[float], share: float) -> float:
+    """
+    Nearest-rank percentile.
+
+    Args:
+        values: Sorted values.
+        share: Percentile as a fraction, e.g. 0.99.
+
+    Returns:
+        The percentile, or 0.0 for no values.
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(int(round(share * len(values))) - 1, 0))]
+
+
+def run(args: argparse.Namespace) -> Dict[str, object]:
+    """
+    Send requests through AIInterface to the stand-in server.
+
+    Args:
+        args: Parsed command-line arguments.
+
+    Returns:
+        Dict with success counts, retries and latency percentiles.
+    """
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        tail_ms=args.tail_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    server = start_server(config)
+    host, port = server.server_address[:2]
+    model = GeminiHttpModel('stub-key', 'stub-model', base_url=f"http://{host}:{port}", timeout=args.timeout)
+    timings = Timings()
+
+    def one_request(index: int) -> Dict[str, object]:
+        ai = AIInterface(
+            'stub-key',
+            'stub-model',
+            timeout=args.timeout,
+            model=model,
+            timings=timings,
+            retry_policy=RetryPolicy(
+                max_attempts=args.max_attempts,
+                base_delay=args.base_delay,
+                max_delay=args.max_delay,
+                rng=random.Random(args.seed + index)
+            )
+        )
+        started = time.perf_counter()
+        if args.stream:
+            message = ai.stream_commit_message(SAMPLE_DIFFS, lambda text: None)
+        else:
+            message = ai.generate_commit_message(SAMPLE_DIFFS)
+        return {"ms": (time.perf_counter() - started) * 1000, "ok": bool(message), "error": ai.last_error}
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(one_request, range(args.requests)))
+    finally:
+        server.shutdown()
+
+    latencies = sorted(result["ms"] for result in results)
+    errors: Dict[str, int] = {}
+    for result in results:
+        if not result["ok"]:
+            errors[result["error"]] = errors.get(result["error"], 0) + 1
+
+    return {
+        "requests": args.requests,
+        "succeeded": sum(1 for result in results if result["ok"]),
+        "server_requests": config.requests,
+        "injected_faults": config.faults,
+        "retries": sum(1 for event in timings.events if event["phase"] == "ai_retry"),
+        "errors": errors,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 1),
+            "p90": round(percentile(latencies, 0.90), 1),
+            "p99": round(percentile(latencies, 0.99), 1),
+            "max": round(latencies[-1], 1) if latencies else 0.0,
+            "mean": round(statistics.mean(latencies), 1) if latencies else 0.0,
+        },
+    }
+
+
+def check_map_reduce_cache(args: argparse.Namespace) -> Dict[str, int]:
+    """
+    Summarize a multi-group change twice and count the groups the second run found cached.
+
+    Uses a fault-free server: this checks caching, not retries.
+
+    Args:
+        args: Parsed command-line arguments.
+
+    Returns:
+        Dict with the number of groups and how many were cached on the repeat run.
+    """
+    config = StubConfig(latency_ms=args.latency_ms, seed=args.seed)
+    server = start_server(config)
+    host, port = server.server_address[:2]
+    model = GeminiHttpModel('stub-key', 'stub-model', base_url=f"http://{host}:{port}", timeout=args.timeout)
+    timings = Timings()
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for _ in range(2):
+                # A fresh interface and cache object each time, as in separate runs
+                ai = AIInterface(
+                    'stub-key',
+                    'stub-model',
+                    response_cache=ResponseCache(os.path.join(directory, 'responses.json')),
+                    prompt_builder=PromptBuilder(token_budget=200),
+                    timeout=args.timeout,
+                    model=model,
+                    timings=timings,
+                    map_reduce_threshold=0.5
+                )
+                ai.summarize_groups(MAP_REDUCE_DIFFS)
+    finally:
+        server.shutdown()
+
+    repeat = [event for event in timings.events if event["phase"] == "summarize_groups"][-1]
+    return {"groups": repeat["groups"], "cached": repeat["cached"]}
+
+
+def main() -> int:
+    """
+    Measure AI request tail latency under injected faults, without network access.
+
+    Args:
+        None
+
+    Returns:
+        Exit code (0 if every request succeeded and, with --map-reduce-cache,
+        every group summary was cached; 1 otherwise).
+    """
+    parser = argparse.ArgumentParser(description="Tail latency of AI requests against a faulty stand-in server")
+    parser.add_argument('--requests', type=int, default=50, help='Requests to send')
+    parser.add_argument('--concurrency', type=int, default=4, help='Requests in flight at once')
+    parser.add_argument('--stream', action='store_true', help='Use streaming requests')
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='Server minimum latency')
+    parser.add_argument('--tail-ms', type=float, default=30.0, help='Server mean extra latency')
+    parser.add_argument('--error-rate', type=float, default=0.1, help='Share of requests failing with 503')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.05, help='Share of requests failing with 429')
+    parser.add_argument('--retry-after', type=float, default=0.2, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--max-attempts', type=int, default=4, help='Client attempts per request')
+    parser.add_argument('--base-delay', type=float, default=0.1, help='Client backoff base delay in seconds')
+    parser.add_argument('--max-delay', type=float, default=5.0, help='Client longest wait in seconds')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Client per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for faults and jitter')
+    parser.add_argument('--map-reduce-cache', action='store_true', help='Also check that a repeated map-reduce run finds every group summary cached')
+    parser.add_argument('--output', metavar='FILE', help='Write results as JSON')
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.map_reduce_cache:
+        report["map_reduce_cache"] = check_map_reduce_cache(args)
+
+    latency = report["latency_ms"]
+    print(f"{report['succeeded']}/{report['requests']} succeeded; "
+          f"{report['injected_faults']} injected faults over {report['server_requests']} server requests, "
+          f"{report['retries']} retries")
+    print(f"latency ms: p50 {latency['p50']}, p90 {latency['p90']}, p99 {latency['p99']}, "
+          f"max {latency['max']}, mean {latency['mean']}")
+    for error, count in report["errors"].items():
+        print(f"✗ {count} × {error}")
+    map_cache = report.get("map_reduce_cache")
+    if map_cache is not None:
+        mark = "✓" if map_cache["cached"] == map_cache["groups"] else "✗"
+        print(f"{mark} map-reduce repeat run: {map_cache['cached']}/{map_cache['groups']} group summaries cached")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+    if map_cache is not None and map_cache["cached"] != map_cache["groups"]:
+        return 1
+    return 0 if report["succeeded"] == report["requests"] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
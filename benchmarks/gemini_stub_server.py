@@ -0,0 +1,246 @@
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from core.local_model import LocalModel
+
+
+class StubConfig:
+
+    def __init__(
+        self,
+        latency_ms: float = 300.0,
+        tail_ms: float = 200.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: Optional[float] = 1.0,
+        chunk_delay_ms: float = 20.0,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize StubConfig.
+
+        Args:
+            latency_ms: Minimum time before a response starts.
+            tail_ms: Mean of the exponentially distributed extra latency.
+            error_rate: Share of requests answered with 503.
+            rate_limit_rate: Share of requests answered with 429.
+            retry_after: Retry-After seconds sent with 429s, or None to omit it.
+            chunk_delay_ms: Delay between streamed chunks.
+            seed: Random seed, for repeatable fault sequences.
+        """
+        self.latency_ms = latency_ms
+        self.tail_ms = tail_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.chunk_delay_ms = chunk_delay_ms
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.faults = 0
+
+    def draw(self) -> Tuple[float, Optional[int]]:
+        """
+        Decide one request's latency and whether it fails.
+
+        Args:
+            None
+
+        Returns:
+            A tuple (latency_seconds, error_status or None).
+        """
+        with self.lock:
+            self.requests += 1
+            latency = (self.latency_ms + (self.rng.expovariate(1 / self.tail_ms) if self.tail_ms > 0 else 0)) / 1000
+            roll = self.rng.random()
+            status = None
+            if roll < self.rate_limit_rate:
+                status = 429
+            elif roll < self.rate_limit_rate + self.error_rate:
+                status = 503
+            if status is not None:
+                self.faults += 1
+        return latency, status
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    # Keep-alive, so clients can reuse connections as they would with the API
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self) -> None:
+        """
+        Answer generateContent and streamGenerateContent requests.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        config: StubConfig = self.server.config
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+
+        path = self.path.split('?', 1)[0]
+        if not path.startswith('/v1beta/models/') or ':' not in path:
+            self._send_json(404, {"error": {"code": 404, "message": "not found", "status": "NOT_FOUND"}})
+            return
+        method = path.rsplit(':', 1)[1]
+
+        latency, status = config.draw()
+        time.sleep(latency)
+
+        if status == 429:
+            headers = {'Retry-After': f"{config.retry_after:g}"} if config.retry_after is not None else {}
+            self._send_json(429, {"error": {"code": 429, "message": "Resource has been exhausted", "status": "RESOURCE_EXHAUSTED"}}, headers)
+            return
+        if status == 503:
+            self._send_json(503, {"error": {"code": 503, "message": "The model is overloaded", "status": "UNAVAILABLE"}})
+            return
+
+        try:
+            prompt = json.loads(body)['contents'][0]['parts'][0]['text']
+        except (ValueError, KeyError, IndexError, TypeError):
+            self._send_json(400, {"error": {"code": 400, "message": "invalid request", "status": "INVALID_ARGUMENT"}})
+            return
+        answer = LocalModel._answer(prompt)
+
+        if method == 'generateContent':
+            self._send_json(200, self._payload(answer))
+        elif method == 'streamGenerateContent':
+            self._send_stream(answer, config.chunk_delay_ms / 1000)
+        else:
+            self._send_json(404, {"error": {"code": 404, "message": f"unknown method {method}", "status": "NOT_FOUND"}})
+
+    def log_message(self, format: str, *args) -> None:
+        # Quiet: benchmarks send thousands of requests
+        pass
+
+    @staticmethod
+    def _payload(text: str) -> dict:
+        """
+        Build a generateContent response body.
+
+        Args:
+            text: Candidate text.
+
+        Returns:
+            The response payload.
+        """
+        return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]}
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None) -> None:
+        """
+        Send a JSON response on the kept-alive connection.
+
+        Args:
+            status: HTTP status code.
+            payload: Response body.
+            headers: Extra response headers.
+
+        Returns:
+            None
+        """
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, text: str, chunk_delay: float) -> None:
+        """
+        Send the answer as chunked server-sent events, like alt=sse.
+
+        Args:
+            text: The full answer.
+            chunk_delay: Seconds between events.
+
+        Returns:
+            None
+        """
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for start in range(0, len(text), 8):
+            if start:
+                time.sleep(chunk_delay)
+            event = f"data: {json.dumps(self._payload(text[start:start + 8]))}\r\n\r\n".encode('utf-8')
+            self.wfile.write(f"{len(event):x}\r\n".encode('ascii') + event + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def start_server(config: StubConfig, port: int = 0) -> ThreadingHTTPServer:
+    """
+    Start the stand-in API on a background thread.
+
+    Args:
+        config: Latency and fault settings.
+        port: Port to listen on (0 picks a free one).
+
+    Returns:
+        The running server; its address is server.server_address.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    server.daemon_threads = True
+    server.config = config
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> int:
+    """
+    Serve a stand-in for the Gemini generateContent API.
+
+    Args:
+        None
+
+    Returns:
+        Exit code.
+    """
+    parser = argparse.ArgumentParser(description="Local stand-in for the Gemini API with injected latency and faults")
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--latency-ms', type=float, default=300.0, help='Minimum response latency')
+    parser.add_argument('--tail-ms', type=float, default=200.0, help='Mean extra latency (exponential tail)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests failing with 503')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Share of requests failing with 429')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--seed', type=int, help='Random seed')
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        tail_ms=args.tail_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    server = start_server(config, args.port)
+    host, port = server.server_address[:2]
+    print(f"Serving on http://{host}:{port} (AI_BACKEND=http GEMINI_BASE_URL=http://{host}:{port})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(REPO_ROOT, 'main.py')
+
+# Modules the no-staged-changes path must never load
+FORBIDDEN_MODULES = ('google.generativeai', 'grpc', 'dotenv', 'multiprocessing')
+
+
+def time_runs(repo: str, runs: int) -> List[float]:
+    """
+    Time the no-staged-changes path end to end.
+
+    Args:
+        repo: Git repository with nothing staged.
+        runs: Number of runs.
+
+    Returns:
+        Wall time of each run in milliseconds.
+    """
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, MAIN], cwd=repo, capture_output=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def import_report(repo: str) -> List[Tuple[str, int, int]]:
+    """
+    Collect a -X importtime report for the no-staged-changes path.
+
+    Args:
+        repo: Git repository with nothing staged.
+
+    Returns:
+        List of (module, self_us, cumulative_us), slowest cumulative first.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', MAIN],
+        cwd=repo,
+        capture_output=True,
+        text=True
+    )
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line[len('import time:'):].split('|')]
+        modules.append((name, int(self_us), int(cumulative_us)))
+
+    return sorted(modules, key=lambda module: module[2], reverse=True)
+
+
+def main() -> int:
+    """
+    Benchmark CLI startup when nothing is staged.
+
+    Args:
+        None
+
+    Returns:
+        Exit code (0 within budget, 1 on a regression).
+    """
+    parser = argparse.ArgumentParser(description="Startup benchmark for the no-op path")
+    parser.add_argument('--runs', type=int, default=10, help='Number of timed runs')
+    parser.add_argument('--budget-ms', type=float, default=100.0, help='Maximum median wall time')
+    parser.add_argument('--top', type=int, default=15, help='Slowest imports to list')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as repo:
+        subprocess.run(['git', 'init', '-q', repo], check=True)
+
+        timings = time_runs(repo, args.runs)
+        modules = import_report(repo)
+
+    median = statistics.median(timings)
+    print(f"No-op path: median {median:.1f} ms, min {min(timings):.1f} ms, max {max(timings):.1f} ms ({args.runs} runs)")
+    print()
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    for name, self_us, cumulative_us in modules[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {name}")
+
+    failures = []
+    loaded = {name.strip() for name, _, _ in modules}
+    for forbidden in FORBIDDEN_MODULES:
+        if forbidden in loaded:
+            failures.append(f"{forbidden} is imported on the no-op path")
+    if median > args.budget_ms:
+        failures.append(f"median {median:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+
+    print()
+    for failure in failures:
+        print(f"✗ {failure}")
+    if not failures:
+        print("✓ Within budget")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
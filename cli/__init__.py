@@ -1,3 +1,14 @@
-from cli.commit_cli import CommitCLI
+from importlib import import_module
 
-__all__ = ['CommitCLI']
\ No newline at end of file
+# Resolved on first access, like core and services
+_EXPORTS = {
+    'CommitCLI': 'cli.commit_cli',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module 'cli' has no attribute {name!r}")
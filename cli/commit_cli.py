@@ -1,12 +1,24 @@
-from typing import Optional
-from services.commit_service import CommitService
+import time
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    # Annotation only: the daemon client runs this CLI without loading the service
+    from services.commit_service import CommitService
 
 
 class CommitCLI:
     
-    def __init__(self, commit_service: CommitService, should_push: bool = False):
+    def __init__(
+        self,
+        commit_service: 'CommitService',
+        should_push: bool = False,
+        stream: bool = False,
+        candidates: Optional[int] = None
+    ):
         self.commit_service = commit_service
         self.should_push = should_push
+        self.stream = stream
+        self.candidates = candidates
     
     def run(self) -> int:
         """
@@ -34,7 +46,7 @@ class CommitCLI:
             
             # Generate message
             print("🤖 Generating...")
-            success, message, errors = self.commit_service.generate_commit_message(file_diffs)
+            success, message, alternatives, errors = self._generate(file_diffs)
 
             if not success:
                 print("✗ Validation failed:")
@@ -47,13 +59,25 @@ class CommitCLI:
                 print("✗ No message generated")
                 return 1
 
-            # Display
-            print("\n" + "─" * 50)
-            print(message)
-            print("─" * 50 + "\n")
-
-            # Confirm
-            action = self._get_confirmation()
+            # Display and confirm, switching to an alternative or regenerating if asked
+            while True:
+                self._display(message, alternatives)
+                action = self._get_confirmation(len(alternatives))
+                if action.isdigit():
+                    index = int(action) - 1
+                    message, alternatives[index] = alternatives[index], message
+                elif action == 'regenerate':
+                    hint = input("Hint (optional, Enter to skip): ").strip() or None
+                    print("🤖 Regenerating...")
+                    success, regenerated, others, errors = self._generate(file_diffs, hint=hint, fresh=True)
+                    if success and regenerated:
+                        message, alternatives = regenerated, others
+                    else:
+                        print("✗ Regeneration failed:")
+                        for error in errors:
+                            print(error)
+                else:
+                    break
 
             if action == 'yes':
                 return self._execute_commit(message)
@@ -71,24 +95,104 @@ class CommitCLI:
             print(f"✗ Error: {e}")
             return 1
     
-    def _get_confirmation(self) -> str:
+    def _generate(self, file_diffs: list, hint: Optional[str] = None, fresh: bool = False) -> tuple:
+        """
+        Generate the message for the collected changes.
+
+        Regenerating reuses file_diffs as collected, so only the model is
+        asked again: no git reads, scans or prompt building.
+
+        Args:
+            file_diffs (list): List of file diffs.
+            hint (Optional[str]): Extra guidance for the model.
+            fresh (bool): Ask the model again instead of using a cached response.
+
+        Returns:
+            tuple: (is_successful, commit_message, alternatives, errors)
+        """
+        if self.stream:
+            return self._generate_streaming(file_diffs, hint, fresh)
+        return self.commit_service.generate_candidates(file_diffs, self.candidates, hint=hint, fresh=fresh)
+
+    def _generate_streaming(self, file_diffs: list, hint: Optional[str] = None, fresh: bool = False) -> tuple:
+        """
+        Generate the message, echoing text as it arrives.
+
+        Args:
+            file_diffs (list): List of file diffs.
+            hint (Optional[str]): Extra guidance for the model.
+            fresh (bool): Ask the model again instead of using a cached response.
+
+        Returns:
+            tuple: (is_successful, commit_message, alternatives, errors)
+        """
+        started = time.monotonic()
+        first_token = []
+
+        def on_text(text: str) -> None:
+            if not first_token:
+                first_token.append(time.monotonic() - started)
+            print(text, end="", flush=True)
+
+        try:
+            result = self.commit_service.generate_candidates(
+                file_diffs, self.candidates, on_text=on_text, hint=hint, fresh=fresh
+            )
+        finally:
+            if first_token:
+                print()
+
+        total = time.monotonic() - started
+        if first_token:
+            print(f"⏱ first token {first_token[0]:.2f}s, total {total:.2f}s")
+        return result
+
+    def _display(self, message: str, alternatives: List[str]) -> None:
+        """
+        Show the message and any numbered alternatives.
+
+        Args:
+            message (str): The commit message.
+            alternatives (List[str]): Other valid candidates.
+
+        Returns:
+            None
+        """
+        print("\n" + "─" * 50)
+        print(message)
+        print("─" * 50 + "\n")
+        if alternatives:
+            print("Alternatives:")
+            for number, alternative in enumerate(alternatives, 1):
+                print(f"  {number}. {alternative.splitlines()[0]}")
+            print()
+
+    def _get_confirmation(self, alternatives: int = 0) -> str:
         """
         Get user confirmation.
         
         Args:
-            None
+            alternatives (int): Number of alternatives that can be picked.
 
         Returns:
-            'yes', 'no', or 'edit'
+            'yes', 'no', 'edit', 'regenerate', or the number of an
+            alternative as a string
         """
+        prompt = "(y)es / (n)o / (e)dit / (r)egenerate"
+        if alternatives:
+            prompt += f" / (1-{alternatives}) use alternative" if alternatives > 1 else " / (1) use alternative"
         while True:
-            response = input("(y)es / (n)o / (e)dit: ").strip().lower()
+            response = input(f"{prompt}: ").strip().lower()
+            if response.isdigit() and 1 <= int(response) <= alternatives:
+                return response
             if response in ['y', 'yes']:
                 return 'yes'
             elif response in ['n', 'no']:
                 return 'no'
             elif response in ['e', 'edit']:
                 return 'edit'
+            elif response in ['r', 'regenerate']:
+                return 'regenerate'
     
     def _edit_message(self, original: str) -> Optional[str]:
         """
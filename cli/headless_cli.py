@@ -0,0 +1,141 @@
+import json
+import re
+import sys
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, TextIO
+from core.timings import Timings
+
+if TYPE_CHECKING:
+    from services.commit_service import CommitService
+
+
+class HeadlessCLI:
+
+    # Exit codes; 2 is left to argparse for usage errors
+    EXIT_OK = 0
+    EXIT_ERROR = 1
+    EXIT_BLOCKED = 3
+    EXIT_INVALID = 4
+    EXIT_AI_FAILURE = 5
+
+    EXIT_CODES = {
+        'ok': EXIT_OK,
+        'no_changes': EXIT_ERROR,
+        'error': EXIT_ERROR,
+        'blocked': EXIT_BLOCKED,
+        'invalid': EXIT_INVALID,
+        'ai_failure': EXIT_AI_FAILURE,
+    }
+
+    # One finding line of a security error: "Type: match (file:line)"
+    FINDING_LINE = re.compile(r'^\s*(?P<type>[^:\n]+): (?P<match>.*?)(?: \((?P<location>[^()]+)\))?$')
+
+    def __init__(
+        self,
+        commit_service: Optional['CommitService'],
+        timings: Timings,
+        candidates: Optional[int] = None,
+        output: TextIO = sys.stdout
+    ):
+        """
+        Initialize HeadlessCLI.
+
+        Args:
+            commit_service: The service, or None if configuration failed.
+            timings: Recorder whose trace is included in the output.
+            candidates: Messages to generate per request; the configured
+                number if None.
+            output: Where the JSON result is written.
+        """
+        self.commit_service = commit_service
+        self.timings = timings
+        self.candidates = candidates
+        self.output = output
+
+    def run(self, diff: Optional[str] = None) -> int:
+        """
+        Generate a message without prompting and write the result as JSON.
+
+        Args:
+            diff: Unified diff to use instead of the staged changes.
+
+        Returns:
+            Exit code: EXIT_OK, EXIT_BLOCKED (a secret was found),
+            EXIT_INVALID (no message passed validation), EXIT_AI_FAILURE
+            (the model gave no message) or EXIT_ERROR.
+        """
+        result: Dict[str, Any] = {
+            "status": "error", "message": None, "alternatives": [], "files": [], "findings": [], "errors": [],
+        }
+        try:
+            result.update(self._generate(diff))
+        except Exception as e:
+            result["errors"] = [str(e) or type(e).__name__]
+        return self.emit(result)
+
+    def emit(self, result: Dict[str, Any]) -> int:
+        """
+        Write a result as one JSON object, with the run's timings.
+
+        Args:
+            result: Result fields; 'status' decides the exit code.
+
+        Returns:
+            The exit code for the result's status.
+        """
+        result["ok"] = result["status"] == 'ok'
+        result["timings"] = self.timings.to_dict()
+        self.output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self.output.flush()
+        return self.EXIT_CODES.get(result["status"], self.EXIT_ERROR)
+
+    def _generate(self, diff: Optional[str]) -> Dict[str, Any]:
+        """
+        Collect, scan and generate.
+
+        Args:
+            diff: Unified diff to use instead of the staged changes.
+
+        Returns:
+            The result fields.
+        """
+        service = self.commit_service
+        if service is None:
+            return {"status": "error", "errors": ["Configuration incomplete (see stderr)"]}
+
+        if diff is None:
+            ok, file_diffs, errors = service.collect_changes()
+        else:
+            ok, file_diffs, errors = service.collect_from_diff(diff)
+        if not ok:
+            if service.blocked:
+                return {"status": "blocked", "findings": self.parse_findings(errors), "errors": errors}
+            return {"status": "error", "errors": errors}
+
+        ok, message, alternatives, errors = service.generate_candidates(file_diffs, self.candidates)
+        fields = {"files": [item["file"] for item in file_diffs], "message": message, "alternatives": alternatives, "errors": errors}
+        if ok and message:
+            fields["status"] = "ok"
+        else:
+            # A rejected message is returned with its errors; no message means the model failed
+            fields["status"] = "invalid" if message else "ai_failure"
+        return fields
+
+    @classmethod
+    def parse_findings(cls, errors: List[str]) -> List[Dict[str, Optional[str]]]:
+        """
+        Split security errors into individual findings.
+
+        Args:
+            errors: Errors from the validation chain.
+
+        Returns:
+            List of dicts with 'type', 'match' and 'location' (None when
+            the validator reported none).
+        """
+        findings = []
+        for error in errors:
+            for line in error.split('\n')[1:]:
+                match = cls.FINDING_LINE.match(line)
+                if match:
+                    findings.append(match.groupdict())
+        return findings
@@ -3,9 +3,42 @@ from config.settings import *
 __all__ = [
     'GEMINI_API_KEY',
     'GEMINI_MODEL',
+    'AI_BACKEND',
+    'AI_TIMEOUT',
+    'GEMINI_BASE_URL',
+    'AI_MAX_ATTEMPTS',
+    'AI_RETRY_BASE_DELAY',
+    'AI_RETRY_MAX_DELAY',
+    'CANDIDATES',
+    'REPAIR_ATTEMPTS',
+    'PROMPT_TOKEN_BUDGET',
+    'MAP_REDUCE_THRESHOLD',
+    'MAP_REDUCE_CONCURRENCY',
+    'BATCH_JOBS',
+    'BATCH_MAX_REQUESTS',
+    'BATCH_REQUESTS_PER_MINUTE',
+    'GEMINI_FAST_MODEL',
+    'ROUTE_FAST_MAX_TOKENS',
+    'ROUTE_FAST_MAX_FILES',
+    'ROUTE_LATENCY_BUDGET',
     'MAX_SUBJECT_LENGTH',
     'CHECK_API_KEYS',
     'CHECK_SENSITIVE_DATA',
+    'CHECK_ENTROPY',
+    'SCAN_ADDED_LINES_ONLY',
+    'ENTROPY_MIN_LENGTH',
+    'ENTROPY_HEX_THRESHOLD',
+    'ENTROPY_BASE64_THRESHOLD',
+    'SCAN_WORKERS',
+    'PARALLEL_SCAN_THRESHOLD',
+    'SCAN_CACHE',
+    'SCAN_CACHE_PATH',
+    'SCAN_CACHE_MAX_ENTRIES',
+    'RESPONSE_CACHE',
+    'RESPONSE_CACHE_PATH',
+    'RESPONSE_CACHE_TTL',
+    'RESPONSE_CACHE_MAX_ENTRIES',
+    'DAEMON_IDLE_TIMEOUT',
     'ENFORCE_CONVENTIONAL_COMMITS',
     'ENFORCE_LENGTH_LIMIT'
 ]
\ No newline at end of file
@@ -7,12 +7,78 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-pro')
 
+# AI backend: 'gemini' (SDK), 'http' (REST API, no SDK), or 'local' for the
+# offline stand-in model; GEMINI_BASE_URL can point 'http' at a stand-in server
+AI_BACKEND = os.getenv('AI_BACKEND', 'gemini').lower()
+AI_TIMEOUT = float(os.getenv('AI_TIMEOUT', '60'))
+GEMINI_BASE_URL = os.getenv('GEMINI_BASE_URL', 'https://generativelanguage.googleapis.com')
+
+# Retries of rate-limited or failed AI requests (jittered exponential backoff)
+AI_MAX_ATTEMPTS = int(os.getenv('AI_MAX_ATTEMPTS', '4'))
+AI_RETRY_BASE_DELAY = float(os.getenv('AI_RETRY_BASE_DELAY', '0.5'))
+AI_RETRY_MAX_DELAY = float(os.getenv('AI_RETRY_MAX_DELAY', '30'))
+
+# Commit messages generated per request; the best valid one is offered first
+CANDIDATES = int(os.getenv('CANDIDATES', '1'))
+
+# Follow-up requests fixing a message that failed validation (0 disables)
+REPAIR_ATTEMPTS = int(os.getenv('REPAIR_ATTEMPTS', '2'))
+
+# Prompt Settings (approximate tokens per request)
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '8000'))
+
+# Diffs over this many prompt budgets are summarized per directory group in
+# concurrent requests before the final one (0 disables)
+MAP_REDUCE_THRESHOLD = float(os.getenv('MAP_REDUCE_THRESHOLD', '2'))
+MAP_REDUCE_CONCURRENCY = int(os.getenv('MAP_REDUCE_CONCURRENCY', '8'))
+
+# Batch Mode (repositories at once; model requests in flight and per minute
+# across all of them, 0 for no rate limit)
+BATCH_JOBS = int(os.getenv('BATCH_JOBS', '8'))
+BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', '4'))
+BATCH_REQUESTS_PER_MINUTE = float(os.getenv('BATCH_REQUESTS_PER_MINUTE', '0'))
+
+# Model Routing: changes of at most ROUTE_FAST_MAX_TOKENS estimated prompt
+# tokens and ROUTE_FAST_MAX_FILES files go to GEMINI_FAST_MODEL, the rest to
+# GEMINI_MODEL, which gets one attempt within ROUTE_LATENCY_BUDGET seconds
+# before the fast model takes over (no fast model disables routing; a budget
+# of 0 keeps the usual timeout and retries)
+GEMINI_FAST_MODEL = os.getenv('GEMINI_FAST_MODEL', '')
+ROUTE_FAST_MAX_TOKENS = int(os.getenv('ROUTE_FAST_MAX_TOKENS', '1500'))
+ROUTE_FAST_MAX_FILES = int(os.getenv('ROUTE_FAST_MAX_FILES', '3'))
+ROUTE_LATENCY_BUDGET = float(os.getenv('ROUTE_LATENCY_BUDGET', '20'))
+
 # Validation Settings
 MAX_SUBJECT_LENGTH = int(os.getenv('MAX_SUBJECT_LENGTH', '100'))
 
 # Security Settings
 CHECK_API_KEYS = os.getenv('CHECK_API_KEYS', 'true').lower() == 'true'
 CHECK_SENSITIVE_DATA = os.getenv('CHECK_SENSITIVE_DATA', 'true').lower() == 'true'
+CHECK_ENTROPY = os.getenv('CHECK_ENTROPY', 'true').lower() == 'true'
+SCAN_ADDED_LINES_ONLY = os.getenv('SCAN_ADDED_LINES_ONLY', 'true').lower() == 'true'
+
+# Entropy Check Settings (bits per character above which a token is a likely secret)
+ENTROPY_MIN_LENGTH = int(os.getenv('ENTROPY_MIN_LENGTH', '20'))
+ENTROPY_HEX_THRESHOLD = float(os.getenv('ENTROPY_HEX_THRESHOLD', '3.0'))
+ENTROPY_BASE64_THRESHOLD = float(os.getenv('ENTROPY_BASE64_THRESHOLD', '4.5'))
+
+# Scan Performance Settings (SCAN_WORKERS=0 uses one worker per CPU)
+SCAN_WORKERS = int(os.getenv('SCAN_WORKERS', '0'))
+PARALLEL_SCAN_THRESHOLD = int(os.getenv('PARALLEL_SCAN_THRESHOLD', '1000000'))
+
+# Scan Cache Settings
+SCAN_CACHE = os.getenv('SCAN_CACHE', 'true').lower() == 'true'
+SCAN_CACHE_PATH = os.path.expanduser(os.getenv('SCAN_CACHE_PATH', '~/.cache/lazzycommit/scan-cache.json'))
+SCAN_CACHE_MAX_ENTRIES = int(os.getenv('SCAN_CACHE_MAX_ENTRIES', '10000'))
+
+# Response Cache Settings
+RESPONSE_CACHE = os.getenv('RESPONSE_CACHE', 'true').lower() == 'true'
+RESPONSE_CACHE_PATH = os.path.expanduser(os.getenv('RESPONSE_CACHE_PATH', '~/.cache/lazzycommit/response-cache.json'))
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '86400'))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '500'))
+
+# Daemon Settings (seconds without a client before the daemon exits)
+DAEMON_IDLE_TIMEOUT = float(os.getenv('DAEMON_IDLE_TIMEOUT', '900'))
 
 # Format Settings
 ENFORCE_CONVENTIONAL_COMMITS = os.getenv('ENFORCE_CONVENTIONAL_COMMITS', 'true').lower() == 'true'
@@ -1,4 +1,29 @@
-from core.git_interface import GitInterface
-from core.ai_interface import AIInterface
+from importlib import import_module
 
-__all__ = ['GitInterface', 'AIInterface']
\ No newline at end of file
+# Exports resolve on first access, so importing one core module (as the CLI's
+# fast path does with core.git_interface) does not load the others.
+_EXPORTS = {
+    'GitInterface': 'core.git_interface',
+    'AIInterface': 'core.ai_interface',
+    'DiffParser': 'core.diff_parser',
+    'FileTriage': 'core.file_triage',
+    'JsonCache': 'core.json_cache',
+    'AIProvider': 'core.ai_provider',
+    'GeminiHttpModel': 'core.gemini_http_model',
+    'GeminiSDKModel': 'core.gemini_sdk_model',
+    'LocalModel': 'core.local_model',
+    'ModelRouter': 'core.model_router',
+    'PromptBuilder': 'core.prompt_builder',
+    'RateLimitedModel': 'core.rate_limited_model',
+    'ResponseCache': 'core.response_cache',
+    'RetryPolicy': 'core.retry_policy',
+    'Timings': 'core.timings',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module 'core' has no attribute {name!r}")
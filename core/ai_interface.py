@@ -1,9 +1,20 @@
-import google.generativeai as genai
-from typing import Optional, List, Dict
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Any, Callable, Optional, List, Dict, Tuple
+from core.ai_provider import AIProvider, TransientAIError
+from core.prompt_builder import PromptBuilder
+from core.response_cache import ResponseCache
+from core.retry_policy import RetryPolicy
+from core.timings import Timings, timed
 
 
 class AIInterface:
 
+    # Bump whenever GENERATION_PROMPT or its formatting changes
+    PROMPT_VERSION = 2
+
     # Prompt template for commit message generation 
     GENERATION_PROMPT = """
         Analyze the following git changes and generate ONE professional commit message following the Conventional Commits format.
@@ -27,46 +38,613 @@ class AIInterface:
         Example: feat: add JWT authentication system
         """
     
-    def __init__(self, api_key: str, model_name: str):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(model_name)
+    # Variant of GENERATION_PROMPT asking for {count} alternatives at once
+    CANDIDATES_PROMPT = """
+        Analyze the following git changes and generate {count} DIFFERENT professional commit messages following the Conventional Commits format.
+
+        Conventional Commits format: <type>: <description>
+
+        Types: feat, fix, docs, style, refactor, test, build, ci, modify
+        Description: imperative mood, lowercase, no period at end
+
+        IMPORTANT: Keep each message to one line under 72 characters.
+
+        Vary the type or wording between alternatives, most likely first.
+
+        Files changed:
+        {files_summary}
+
+        Git diffs:
+        {diffs}
+
+        Provide ONLY a numbered list, one message per line, nothing else. No explanation, no markdown, no quotes.
+        Example:
+        1. feat: add JWT authentication system
+        2. feat(auth): support token-based login
+        """
+
+    # Follow-up for a rejected message; carries no diffs, so it stays small
+    REPAIR_PROMPT = """
+        The commit message below was rejected by the repository's commit checks.
+
+        Rejected message:
+        {message}
+
+        Problems:
+        {errors}
+
+        Rewrite it to fix every problem while keeping its meaning.
+        Conventional Commits format: <type>: <description>
+        Types: feat, fix, docs, style, refactor, test, build, ci, modify
+        Description: imperative mood, lowercase, no period at end, first line under 72 characters.
+
+        Provide ONLY the corrected commit message, nothing else. No explanation, no markdown, no quotes.
+        """
+
+    # Appended to a generation prompt when the user asks for another take
+    HINT_SUFFIX = """
+        Guidance from the author for this message (follow it): {hint}
+        """
+
+    # Map step for commits too large for one prompt: summarizes one group of
+    # files; the summaries then stand in for the diffs in the final prompt
+    SUMMARY_PROMPT = """
+        The following git changes are one part of a larger commit. Summarize what they change in one or two sentences, most significant change first.
+
+        Name concrete features, fixes or refactorings rather than file names.
+
+        Files changed:
+        {files_summary}
+
+        Git diffs:
+        {diffs}
+
+        Provide ONLY the summary, nothing else. No markdown.
+        """
+
+    # Takes the place of the diffs in a prompt built from group summaries
+    SUMMARIES_HEADER = "The diffs are too large to include; each group of files was summarized from its diffs instead.\n\n"
+
+    # One entry of a numbered candidate list: "1. msg" or "1) msg"
+    CANDIDATE_LINE = re.compile(r'^\s*\d+[.)]\s+(.+)$')
+    
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str,
+        response_cache: Optional[ResponseCache] = None,
+        prompt_builder: Optional[PromptBuilder] = None,
+        timeout: Optional[float] = None,
+        model: Optional[AIProvider] = None,
+        timings: Optional[Timings] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        map_reduce_threshold: float = 0.0,
+        map_concurrency: int = 8
+    ):
+        if model is None:
+            from core.gemini_sdk_model import GeminiSDKModel
+            model = GeminiSDKModel(api_key, model_name)
+        self.model = model
         self.model_name = model_name
+        self.timeout = timeout
+        self.response_cache = response_cache
+        self.prompt_builder = prompt_builder or PromptBuilder()
+        self.timings = timings
+        self.retry_policy = retry_policy
+        # Why the last generation returned None, for the caller to report
+        self.last_error: Optional[str] = None
+        # (file_diffs, template, prompt) of the last build, reused when regenerating
+        self._built: Optional[Tuple[List[Dict[str, str]], str, str]] = None
+        # Diffs larger than this many prompt budgets are summarized by group
+        # first (0 disables), with up to map_concurrency requests at once
+        self.map_reduce_threshold = map_reduce_threshold
+        self.map_concurrency = max(map_concurrency, 1)
+        # (file_diffs, summaries) of the last map step, reused when regenerating
+        self._summarized: Optional[Tuple[List[Dict[str, str]], List[Tuple[str, List[Dict[str, str]], str]]]] = None
+        # (cache key, message, came from the cache) of the last response,
+        # until settle_response() knows whether it passed validation
+        self._response: Optional[Tuple[str, str, bool]] = None
+
+    def build_prompt(
+        self,
+        file_diffs: List[Dict[str, str]],
+        template: Optional[str] = None,
+        hint: Optional[str] = None
+    ) -> str:
+        """
+        Build the generation prompt from file diffs.
+
+        The prompt for the same file_diffs list and template is built once,
+        so regenerating a message only costs the model call. Diffs far over
+        the prompt budget are first summarized by group (see
+        summarize_groups) and the prompt is built from the summaries.
+
+        Args:
+            file_diffs: List of dicts with 'file' and 'diff' keys.
+            template: Prompt template; GENERATION_PROMPT by default.
+            hint: Extra guidance from the user, appended to the prompt.
+
+        Returns:
+            The prompt text.
+        """
+        template = template or self.GENERATION_PROMPT
+        summaries = self.summarize_groups(file_diffs)
+        with timed(self.timings, "build_prompt", files=len(file_diffs)) as fields:
+            built = self._built
+            if built is not None and built[0] is file_diffs and built[1] == template:
+                prompt = built[2]
+                fields["reused"] = True
+            elif summaries is not None:
+                prompt = self._reduce_prompt(template, summaries)
+                fields["groups"] = len(summaries)
+                self._built = (file_diffs, template, prompt)
+            else:
+                prompt = self.prompt_builder.build(template, file_diffs)
+                self._built = (file_diffs, template, prompt)
+            if hint and hint.strip():
+                prompt += self.HINT_SUFFIX.replace('{hint}', hint.strip())
+            fields.update(chars=len(prompt), tokens=PromptBuilder.estimate_tokens(prompt))
+        return prompt
     
-    def generate_commit_message(self, file_diffs: List[Dict[str, str]]) -> Optional[str]:
+    def summarize_groups(self, file_diffs: List[Dict[str, str]]) -> Optional[List[Tuple[str, List[Dict[str, str]], str]]]:
+        """
+        Summarize a commit too large for one prompt, one group of files at a time.
+
+        Files are grouped by directory (PromptBuilder.group) into at most
+        map_concurrency groups, and all groups are summarized concurrently,
+        so the map step takes about one model round trip however many files
+        there are. Summaries are cached as they arrive, since unlike commit
+        messages there is nothing to validate, and kept for regenerating.
+
+        Args:
+            file_diffs: List of dicts with 'file' and 'diff' keys.
+
+        Returns:
+            (label, files, summary) of each group, or None when the diffs fit
+            the prompt well enough (or map-reduce is off).
+
+        Raises:
+            RuntimeError: If a group could not be summarized.
+        """
+        summarized = self._summarized
+        if summarized is not None and summarized[0] is file_diffs:
+            return summarized[1]
+
+        budget = self.prompt_builder.token_budget * PromptBuilder.CHARS_PER_TOKEN
+        if self.map_reduce_threshold <= 0 or self.prompt_builder.diff_chars(file_diffs) <= budget * self.map_reduce_threshold:
+            return None
+        groups = self.prompt_builder.group(file_diffs, self.map_concurrency)
+        if len(groups) < 2:
+            return None
+
+        with timed(self.timings, "summarize_groups", files=len(file_diffs), groups=len(groups)) as fields:
+            prompts = [self.prompt_builder.build(self.SUMMARY_PROMPT, files) for _, files in groups]
+            fields.update(chars=sum(len(prompt) for prompt in prompts))
+
+            # The cache is read and written on this thread only
+            keys = [self._cache_key(prompt) for prompt in prompts]
+            texts = [self.response_cache.get(key) if key is not None else None for key in keys]
+            missing = [index for index, text in enumerate(texts) if not text]
+            fields["cached"] = len(groups) - len(missing)
+
+            if missing:
+                pool = ThreadPoolExecutor(max_workers=min(self.map_concurrency, len(missing)))
+                futures = [(index, pool.submit(self._ask, prompts[index], group=groups[index][0])) for index in missing]
+                try:
+                    for index, future in futures:
+                        label = groups[index][0]
+                        try:
+                            text = future.result()
+                        except Exception as e:
+                            raise RuntimeError(f"Failed to summarize {label}: {str(e) or type(e).__name__}")
+                        if not text.strip():
+                            raise RuntimeError(f"Failed to summarize {label}: empty response")
+                        # Summaries are not commit messages, so there is nothing to validate
+                        texts[index] = self._clean(text)
+                        if keys[index] is not None:
+                            self.response_cache.put(keys[index], texts[index])
+                finally:
+                    for _, future in futures:
+                        future.cancel()
+                    pool.shutdown(wait=False)
+
+        summaries = [(label, files, text) for (label, files), text in zip(groups, texts)]
+        self._summarized = (file_diffs, summaries)
+        return summaries
+
+    def generate_commit_message(
+        self,
+        file_diffs: List[Dict[str, str]],
+        hint: Optional[str] = None,
+        fresh: bool = False
+    ) -> Optional[str]:
         """
         Generate commit message from file diffs.
 
         Args:
             file_diffs: List of dicts with 'file' and 'diff' keys.
+            hint: Extra guidance from the user.
+            fresh: Ask the model even if a cached response exists.
 
         Returns:
             Generated commit message or None if failed.
         
         """
+        return self._complete(lambda: self.build_prompt(file_diffs, hint=hint), fresh=fresh)
+
+    def stream_commit_message(
+        self,
+        file_diffs: List[Dict[str, str]],
+        on_text: Callable[[str], None],
+        hint: Optional[str] = None,
+        fresh: bool = False
+    ) -> Optional[str]:
+        """
+        Generate commit message from file diffs, reporting text as it arrives.
+
+        Args:
+            file_diffs: List of dicts with 'file' and 'diff' keys.
+            on_text: Called with each chunk of response text.
+            hint: Extra guidance from the user.
+            fresh: Ask the model even if a cached response exists.
+
+        Returns:
+            Generated commit message or None if failed.
+        """
+        return self._complete(lambda: self.build_prompt(file_diffs, hint=hint), on_text, fresh=fresh)
+
+    def generate_candidates(
+        self,
+        file_diffs: List[Dict[str, str]],
+        count: int,
+        on_text: Optional[Callable[[str], None]] = None,
+        hint: Optional[str] = None,
+        fresh: bool = False
+    ) -> List[str]:
+        """
+        Generate several alternative commit messages in one request.
+
+        Args:
+            file_diffs: List of dicts with 'file' and 'diff' keys.
+            count: Number of alternatives to ask for.
+            on_text: If given, the response is streamed to it as it arrives.
+            hint: Extra guidance from the user.
+            fresh: Ask the model even if a cached response exists.
+
+        Returns:
+            The candidate messages in the model's order; empty if failed.
+        """
+        template = self.CANDIDATES_PROMPT.replace('{count}', str(count))
+        text = self._complete(lambda: self.build_prompt(file_diffs, template, hint), on_text, fresh=fresh)
+        if text is None:
+            return []
+
+        candidates = self.parse_candidates(text)[:count]
+        if not candidates:
+            self.last_error = "no candidates in response"
+        return candidates
+
+    def repair_commit_message(self, message: str, errors: List[str]) -> Optional[str]:
+        """
+        Ask for a corrected version of a message that failed validation.
+
+        Only the rejected message and the validator errors are sent, not the
+        diffs: fixing the format or length does not need them, and the
+        request is a fraction of the size of the generation prompt.
+
+        Args:
+            message: The rejected commit message.
+            errors: Why the validators rejected it.
+
+        Returns:
+            The corrected message, or None if failed (see last_error).
+        """
+        def make_prompt() -> str:
+            with timed(self.timings, "build_prompt", repair=True) as fields:
+                prompt = (self.REPAIR_PROMPT
+                          .replace('{errors}', "\n".join(f"- {error}" for error in errors))
+                          .replace('{message}', message))
+                fields.update(chars=len(prompt), tokens=PromptBuilder.estimate_tokens(prompt))
+            return prompt
+
+        return self._complete(make_prompt)
+
+    def settle_response(self, is_valid: bool) -> None:
+        """
+        Cache the last response once it passed validation, or drop it from the cache if not.
+
+        Responses are not cached as they arrive: a message the validators
+        reject would otherwise be served again for the whole TTL, each
+        time paying for a repair.
+
+        Args:
+            is_valid: Whether the validation chain accepted the message (for
+                candidates, any of them).
+
+        Returns:
+            None
+        """
+        if self._response is None:
+            return
+        cache_key, message, cached = self._response
+        self._response = None
+        if is_valid and not cached:
+            self.response_cache.put(cache_key, message)
+        elif not is_valid and cached:
+            self.response_cache.discard(cache_key)
+
+    @classmethod
+    def parse_candidates(cls, text: str) -> List[str]:
+        """
+        Split a numbered list of commit messages.
+
+        Args:
+            text: Model response in CANDIDATES_PROMPT's format.
+
+        Returns:
+            The messages, cleaned like single responses.
+        """
+        candidates = []
+        for line in text.split('\n'):
+            match = cls.CANDIDATE_LINE.match(line)
+            if match:
+                message = match.group(1).strip().strip('`').strip('"').strip("'").strip()
+                if message and message not in candidates:
+                    candidates.append(message)
+        return candidates
+
+    @staticmethod
+    def _reduce_prompt(template: str, summaries: List[Tuple[str, List[Dict[str, str]], str]]) -> str:
+        """
+        Fill a prompt template with group summaries in place of diffs.
+
+        Args:
+            template: Prompt with {files_summary} and {diffs} placeholders.
+            summaries: (label, files, summary) of each group.
+
+        Returns:
+            The prompt text.
+        """
+        summary_lines = []
+        sections = []
+        for label, files, summary in summaries:
+            added = sum(item.get('added') or 0 for item in files)
+            removed = sum(item.get('removed') or 0 for item in files)
+            summary_lines.append(f"- {label} ({len(files)} files, +{added} -{removed})")
+            sections.append(f"=== {label} ===\n{summary}")
+
+        return template.format(
+            files_summary="\n".join(summary_lines),
+            diffs=AIInterface.SUMMARIES_HEADER + "\n\n".join(sections)
+        )
+
+    def _complete(
+        self,
+        make_prompt: Callable[[], str],
+        on_text: Optional[Callable[[str], None]] = None,
+        fresh: bool = False
+    ) -> Optional[str]:
+        """
+        Build a prompt and get the model's answer, from the cache if possible.
+
+        Args:
+            make_prompt: Builds the prompt; errors it raises are reported
+                like request errors.
+            on_text: If given, the response is streamed to it as it arrives.
+            fresh: Skip the cached response (a new one still replaces it).
+
+        Returns:
+            The cleaned response text, or None if failed (see last_error).
+        """
+        self.last_error = None
+        self._response = None
         try:
-            files_summary = "\n".join([f"- {item['file']}" for item in file_diffs])
-            diffs_text = "\n\n".join([
-                f"=== {item['file']} ===\n{item['diff']}" 
-                for item in file_diffs
-            ])
-            
-            # Truncate if too long
-            if len(diffs_text) > 30000:
-                diffs_text = diffs_text[:30000] + "\n\n... (truncated)"
-            
-            prompt = self.GENERATION_PROMPT.format(
-                files_summary=files_summary,
-                diffs=diffs_text
-            )
-            
-            response = self.model.generate_content(prompt)
-            
-            if response and hasattr(response, 'text') and response.text:
-                message = response.text.strip()
-                message = message.strip('`').strip('"').strip("'")
-                return message
-            
+            prompt = make_prompt()
+
+            cache_key = self._cache_key(prompt)
+            if cache_key is not None and not fresh:
+                cached = self.response_cache.get(cache_key)
+                if cached:
+                    self._response = (cache_key, cached, True)
+                    self._record_cache_hit(cached)
+                    if on_text is not None:
+                        on_text(cached)
+                    return cached
+
+            text = self._ask(prompt, on_text)
+            if text and text.strip():
+                return self._finish(text, cache_key)
+            self.last_error = "empty response"
             return None
+        except KeyboardInterrupt:
+            raise
         except Exception as e:
-            print(f"AI error: {e}")
-            return None
\ No newline at end of file
+            self.last_error = str(e) or type(e).__name__
+            return None
+
+    def _ask(self, prompt: str, on_text: Optional[Callable[[str], None]] = None, **details: Any) -> str:
+        """
+        Send a prompt to the model, with retries, and return the raw answer.
+
+        Safe to call from several threads at once.
+
+        Args:
+            prompt: The prompt text.
+            on_text: If given, the response is streamed to it as it arrives.
+            **details: Extra values recorded with the request's timing.
+
+        Returns:
+            The response text, possibly empty.
+        """
+        stream = None
+        try:
+            if on_text is None:
+                with timed(self.timings, "ai_request", model=self.model_name, stream=False, **details) as fields:
+                    response = self._with_retries(
+                        lambda: self.model.generate_content(prompt, request_options=self._request_options())
+                    )
+                    text = getattr(response, 'text', '') if response else ''
+                    fields.update(chars=len(text or ''))
+                return text or ''
+
+            started = time.monotonic()
+            chunks = []
+            with timed(self.timings, "ai_request", model=self.model_name, stream=True, **details) as fields:
+                first, stream = self._with_retries(lambda: self._open_stream(prompt))
+
+                for chunk in chain([first], stream) if first is not None else stream:
+                    text = getattr(chunk, 'text', '')
+                    if text:
+                        if not chunks:
+                            fields["first_token_ms"] = round((time.monotonic() - started) * 1000, 3)
+                        chunks.append(text)
+                        on_text(text)
+                    if self.timeout is not None and time.monotonic() - started > self.timeout:
+                        raise TimeoutError(f"no complete response after {self.timeout}s")
+                fields["chars"] = sum(len(chunk) for chunk in chunks)
+            return ''.join(chunks)
+        except BaseException:
+            self._abort(stream)
+            raise
+
+    def _open_stream(self, prompt: str) -> Tuple[Any, Any]:
+        """
+        Start a streaming request and wait for its first chunk.
+
+        A stream that fails before producing anything can be retried like
+        any other request; once text has been shown it cannot.
+
+        Args:
+            prompt: The generation prompt.
+
+        Returns:
+            A tuple (first_chunk, stream); first_chunk is None for an empty stream.
+        """
+        response = self.model.generate_content(prompt, stream=True, request_options=self._request_options())
+        stream = iter(response)
+        try:
+            return next(stream, None), stream
+        except BaseException:
+            self._abort(stream)
+            raise
+
+    def _with_retries(self, request: Callable[[], Any]) -> Any:
+        """
+        Make a request, retrying transient failures per the retry policy.
+
+        Args:
+            request: The request to make.
+
+        Returns:
+            The request's result.
+        """
+        if self.retry_policy is None:
+            return request()
+        return self.retry_policy.call(request, on_retry=self._record_retry)
+
+    def _record_retry(self, attempt: int, error: TransientAIError, delay: float) -> None:
+        """
+        Record a failed attempt that is about to be retried.
+
+        Args:
+            attempt: Number of the attempt that failed.
+            error: Why it failed.
+            delay: Seconds until the next attempt.
+
+        Returns:
+            None
+        """
+        if self.timings is not None:
+            self.timings.add(
+                "ai_retry", 0.0,
+                model=self.model_name, attempt=attempt, status=error.status, delay_ms=round(delay * 1000, 3)
+            )
+
+    def _record_cache_hit(self, message: str) -> None:
+        """
+        Record a response served from the cache instead of the model.
+
+        Args:
+            message: The cached commit message.
+
+        Returns:
+            None
+        """
+        if self.timings is not None:
+            self.timings.add("ai_request", 0.0, model=self.model_name, cached=True, chars=len(message))
+
+    def _request_options(self) -> Dict[str, float]:
+        """
+        Build per-request options for generate_content.
+
+        Args:
+            None
+
+        Returns:
+            Request options, with the timeout if one is set.
+        """
+        return {"timeout": self.timeout} if self.timeout is not None else {}
+
+    def _cache_key(self, prompt: str) -> Optional[str]:
+        """
+        Derive the response cache key for a prompt.
+
+        Args:
+            prompt: The generation prompt.
+
+        Returns:
+            The cache key, or None when caching is off.
+        """
+        if self.response_cache is None:
+            return None
+        return ResponseCache.make_key(self.model_name, self.PROMPT_VERSION, prompt)
+
+    def _finish(self, text: str, cache_key: Optional[str]) -> str:
+        """
+        Clean up a model response, holding it for the cache until it is validated.
+
+        Args:
+            text: Raw response text.
+            cache_key: Response cache key, or None.
+
+        Returns:
+            The commit message.
+        """
+        message = self._clean(text)
+        if cache_key is not None:
+            self._response = (cache_key, message, False)
+        return message
+
+    @staticmethod
+    def _clean(text: str) -> str:
+        """
+        Strip whitespace and stray quoting from a model response.
+
+        Args:
+            text: Raw response text.
+
+        Returns:
+            The cleaned text.
+        """
+        return text.strip().strip('`').strip('"').strip("'")
+
+    @staticmethod
+    def _abort(stream: Optional[Any]) -> None:
+        """
+        Stop an in-flight streaming request.
+
+        Args:
+            stream: The response iterator, if the request was started.
+
+        Returns:
+            None
+        """
+        # gRPC streams expose cancel(); generators and HTTP streams close()
+        for name in ('cancel', 'close'):
+            method = getattr(stream, name, None)
+            if callable(method):
+                try:
+                    method()
+                except Exception:
+                    pass
+                return
@@ -0,0 +1,54 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+
+class AIResponse:
+
+    def __init__(self, text: str):
+        """
+        Initialize AIResponse.
+
+        Args:
+            text: Response or chunk text.
+        """
+        self.text = text
+
+
+class TransientAIError(Exception):
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        """
+        Initialize TransientAIError.
+
+        Args:
+            message: What went wrong.
+            status: HTTP status code, or None for connection errors and timeouts.
+            retry_after: Seconds the service asked us to wait, if it said.
+        """
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+# Anything AIInterface can generate with: the interface of Gemini's
+# GenerativeModel.generate_content. Failures worth retrying (rate limits,
+# overload, timeouts, dropped connections) are raised as TransientAIError.
+class AIProvider(ABC):
+
+    # HTTP statuses that mean "try again later"
+    RETRYABLE_STATUSES = (408, 429, 500, 502, 503, 504)
+
+    @abstractmethod
+    def generate_content(self, prompt: str, stream: bool = False, request_options: Optional[Dict] = None):
+        """
+        Produce a response for a prompt.
+
+        Args:
+            prompt: The generation prompt.
+            stream: Return an iterator of chunks instead of one response.
+            request_options: Supports 'timeout' in seconds.
+
+        Returns:
+            A response with .text, or an iterator of such chunks when streaming.
+        """
+        pass
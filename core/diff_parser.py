@@ -0,0 +1,234 @@
+import re
+from typing import List, Optional, Tuple
+
+
+class DiffParser:
+
+    # Hunk header: @@ -old_start[,old_count] +new_start[,new_count] @@
+    HUNK_HEADER = re.compile(r'^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+    @classmethod
+    def added_lines(cls, diff: str) -> List[Tuple[int, str]]:
+        """
+        Extract the lines a unified diff adds, with their new-file line numbers.
+
+        Args:
+            diff: Unified diff text, for one or more files.
+
+        Returns:
+            List of (line_number, text) for every '+' line inside a hunk.
+        """
+        return [line for run in cls.added_runs(diff) for line in run]
+
+    @classmethod
+    def added_runs(cls, diff: str) -> List[List[Tuple[int, str]]]:
+        """
+        Extract the lines a unified diff adds, grouped into runs of adjacent lines.
+
+        Lines are split on '\n' only; a bare '\r' stays inside its line.
+
+        Args:
+            diff: Unified diff text, for one or more files.
+
+        Returns:
+            Lists of (line_number, text), one per run of '+' lines with no
+            other line between them.
+        """
+        runs: List[List[Tuple[int, str]]] = []
+        run: List[Tuple[int, str]] = []
+        old_left = new_left = 0
+        line_number = 0
+
+        for line in diff.split('\n'):
+            if not line.startswith('+') or (old_left <= 0 and new_left <= 0):
+                if run:
+                    runs.append(run)
+                    run = []
+
+            # Outside a hunk only a new hunk header matters; file headers
+            # such as '+++ b/path' are skipped here
+            if old_left <= 0 and new_left <= 0:
+                match = cls.HUNK_HEADER.match(line)
+                if match:
+                    old_count, new_start, new_count = match.groups()
+                    old_left = int(old_count) if old_count is not None else 1
+                    new_left = int(new_count) if new_count is not None else 1
+                    line_number = int(new_start)
+                continue
+
+            if line.startswith('+'):
+                run.append((line_number, line[1:]))
+                line_number += 1
+                new_left -= 1
+            elif line.startswith('-'):
+                old_left -= 1
+            elif line.startswith(' '):
+                line_number += 1
+                old_left -= 1
+                new_left -= 1
+
+        if run:
+            runs.append(run)
+        return runs
+
+    @classmethod
+    def split_hunks(cls, diff: str) -> Tuple[List[str], List[List[str]]]:
+        """
+        Split a single-file unified diff into its header and hunks.
+
+        Args:
+            diff: Unified diff text for one file.
+
+        Returns:
+            A tuple (header_lines, hunks); each hunk starts with its '@@' line
+            and keeps any trailing lines (such as a truncation note).
+        """
+        header: List[str] = []
+        hunks: List[List[str]] = []
+        old_left = new_left = 0
+
+        for line in diff.split('\n'):
+            if old_left <= 0 and new_left <= 0:
+                match = cls.HUNK_HEADER.match(line)
+                if match:
+                    old_count, _, new_count = match.groups()
+                    old_left = int(old_count) if old_count is not None else 1
+                    new_left = int(new_count) if new_count is not None else 1
+                    hunks.append([line])
+                elif hunks:
+                    hunks[-1].append(line)
+                else:
+                    header.append(line)
+                continue
+
+            hunks[-1].append(line)
+            if line.startswith('+'):
+                new_left -= 1
+            elif line.startswith('-'):
+                old_left -= 1
+            elif line.startswith(' '):
+                old_left -= 1
+                new_left -= 1
+
+        return header, hunks
+
+    @classmethod
+    def split_files(cls, diff: str) -> List[Tuple[str, str]]:
+        """
+        Split a unified diff of several files into one diff per file.
+
+        Accepts git diffs ('diff --git' sections, with or without a/ and b/
+        prefixes) and plain 'diff -u' output.
+
+        Args:
+            diff: Unified diff text.
+
+        Returns:
+            List of (path, diff) in input order; the path is the new one,
+            or the old one for deleted files.
+        """
+        lines = diff.split('\n')
+        sections: List[List[str]] = []
+        has_body = False
+        old_left = new_left = 0
+
+        for index, line in enumerate(lines):
+            if old_left > 0 or new_left > 0:
+                if line.startswith('-'):
+                    old_left -= 1
+                elif line.startswith('+'):
+                    new_left -= 1
+                elif line.startswith(' ') or line == '':
+                    old_left -= 1
+                    new_left -= 1
+                sections[-1].append(line)
+                continue
+
+            next_line = lines[index + 1] if index + 1 < len(lines) else ''
+            is_file_header = line.startswith('--- ') and next_line.startswith('+++ ')
+            if line.startswith('diff --git ') or (is_file_header and (has_body or not sections)):
+                sections.append([])
+                has_body = False
+            if not sections:
+                continue
+
+            match = cls.HUNK_HEADER.match(line)
+            if match:
+                old_count, _, new_count = match.groups()
+                old_left = int(old_count) if old_count is not None else 1
+                new_left = int(new_count) if new_count is not None else 1
+            has_body = has_body or bool(match) or is_file_header
+            sections[-1].append(line)
+
+        files = []
+        for section in sections:
+            path = cls._section_path(section)
+            if path:
+                files.append((path, '\n'.join(section).rstrip('\n')))
+        return files
+
+    @staticmethod
+    def _section_path(section: List[str]) -> Optional[str]:
+        """
+        Find the path of one file's section of a unified diff.
+
+        Args:
+            section: The section's lines.
+
+        Returns:
+            The file path, or None if the section names none.
+        """
+        is_git = section[0].startswith('diff --git ')
+        old_path = new_path = None
+        for line in section:
+            if line.startswith('--- ') and old_path is None:
+                old_path = line[4:].split('\t')[0]
+            elif line.startswith('+++ ') and new_path is None:
+                new_path = line[4:].split('\t')[0]
+                break
+            elif line.startswith('@@'):
+                break
+
+        path = new_path if new_path and new_path != '/dev/null' else old_path
+        if path and path != '/dev/null':
+            return path[2:] if is_git and path[:2] in ('a/', 'b/') else path
+        if is_git:
+            # Binary and mode-only changes have no ---/+++ lines
+            header = section[0][len('diff --git '):]
+            return header.rsplit(' b/', 1)[-1] if ' b/' in header else header.split(' ')[-1]
+        return None
+
+    @classmethod
+    def line_stats(cls, diff: str) -> Tuple[int, int]:
+        """
+        Count added and removed lines in a unified diff.
+
+        Args:
+            diff: Unified diff text.
+
+        Returns:
+            A tuple (added, removed).
+        """
+        added = removed = 0
+        for hunk in cls.split_hunks(diff)[1]:
+            for line in hunk[1:]:
+                if line.startswith('+'):
+                    added += 1
+                elif line.startswith('-'):
+                    removed += 1
+        return added, removed
+
+    @staticmethod
+    def is_whitespace_only(hunk: List[str]) -> bool:
+        """
+        Check whether a hunk only changes whitespace.
+
+        Args:
+            hunk: Hunk lines, starting with its '@@' line.
+
+        Returns:
+            True if removed and added lines match once whitespace is ignored.
+        """
+        removed = ''.join(''.join(line[1:].split()) for line in hunk[1:] if line.startswith('-'))
+        added = ''.join(''.join(line[1:].split()) for line in hunk[1:] if line.startswith('+'))
+        return removed == added
@@ -0,0 +1,188 @@
+import os
+from typing import Dict, List, Optional, Tuple
+from core.git_interface import GitInterface
+
+
+class FileTriage:
+
+    SOURCE = 'source'
+    BINARY = 'binary'
+    GENERATED = 'generated'
+    VENDORED = 'vendored'
+
+    # Dependency lockfiles, matched by file name
+    LOCKFILES = {
+        'package-lock.json', 'npm-shrinkwrap.json', 'yarn.lock', 'pnpm-lock.yaml',
+        'poetry.lock', 'Pipfile.lock', 'Cargo.lock', 'Gemfile.lock', 'composer.lock',
+        'go.sum', 'mix.lock', 'pubspec.lock', 'packages.lock.json', 'uv.lock',
+    }
+
+    # Build outputs and code generators' files, matched by suffix
+    GENERATED_SUFFIXES = (
+        '.min.js', '.min.css', '.map', '.pb.go', '_pb2.py', '_pb2_grpc.py',
+        '.g.dart', '.designer.cs', '.snap',
+    )
+
+    # Third-party code checked into the repository, matched by directory
+    VENDORED_DIRECTORIES = ('vendor', 'node_modules', 'third_party', 'third-party', 'bower_components')
+
+    # .gitattributes read for each file: linguist-generated/linguist-vendored
+    # (as GitHub uses them) and -diff, which also comes with the binary macro
+    ATTRIBUTES = ('linguist-generated', 'linguist-vendored', 'diff')
+
+    # Longer pathspec lists are not passed to git; the full diff is read and
+    # non-source files are dropped from it instead
+    MAX_PATHSPEC_CHARS = 64 * 1024
+
+    def __init__(self, git_interface: GitInterface):
+        """
+        Initialize FileTriage.
+
+        Args:
+            git_interface: Git interface for the repository.
+        """
+        self.git = git_interface
+
+    def triage(self) -> List[Dict[str, str]]:
+        """
+        Classify every staged file from one numstat pass and its attributes.
+
+        Args:
+            None
+
+        Returns:
+            List of dicts with 'file', 'added', 'removed' (None for binary
+            files), 'kind' and 'reason' (None for source files), in git order.
+        """
+        stats = self.git.get_staged_numstat()
+        attributes = self.git.get_attributes([path for path, _, _ in stats], self.ATTRIBUTES) if stats else {}
+
+        entries = []
+        for path, added, removed in stats:
+            kind, reason = self.classify(path, added is None, attributes.get(path, {}))
+            entries.append({"file": path, "added": added, "removed": removed, "kind": kind, "reason": reason})
+        return entries
+
+    @classmethod
+    def classify(cls, path: str, is_binary: bool, attributes: Dict[str, str]) -> Tuple[str, Optional[str]]:
+        """
+        Decide what kind of file a path is.
+
+        Attributes win over the path: linguist-generated=false keeps a
+        minified file in the prompt, linguist-generated marks any file as
+        generated.
+
+        Args:
+            path: Path of the file, relative to the repository root.
+            is_binary: Whether git found the content binary.
+            attributes: The file's ATTRIBUTES values from git check-attr.
+
+        Returns:
+            (kind, reason): reason names why a non-source file's diff is
+            omitted, and is None for source files.
+        """
+        if is_binary or attributes.get('diff') == 'unset':
+            return cls.BINARY, "binary"
+
+        vendored = cls._flag(attributes.get('linguist-vendored'))
+        if vendored is None:
+            vendored = any(part in cls.VENDORED_DIRECTORIES for part in path.split('/')[:-1])
+        if vendored:
+            return cls.VENDORED, "vendored"
+
+        generated = cls._flag(attributes.get('linguist-generated'))
+        if generated is None:
+            reason = cls.path_reason(path)
+            if reason:
+                return cls.GENERATED, reason
+        elif generated:
+            return cls.GENERATED, "generated"
+
+        return cls.SOURCE, None
+
+    @classmethod
+    def path_reason(cls, path: str) -> Optional[str]:
+        """
+        Recognize lockfiles and generated files by name alone.
+
+        Args:
+            path: Path of the file.
+
+        Returns:
+            "lockfile", "generated", or None.
+        """
+        if os.path.basename(path) in cls.LOCKFILES:
+            return "lockfile"
+        if path.endswith(cls.GENERATED_SUFFIXES):
+            return "generated"
+        return None
+
+    @classmethod
+    def pathspecs(cls, entries: List[Dict[str, str]]) -> Optional[List[str]]:
+        """
+        Build the pathspecs that leave binary files out of the staged diff.
+
+        Generated and vendored files stay in: they are scanned for secrets
+        even though the prompt only gets their stats.
+
+        Args:
+            entries: Entries from triage().
+
+        Returns:
+            Pathspecs naming the other files or excluding the binary ones,
+            whichever list is shorter, or None when no file is binary or the
+            list would be too long (diff everything).
+        """
+        scanned = [entry["file"] for entry in entries if entry["kind"] != cls.BINARY]
+        binary = [entry["file"] for entry in entries if entry["kind"] == cls.BINARY]
+        if not binary:
+            return None
+
+        # Paths are relative to the root and taken literally, not as globs
+        if len(scanned) <= len(binary):
+            specs = [f":(top,literal){path}" for path in scanned]
+        else:
+            specs = [f":(top,literal,exclude){path}" for path in binary]
+        if sum(len(spec) for spec in specs) > cls.MAX_PATHSPEC_CHARS:
+            return None
+        return specs
+
+    @staticmethod
+    def stats_item(entry: Dict[str, str]) -> Dict[str, str]:
+        """
+        Build the prompt entry of a binary file, which has no diff.
+
+        Args:
+            entry: Entry from triage().
+
+        Returns:
+            Dict shaped like a prepared staged file, with an empty diff.
+        """
+        return {
+            "file": entry["file"],
+            "diff": "",
+            "base_blob": "",
+            "blob": "",
+            "kind": entry["kind"],
+            "added": entry["added"],
+            "removed": entry["removed"],
+            "omit_reason": entry["reason"],
+            "prompt_diff": "",
+        }
+
+    @staticmethod
+    def _flag(value: Optional[str]) -> Optional[bool]:
+        """
+        Read a boolean attribute value from git check-attr.
+
+        Args:
+            value: 'set', 'unset', 'unspecified', or the assigned value.
+
+        Returns:
+            True or False if the attribute is set either way, else None.
+        """
+        if value in ('set', 'true'):
+            return True
+        if value in ('unset', 'false'):
+            return False
+        return None
@@ -0,0 +1,264 @@
+import http.client
+import json
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, Optional, Tuple
+from urllib.parse import quote, urlsplit
+from core.ai_provider import AIProvider, AIResponse, TransientAIError
+
+
+# Gemini's REST API over http.client: no SDK to import, one kept-alive
+# connection per thread, and a base URL that can point at a stand-in server.
+class GeminiHttpModel(AIProvider):
+
+    DEFAULT_BASE_URL = 'https://generativelanguage.googleapis.com'
+
+    def __init__(self, api_key: str, model_name: str, base_url: Optional[str] = None, timeout: float = 60.0):
+        """
+        Initialize GeminiHttpModel.
+
+        Args:
+            api_key: Gemini API key.
+            model_name: Gemini model name.
+            base_url: API root, e.g. 'http://127.0.0.1:8765' for a stand-in.
+            timeout: Seconds allowed per request unless request_options says otherwise.
+        """
+        url = urlsplit(base_url or self.DEFAULT_BASE_URL)
+        if url.scheme not in ('http', 'https') or not url.hostname:
+            raise ValueError(f"Unsupported API base URL: {base_url}")
+
+        self.api_key = api_key
+        self.model_name = model_name
+        self.timeout = timeout
+        self.secure = url.scheme == 'https'
+        self.host = url.hostname
+        self.port = url.port
+        self.prefix = url.path.rstrip('/')
+        self._local = threading.local()
+
+    def generate_content(self, prompt: str, stream: bool = False, request_options: Optional[Dict] = None):
+        """
+        Produce a response for a prompt.
+
+        Args:
+            prompt: The generation prompt.
+            stream: Return an iterator of chunks instead of one response.
+            request_options: Supports 'timeout' in seconds.
+
+        Returns:
+            A response with .text, or an iterator of such chunks when streaming.
+        """
+        timeout = (request_options or {}).get('timeout') or self.timeout
+        method = 'streamGenerateContent?alt=sse' if stream else 'generateContent'
+        path = f"{self.prefix}/v1beta/models/{quote(self.model_name)}:{method}"
+        body = json.dumps({"contents": [{"parts": [{"text": prompt}]}]}).encode('utf-8')
+
+        connection, response = self._send(path, body, timeout)
+        if stream:
+            return self._stream(connection, response)
+
+        try:
+            payload = json.loads(response.read().decode('utf-8'))
+        except (OSError, http.client.HTTPException) as e:
+            self._drop(connection)
+            raise TransientAIError(f"connection failed: {e}") from e
+        return AIResponse(self._text(payload))
+
+    def close(self) -> None:
+        """
+        Close this thread's kept-alive connection.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            self._drop(connection)
+
+    def _send(self, path: str, body: bytes, timeout: float) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        """
+        POST a request, reusing this thread's connection when possible.
+
+        Args:
+            path: Request path and query.
+            body: JSON request body.
+            timeout: Seconds allowed for the connection and each read.
+
+        Returns:
+            A tuple (connection, response) for a 2xx response.
+        """
+        headers = {
+            'Content-Type': 'application/json',
+            'x-goog-api-key': self.api_key,
+        }
+
+        for attempt in range(2):
+            connection, reused = self._connection(timeout)
+            try:
+                connection.request('POST', path, body=body, headers=headers)
+                response = connection.getresponse()
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError) as e:
+                self._drop(connection)
+                # The server may close an idle kept-alive connection; one
+                # fresh connection is not a retry of the request itself
+                if reused and attempt == 0:
+                    continue
+                raise TransientAIError(f"connection failed: {e}") from e
+            except (OSError, http.client.HTTPException) as e:
+                self._drop(connection)
+                raise TransientAIError(f"connection failed: {e}") from e
+
+        if 200 <= response.status < 300:
+            return connection, response
+
+        try:
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            data = b''
+        if response.will_close:
+            self._drop(connection)
+
+        message = self._error_message(data) or response.reason
+        if response.status in self.RETRYABLE_STATUSES:
+            retry_after = self._retry_after(response.getheader('Retry-After'), data)
+            raise TransientAIError(f"HTTP {response.status}: {message}", status=response.status, retry_after=retry_after)
+        raise RuntimeError(f"HTTP {response.status}: {message}")
+
+    def _connection(self, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Get this thread's connection, opening one if needed.
+
+        Args:
+            timeout: Seconds allowed for the connection and each read.
+
+        Returns:
+            A tuple (connection, reused).
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+                return connection, True
+
+        factory = http.client.HTTPSConnection if self.secure else http.client.HTTPConnection
+        connection = factory(self.host, self.port, timeout=timeout)
+        self._local.connection = connection
+        return connection, False
+
+    def _drop(self, connection: http.client.HTTPConnection) -> None:
+        """
+        Close a connection so the next request opens a new one.
+
+        Args:
+            connection: The connection to close.
+
+        Returns:
+            None
+        """
+        connection.close()
+        if getattr(self._local, 'connection', None) is connection:
+            self._local.connection = None
+
+    def _stream(self, connection: http.client.HTTPConnection, response: http.client.HTTPResponse) -> Iterator[AIResponse]:
+        """
+        Yield the text of each server-sent event.
+
+        Args:
+            connection: Connection the response arrives on.
+            response: The streaming response.
+
+        Returns:
+            Iterator of response chunks.
+        """
+        finished = False
+        try:
+            while True:
+                line = response.readline()
+                if not line:
+                    finished = True
+                    return
+                line = line.strip()
+                if line.startswith(b'data:'):
+                    text = self._text(json.loads(line[5:].decode('utf-8')))
+                    if text:
+                        yield AIResponse(text)
+        except (OSError, http.client.HTTPException) as e:
+            raise TransientAIError(f"stream interrupted: {e}") from e
+        finally:
+            # An abandoned stream leaves unread data on the connection
+            if not finished:
+                self._drop(connection)
+
+    @staticmethod
+    def _text(payload: Dict[str, Any]) -> str:
+        """
+        Extract the text of a generateContent response.
+
+        Args:
+            payload: Decoded JSON response or stream event.
+
+        Returns:
+            The concatenated text parts of the first candidate.
+        """
+        candidates = payload.get('candidates') or []
+        if not candidates:
+            return ''
+        parts = (candidates[0].get('content') or {}).get('parts') or []
+        return ''.join(part.get('text', '') for part in parts)
+
+    @staticmethod
+    def _error_message(data: bytes) -> Optional[str]:
+        """
+        Extract the message of an API error body.
+
+        Args:
+            data: Response body.
+
+        Returns:
+            The error message, or None if the body is not an API error.
+        """
+        try:
+            return json.loads(data.decode('utf-8'))['error']['message']
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def _retry_after(header: Optional[str], data: bytes) -> Optional[float]:
+        """
+        Work out how long the server asked us to wait.
+
+        Args:
+            header: The Retry-After header (seconds or an HTTP date), if any.
+            data: Response body, which may carry a google.rpc.RetryInfo.
+
+        Returns:
+            Seconds to wait, or None if the server did not say.
+        """
+        if header:
+            try:
+                return max(float(header), 0.0)
+            except ValueError:
+                pass
+            try:
+                return max(parsedate_to_datetime(header).timestamp() - time.time(), 0.0)
+            except (TypeError, ValueError):
+                pass
+
+        try:
+            details = json.loads(data.decode('utf-8'))['error'].get('details') or []
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+        for detail in details:
+            delay = detail.get('retryDelay') if isinstance(detail, dict) else None
+            if isinstance(delay, str) and delay.endswith('s'):
+                try:
+                    return max(float(delay[:-1]), 0.0)
+                except ValueError:
+                    pass
+        return None
@@ -0,0 +1,97 @@
+from typing import Any, Dict, Iterator, Optional
+from core.ai_provider import AIProvider, TransientAIError
+
+
+# Gemini through the google-generativeai SDK, with the SDK's transient
+# errors translated so AIInterface can retry them.
+class GeminiSDKModel(AIProvider):
+
+    def __init__(self, api_key: str, model_name: str):
+        """
+        Initialize GeminiSDKModel.
+
+        Args:
+            api_key: Gemini API key.
+            model_name: Gemini model name.
+        """
+        # Imported here: the SDK and its gRPC stack dominate startup time
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate_content(self, prompt: str, stream: bool = False, request_options: Optional[Dict] = None):
+        """
+        Produce a response for a prompt.
+
+        Args:
+            prompt: The generation prompt.
+            stream: Return an iterator of chunks instead of one response.
+            request_options: Supports 'timeout' in seconds.
+
+        Returns:
+            A response with .text, or an iterator of such chunks when streaming.
+        """
+        try:
+            response = self.model.generate_content(prompt, stream=stream, request_options=request_options or {})
+        except Exception as e:
+            raise self._translate(e) from e
+
+        return self._stream(response) if stream else response
+
+    def _stream(self, response: Any) -> Iterator[Any]:
+        """
+        Iterate a streamed response, translating errors raised mid-stream.
+
+        Args:
+            response: The SDK's streaming response.
+
+        Returns:
+            Iterator of response chunks.
+        """
+        try:
+            for chunk in response:
+                yield chunk
+        except GeneratorExit:
+            cancel = getattr(response, 'cancel', None)
+            if callable(cancel):
+                cancel()
+            raise
+        except Exception as e:
+            raise self._translate(e) from e
+
+    @classmethod
+    def _translate(cls, error: Exception) -> Exception:
+        """
+        Map an SDK exception to TransientAIError when it is worth retrying.
+
+        Args:
+            error: Exception raised by the SDK.
+
+        Returns:
+            A TransientAIError, or the original exception.
+        """
+        # google.api_core errors carry the HTTP status as .code
+        status = getattr(error, 'code', None)
+        if isinstance(status, int) and status in cls.RETRYABLE_STATUSES:
+            return TransientAIError(str(error), status=status, retry_after=cls._retry_after(error))
+        if isinstance(error, (ConnectionError, TimeoutError)):
+            return TransientAIError(str(error))
+        return error
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """
+        Read the retry delay a rate-limit error asks for.
+
+        Args:
+            error: Exception raised by the SDK.
+
+        Returns:
+            Seconds to wait, or None if the error does not say.
+        """
+        # google.rpc.RetryInfo detail: retry_delay is a Duration
+        for detail in getattr(error, 'details', None) or []:
+            delay = getattr(detail, 'retry_delay', None)
+            if delay is not None:
+                return getattr(delay, 'seconds', 0) + getattr(delay, 'nanos', 0) / 1e9
+        return None
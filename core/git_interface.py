@@ -1,11 +1,47 @@
+import os
+import queue
 import subprocess
-from typing import List, Tuple
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from core.timings import Timings
 
 
 class GitInterface:
+
+    # Staged patch preceded by NUL-delimited raw records, one per file section
+    STAGED_PATCH_COMMAND = ["git", "diff", "--cached", "--no-renames", "--no-abbrev", "-z", "--patch-with-raw"]
+
+    # Added and removed line counts of each staged file ("-" for binary)
+    STAGED_NUMSTAT_COMMAND = ["git", "diff", "--cached", "--no-renames", "-z", "--numstat"]
+
+    # Type, size and path of each object from a "rev-list --objects" listing
+    BATCH_CHECK_COMMAND = ["git", "cat-file", "--batch-check=%(objectname) %(objecttype) %(objectsize) %(rest)"]
+
+    # Blob IDs requested from "cat-file --batch" ahead of the reader
+    BATCH_QUEUE_SIZE = 1024
+
+    # Object ID git reports for the missing side of an added or deleted file
+    NULL_BLOB = '0' * 40
+
+    # Read size used when counting lines past the truncation limit
+    READ_CHUNK_SIZE = 64 * 1024
+
+    # Bytes kept of one diff line; the rest of a longer line (minified code,
+    # data on a single line) is read past without being stored
+    MAX_LINE_BYTES = 64 * 1024
     
-    def __init__(self):
-        pass
+    def __init__(self, timings: Optional[Timings] = None, repo_path: Optional[str] = None):
+        """
+        Initialize GitInterface.
+
+        Args:
+            timings: Records how long each git call takes, if given.
+            repo_path: Directory of the repository; the current directory
+                by default.
+        """
+        self.timings = timings
+        self.repo_path = repo_path
     
     def get_staged_files(self) -> List[str]:
         """
@@ -22,12 +58,85 @@ class GitInterface:
                 ["git", "diff", "--cached", "--name-only"],
                 capture_output=True,
                 text=True,
-                check=True
+                check=True,
+                cwd=self.repo_path
             )
             return [f.strip() for f in result.stdout.strip().split('\n') if f.strip()]
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"Failed to get staged files: {e.stderr}")
     
+    def get_staged_numstat(self) -> List[Tuple[str, Optional[int], Optional[int]]]:
+        """
+        Get line counts of every staged file without reading any diff.
+
+        Args:
+            None
+
+        Returns:
+            List of (path, added, removed) in git order; the counts are None
+            for binary files.
+        """
+        started = time.perf_counter()
+        try:
+            result = subprocess.run(self.STAGED_NUMSTAT_COMMAND, capture_output=True, check=True, cwd=self.repo_path)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to get staged files: {self._decode(e.stderr)}")
+
+        stats = []
+        # "<added>\t<removed>\t<path>" records, NUL-terminated
+        for record in result.stdout.split(b'\0'):
+            fields = record.split(b'\t', 2)
+            if len(fields) != 3:
+                continue
+            added, removed, path = fields
+            stats.append((
+                path.decode('utf-8', errors='surrogateescape'),
+                int(added) if added != b'-' else None,
+                int(removed) if removed != b'-' else None,
+            ))
+
+        if self.timings is not None:
+            self.timings.add("get_staged_numstat", time.perf_counter() - started, start=started, files=len(stats))
+        return stats
+
+    def get_attributes(self, paths: List[str], names: Iterable[str]) -> Dict[str, Dict[str, str]]:
+        """
+        Look up .gitattributes values of many files in one git call.
+
+        Attributes come from the index, so they match the staged files.
+
+        Args:
+            paths: Paths relative to the repository root.
+            names: Attribute names.
+
+        Returns:
+            Mapping of path to {name: value}, where value is 'set', 'unset',
+            'unspecified' or the assigned value.
+        """
+        # check-attr takes paths relative to the working directory
+        root = self.repo_path or '.'
+        if not os.path.exists(os.path.join(root, '.git')):
+            root = self.get_repo_root()
+        data = b''.join(path.encode('utf-8', errors='surrogateescape') + b'\0' for path in paths)
+        try:
+            result = subprocess.run(
+                ["git", "check-attr", "-z", "--stdin", "--cached", *names],
+                input=data,
+                capture_output=True,
+                check=True,
+                cwd=root
+            )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to read attributes: {self._decode(e.stderr)}")
+
+        attributes: Dict[str, Dict[str, str]] = {}
+        # "<path>\0<attribute>\0<value>\0" for each path and attribute
+        fields = result.stdout.split(b'\0')
+        for index in range(0, len(fields) - 2, 3):
+            path = fields[index].decode('utf-8', errors='surrogateescape')
+            attributes.setdefault(path, {})[self._decode(fields[index + 1])] = self._decode(fields[index + 2])
+        return attributes
+
     def get_file_diff(self, file_path: str, max_lines: int = 500) -> str:
         """
         Get diff for a specific file.
@@ -39,28 +148,397 @@ class GitInterface:
         Returns:
             The diff text for the file, truncated if necessary.
         """
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            ["git", "diff", "--cached", "--", file_path],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.repo_path
+        )
         try:
-            result = subprocess.run(
-                ["git", "diff", "--cached", "--", file_path],
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                check=True
-            )
-            
-            diff_text = result.stdout
-            lines = diff_text.split('\n')
-            
-            if len(lines) > max_lines:
-                truncated = lines[:max_lines]
-                truncated.append(f"\n... (truncated {len(lines) - max_lines} lines)")
-                diff_text = '\n'.join(truncated)
-            
-            return diff_text
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Failed to get diff for {file_path}: {e.stderr}")
+            lines: List[str] = []
+            read = 0
+            while len(lines) < max_lines:
+                line, size = self._read_line(process.stdout)
+                if not line:
+                    break
+                read += size
+                lines.append(self._decode_line(line))
+
+            # Past the budget, only count what is left; nothing is decoded or kept
+            skipped = 0
+            while True:
+                chunk = process.stdout.read(self.READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                read += len(chunk)
+                skipped += self._count_lines(chunk)
+
+            stderr = process.stderr.read()
+            if process.wait() != 0:
+                raise RuntimeError(f"Failed to get diff for {file_path}: {self._decode(stderr)}")
+
+            if self.timings is not None:
+                self.timings.add("get_file_diff", time.perf_counter() - started, start=started, file=file_path, bytes=read)
+            return self._truncate(lines, max_lines, skipped)
+        finally:
+            self._close(process)
+
+    def iter_staged_diffs(self, max_lines: int = 500, pathspecs: Optional[List[str]] = None) -> Iterator[Dict[str, str]]:
+        """
+        Stream the diff of every staged file from a single git process.
+
+        Args:
+            max_lines: Maximum number of lines to keep per file.
+            pathspecs: Limit the diff to these pathspecs, if given.
+
+        Returns:
+            Iterator of dicts with 'file' and 'diff' keys, in git order, plus
+            the 'base_blob' (HEAD) and 'blob' (index) object IDs.
+        """
+        # Time spent producing each file, excluding time the caller holds it
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            self.STAGED_PATCH_COMMAND + (["--", *pathspecs] if pathspecs else []),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.repo_path
+        )
+        try:
+            # Raw records are terminated by an empty NUL field; the first
+            # patch line follows it on the same readline() result.
+            head = b''
+            while b'\0\0' not in head:
+                line = process.stdout.readline()
+                if not line:
+                    break
+                head += line
+            raw, _, first_line = head.partition(b'\0\0')
+
+            fields = raw.split(b'\0') if raw else []
+            paths = [self._decode(path) for path in fields[1::2]]
+            # ":<old mode> <new mode> <old blob> <new blob> <status>"
+            blobs = [self._decode(meta).split(' ')[2:4] for meta in fields[0::2]]
+
+            index = -1
+            lines: List[str] = []
+            skipped = 0
+            read = 0
+            pending = [first_line] if first_line else []
+            for line, size in self._iter_lines(pending, process.stdout):
+                if line.startswith(b'diff --git ') and index + 1 < len(paths):
+                    if index >= 0:
+                        record = self._staged_record(paths[index], blobs[index], lines, max_lines, skipped)
+                        self._record_time(started, record, read)
+                        yield record
+                        started = time.perf_counter()
+                    index += 1
+                    lines = []
+                    skipped = 0
+                    read = 0
+                read += size
+                if len(lines) < max_lines:
+                    lines.append(self._decode_line(line))
+                else:
+                    skipped += self._count_lines(line)
+
+            if index >= 0:
+                record = self._staged_record(paths[index], blobs[index], lines, max_lines, skipped)
+                self._record_time(started, record, read)
+                yield record
+
+            stderr = process.stderr.read()
+            if process.wait() != 0:
+                raise RuntimeError(f"Failed to get staged diff: {self._decode(stderr)}")
+        finally:
+            self._close(process)
+
+    @classmethod
+    def _staged_record(cls, path: str, blobs: List[str], lines: List[str], max_lines: int, skipped: int) -> Dict[str, str]:
+        """
+        Build the record yielded for one staged file.
+
+        Args:
+            path: Path of the file.
+            blobs: The [HEAD, index] blob object IDs from the raw record.
+            lines: Kept diff lines.
+            max_lines: Maximum number of lines to keep.
+            skipped: Lines past the budget that were not read.
+
+        Returns:
+            Dict with 'file', 'diff', 'base_blob' and 'blob' keys.
+        """
+        base_blob, blob = (blobs + ['', ''])[:2]
+        return {
+            "file": path,
+            "diff": cls._truncate(lines, max_lines, skipped),
+            "base_blob": base_blob,
+            "blob": blob,
+        }
+
+    def _record_time(self, started: float, record: Dict[str, str], read: int) -> None:
+        """
+        Record how long producing one staged file's diff took.
+
+        Args:
+            started: perf_counter() value when work on the file began.
+            record: The file's record from _staged_record.
+            read: Bytes of git output read for the file.
+
+        Returns:
+            None
+        """
+        if self.timings is not None:
+            self.timings.add("get_file_diff", time.perf_counter() - started, start=started, file=record["file"], bytes=read)
+
+    @staticmethod
+    def _close(process: subprocess.Popen) -> None:
+        """
+        Stop a git process whose output is no longer needed.
+
+        Args:
+            process: The running git process.
+
+        Returns:
+            None
+        """
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        process.stderr.close()
+        process.wait()
+
+    @classmethod
+    def _iter_lines(cls, pending: List[bytes], stream) -> Iterator[Tuple[bytes, int]]:
+        """
+        Yield already-buffered lines followed by the rest of a stream.
+
+        Args:
+            pending: Lines read ahead of the stream.
+            stream: Binary stream to read lines from.
+
+        Returns:
+            Iterator of (raw line, bytes read), each line cut as by _read_line.
+        """
+        for line in pending:
+            yield line, len(line)
+        while True:
+            line, size = cls._read_line(stream)
+            if not line:
+                return
+            yield line, size
+
+    @classmethod
+    def _read_line(cls, stream) -> Tuple[bytes, int]:
+        """
+        Read one line, keeping at most MAX_LINE_BYTES of it.
+
+        The rest of a longer line is drained in READ_CHUNK_SIZE reads and
+        dropped, so one huge line costs no more memory than a short one.
+
+        Args:
+            stream: Binary stream to read from.
+
+        Returns:
+            (line, bytes read): the line, or its first MAX_LINE_BYTES plus
+            its newline if longer, and its full size; (b'', 0) at the end
+            of the stream.
+        """
+        line = stream.readline(cls.MAX_LINE_BYTES)
+        read = len(line)
+        if read == cls.MAX_LINE_BYTES and not line.endswith(b'\n'):
+            while True:
+                rest = stream.readline(cls.READ_CHUNK_SIZE)
+                read += len(rest)
+                if not rest or rest.endswith(b'\n'):
+                    break
+            # Keep the newline so the line is still counted once
+            if rest:
+                line += b'\n'
+        return line, read
+
+    @staticmethod
+    def _decode(data: bytes) -> str:
+        """
+        Decode git output the way text-mode subprocess calls do.
+
+        Args:
+            data: Raw bytes from git.
+
+        Returns:
+            UTF-8 text with universal newlines.
+        """
+        text = data.decode('utf-8', errors='replace')
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+    @staticmethod
+    def _decode_line(line: bytes) -> str:
+        """
+        Decode one raw git line.
+
+        Only '\n' (or '\r\n') ends a line, as in git's own hunk counts; a
+        bare '\r' in file content stays inside the line.
+
+        Args:
+            line: A newline-terminated line of git output.
+
+        Returns:
+            The decoded line without its newline.
+        """
+        if line.endswith(b'\n'):
+            line = line[:-2] if line.endswith(b'\r\n') else line[:-1]
+        return line.decode('utf-8', errors='replace')
+
+    @staticmethod
+    def _count_lines(data: bytes) -> int:
+        """
+        Count line endings without decoding.
+
+        Args:
+            data: Raw bytes from git.
+
+        Returns:
+            Number of '\n' line endings in the data.
+        """
+        return data.count(b'\n')
+
+    @staticmethod
+    def _truncate(lines: List[str], max_lines: int, skipped: int = 0) -> str:
+        """
+        Join diff lines, truncating to the line budget.
+
+        Args:
+            lines: Newline-terminated diff lines without their newline.
+            max_lines: Maximum number of lines to keep.
+            skipped: Lines past the budget that were counted but not read.
+
+        Returns:
+            The diff text, truncated if necessary.
+        """
+        # Matches str.split('\n') on the full text, which yields a trailing ''
+        lines = lines + ['']
+        total = len(lines) + skipped
+        if total > max_lines:
+            truncated = lines[:max_lines]
+            truncated.append(f"\n... (truncated {total - max_lines} lines)")
+            return '\n'.join(truncated)
+        return '\n'.join(lines)
     
+    def iter_history_blobs(self, revisions: List[str]) -> Iterator[Tuple[str, int, str]]:
+        """
+        Stream every file version reachable from the given revisions.
+
+        Each blob is listed once, under the first path git meets it at, so
+        content shared by many commits is only reported once.
+
+        Args:
+            revisions: Revisions for git rev-list, e.g. ['--all'].
+
+        Returns:
+            Iterator of (blob_id, size_in_bytes, path).
+        """
+        objects = subprocess.Popen(
+            ["git", "rev-list", "--objects", *revisions, "--"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.repo_path
+        )
+        check = subprocess.Popen(
+            self.BATCH_CHECK_COMMAND,
+            stdin=objects.stdout,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.repo_path
+        )
+        # Only cat-file reads the listing now
+        objects.stdout.close()
+        try:
+            for line in check.stdout:
+                fields = line.rstrip(b'\n').split(b' ', 3)
+                if len(fields) >= 3 and fields[1] == b'blob':
+                    path = self._decode(fields[3]) if len(fields) > 3 else ''
+                    yield self._decode(fields[0]), int(fields[2]), path
+
+            stderr = objects.stderr.read()
+            if objects.wait() != 0:
+                raise RuntimeError(f"Failed to list history: {self._decode(stderr)}")
+        finally:
+            if objects.poll() is None:
+                objects.kill()
+            objects.stderr.close()
+            objects.wait()
+            self._close(check)
+
+    def iter_blob_contents(self, blobs: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, str, bytes]]:
+        """
+        Stream the contents of many blobs from a single git process.
+
+        Blob IDs are fed to git on a background thread while contents are
+        read here, so git never waits for a round trip per object.
+
+        Args:
+            blobs: Iterable of (blob_id, path).
+
+        Returns:
+            Iterator of (blob_id, path, content), in input order; missing
+            blobs are skipped.
+        """
+        process = subprocess.Popen(
+            ["git", "cat-file", "--batch", "--buffer"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self.repo_path
+        )
+        requested: queue.Queue = queue.Queue(maxsize=self.BATCH_QUEUE_SIZE)
+        failure: List[BaseException] = []
+
+        def feed() -> None:
+            try:
+                for blob, path in blobs:
+                    process.stdin.write(blob.encode('ascii') + b'\n')
+                    requested.put((blob, path))
+            except (BrokenPipeError, ValueError):
+                # The reader stopped early and closed the process
+                pass
+            except BaseException as e:
+                failure.append(e)
+            finally:
+                try:
+                    process.stdin.close()
+                except OSError:
+                    pass
+                requested.put(None)
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        try:
+            while True:
+                entry = requested.get()
+                if entry is None:
+                    break
+                header = process.stdout.readline().split()
+                if len(header) < 3:
+                    # "<id> missing"
+                    continue
+                content = process.stdout.read(int(header[2]))
+                process.stdout.read(1)
+                yield entry[0], entry[1], content
+
+            if failure:
+                raise failure[0]
+            stderr = process.stderr.read()
+            if process.wait() != 0:
+                raise RuntimeError(f"Failed to read blobs: {self._decode(stderr)}")
+        finally:
+            self._close(process)
+            # Unblock the feeder if it is waiting on a full queue
+            while feeder.is_alive():
+                try:
+                    requested.get_nowait()
+                except queue.Empty:
+                    feeder.join(0.05)
+
     def commit(self, message: str) -> bool:
         """
         Execute git commit.
@@ -76,7 +554,8 @@ class GitInterface:
                 ["git", "commit", "-m", message],
                 capture_output=True,
                 text=True,
-                check=True
+                check=True,
+                cwd=self.repo_path
             )
             return True
         except subprocess.CalledProcessError:
@@ -97,12 +576,35 @@ class GitInterface:
                 ["git", "push"],
                 capture_output=True,
                 text=True,
-                check=True
+                check=True,
+                cwd=self.repo_path
             )
             return True, result.stdout
         except subprocess.CalledProcessError as e:
             return False, e.stderr
     
+    def get_repo_root(self) -> str:
+        """
+        Get the top-level directory of the current repository.
+
+        Args:
+            None
+
+        Returns:
+            Absolute path of the working tree root.
+        """
+        try:
+            result = subprocess.run(
+                ["git", "rev-parse", "--show-toplevel"],
+                capture_output=True,
+                text=True,
+                check=True,
+                cwd=self.repo_path
+            )
+            return result.stdout.strip()
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to find repository root: {e.stderr}")
+
     def has_staged_changes(self) -> bool:
         """
         Check if there are staged changes.
@@ -116,7 +618,8 @@ class GitInterface:
         try:
             result = subprocess.run(
                 ["git", "diff", "--cached", "--quiet"],
-                capture_output=True
+                capture_output=True,
+                cwd=self.repo_path
             )
             return result.returncode == 1
         except subprocess.CalledProcessError:
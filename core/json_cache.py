@@ -0,0 +1,131 @@
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Optional
+
+
+class JsonCache:
+
+    # Bump in subclasses when the stored entry layout or key derivation changes
+    FORMAT_VERSION = 1
+
+    def __init__(self, path: str, max_entries: int = 1000, ttl: Optional[float] = None):
+        """
+        Initialize JsonCache.
+
+        Args:
+            path: JSON file the cache is persisted to.
+            max_entries: Entries kept on save; least recently used go first.
+            ttl: Seconds an entry stays valid after it is stored, or None.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: Optional[Dict[str, dict]] = None
+        self.dirty = False
+
+    def __getstate__(self) -> dict:
+        # Worker processes never touch the cache; do not ship its entries
+        state = self.__dict__.copy()
+        state['entries'] = None
+        return state
+
+    def get_value(self, key: str) -> Optional[dict]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            The stored value, or None on a miss or an expired entry.
+        """
+        entries = self._load()
+        entry = entries.get(key)
+        if entry is None:
+            return None
+
+        now = time.time()
+        if self.ttl is not None and now - entry["created"] > self.ttl:
+            del entries[key]
+            self.dirty = True
+            return None
+
+        entry["used"] = now
+        self.dirty = True
+        return entry["value"]
+
+    def put_value(self, key: str, value: dict) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key.
+            value: JSON-serializable value.
+
+        Returns:
+            None
+        """
+        now = time.time()
+        self._load()[key] = {"value": value, "created": now, "used": now}
+        self.dirty = True
+
+    def save(self) -> None:
+        """
+        Persist the cache, dropping expired entries and evicting least
+        recently used ones over the limit.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if not self.dirty or self.entries is None:
+            return
+
+        if self.ttl is not None:
+            now = time.time()
+            self.entries = {
+                key: entry for key, entry in self.entries.items()
+                if now - entry["created"] <= self.ttl
+            }
+
+        if len(self.entries) > self.max_entries:
+            by_use = sorted(self.entries.items(), key=lambda pair: pair[1]["used"], reverse=True)
+            self.entries = dict(by_use[:self.max_entries])
+
+        try:
+            directory = os.path.dirname(self.path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            # Write then rename so a concurrent run never reads a partial file
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"version": self.FORMAT_VERSION, "entries": self.entries}, f)
+            os.replace(temp_path, self.path)
+            self.dirty = False
+        except OSError:
+            # The cache is only an optimization; never fail a run over it
+            pass
+
+    def _load(self) -> Dict[str, dict]:
+        """
+        Read the cache file on first use.
+
+        Args:
+            None
+
+        Returns:
+            The cache entries.
+        """
+        if self.entries is None:
+            self.entries = {}
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") == self.FORMAT_VERSION:
+                    self.entries = data.get("entries", {})
+            except (OSError, ValueError, AttributeError):
+                pass
+        return self.entries
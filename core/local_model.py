@@ -0,0 +1,136 @@
+import os
+import re
+import time
+from typing import Dict, Iterator, Optional
+from core.ai_provider import AIProvider, AIResponse, TransientAIError
+
+
+# Offline stand-in for a Gemini GenerativeModel: answers with a message
+# derived from the prompt's file list after a configurable delay, so the CLI
+# can be exercised without network access or an API key.
+class LocalModel(AIProvider):
+
+    def __init__(self, first_token_delay: float = 0.2, chunk_delay: float = 0.02, chunk_size: int = 4):
+        """
+        Initialize LocalModel.
+
+        Args:
+            first_token_delay: Seconds before the first chunk is returned.
+            chunk_delay: Seconds between streamed chunks.
+            chunk_size: Characters per streamed chunk.
+        """
+        self.first_token_delay = first_token_delay
+        self.chunk_delay = chunk_delay
+        self.chunk_size = chunk_size
+
+    def generate_content(self, prompt: str, stream: bool = False, request_options: Optional[Dict] = None):
+        """
+        Produce a commit message for a prompt.
+
+        Args:
+            prompt: The generation prompt.
+            stream: Return an iterator of chunks instead of one response.
+            request_options: Supports 'timeout' in seconds.
+
+        Returns:
+            A response with .text, or an iterator of such chunks when streaming.
+        """
+        timeout = (request_options or {}).get('timeout')
+        text = self._answer(prompt)
+
+        if stream:
+            return self._stream(text, timeout)
+
+        self._wait(self.first_token_delay, timeout, time.monotonic())
+        return AIResponse(text)
+
+    def _stream(self, text: str, timeout: Optional[float]) -> Iterator[AIResponse]:
+        """
+        Yield the answer in chunks.
+
+        Args:
+            text: The full answer.
+            timeout: Seconds allowed for the whole stream, or None.
+
+        Returns:
+            Iterator of response chunks.
+        """
+        started = time.monotonic()
+        self._wait(self.first_token_delay, timeout, started)
+        for start in range(0, len(text), self.chunk_size):
+            if start:
+                self._wait(self.chunk_delay, timeout, started)
+            yield AIResponse(text[start:start + self.chunk_size])
+
+    @staticmethod
+    def _wait(delay: float, timeout: Optional[float], started: float) -> None:
+        """
+        Sleep for a simulated delay, failing like a request that times out.
+
+        Args:
+            delay: Seconds to sleep.
+            timeout: Seconds allowed since the request started, or None.
+            started: Monotonic time the request started.
+
+        Returns:
+            None
+        """
+        if timeout is not None and time.monotonic() + delay - started > timeout:
+            time.sleep(max(timeout - (time.monotonic() - started), 0))
+            raise TransientAIError(f"local model timed out after {timeout}s")
+        time.sleep(delay)
+
+    @staticmethod
+    def _answer(prompt: str) -> str:
+        """
+        Derive a Conventional Commit message from the prompt.
+
+        Args:
+            prompt: The generation prompt.
+
+        Returns:
+            The commit message (the author's hint, if any, made into one),
+            a numbered list of them when the prompt asks for several
+            candidates, or a one-line summary for a map-reduce group.
+        """
+        rejected = re.search(r'Rejected message:\s*\n\s*(.+)', prompt)
+        if rejected:
+            return LocalModel._repair(rejected.group(1).strip())
+
+        files = re.findall(r'^\s*- (\S+)', prompt, re.MULTILINE)
+        target = files[0] if len(files) == 1 else f"{len(files)} files"
+        if 'one part of a larger commit' in prompt:
+            return f"Updates {target} under {os.path.commonpath(files) or '.'}." if files else "Updates files."
+        hint = re.search(r'Guidance from the author for this message \(follow it\): (.+)', prompt)
+        first = LocalModel._repair(hint.group(1).strip()) if hint else f"modify: update {target}"
+        count = re.search(r'generate (\d+) DIFFERENT', prompt)
+        if not count:
+            return first
+
+        variants = [
+            first,
+            f"refactor: rework {target}",
+            f"feat: extend {target} with new behaviour",
+            f"fix: correct handling in {target}",
+        ]
+        return "\n".join(
+            f"{index + 1}. {variants[index % len(variants)]}" for index in range(int(count.group(1)))
+        )
+
+    @staticmethod
+    def _repair(subject: str) -> str:
+        """
+        Fix the format and length of a rejected subject line.
+
+        Args:
+            subject: First line of the rejected message.
+
+        Returns:
+            A Conventional Commit subject under 72 characters.
+        """
+        match = re.match(r'^(feat|fix|docs|style|refactor|test|build|ci|modify|revert)(\(.+?\))?!?:\s*(.+)$', subject)
+        prefix, description = (subject[:match.start(3)].rstrip() + ' ', match.group(3)) if match else ('modify: ', subject)
+        description = description.rstrip('.').lower()
+        while len(prefix) + len(description) >= 72 and ' ' in description:
+            description = description.rsplit(' ', 1)[0]
+        return prefix + description[:71 - len(prefix)]
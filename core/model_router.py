@@ -0,0 +1,225 @@
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from core.ai_interface import AIInterface
+from core.prompt_builder import PromptBuilder
+from core.timings import Timings
+
+
+# Stands in for AIInterface: sends small changes to a fast model and the rest
+# to a strong one, falling back to the fast model when the strong one misses
+# its deadline or fails. CommitService uses it exactly like an AIInterface.
+class ModelRouter:
+
+    FAST = 'fast'
+    STRONG = 'strong'
+    FALLBACK = 'fallback'
+
+    def __init__(
+        self,
+        fast: AIInterface,
+        strong: AIInterface,
+        fast_max_tokens: int = 1500,
+        fast_max_files: int = 3,
+        timings: Optional[Timings] = None
+    ):
+        """
+        Initialize ModelRouter.
+
+        Args:
+            fast: Interface to the fast model.
+            strong: Interface to the strong model; its timeout (and a
+                single attempt) makes the latency budget a deadline.
+            fast_max_tokens: Changes estimated at up to this many prompt
+                tokens go to the fast model...
+            fast_max_files: ...if they touch at most this many files.
+            timings: Records the route of each request, if given.
+        """
+        self.fast = fast
+        self.strong = strong
+        self.fast_max_tokens = fast_max_tokens
+        self.fast_max_files = fast_max_files
+        self.timings = timings
+        # Why the last generation returned None, for the caller to report
+        self.last_error: Optional[str] = None
+        # Interface that produced the last response
+        self._last: Optional[AIInterface] = None
+
+    def estimate_tokens(self, file_diffs: List[Dict[str, str]]) -> int:
+        """
+        Estimate the prompt size of the collected changes without building it.
+
+        Args:
+            file_diffs: List of dicts with 'file' and 'diff' keys.
+
+        Returns:
+            Approximate prompt tokens, at most the prompt budget.
+        """
+        builder = self.strong.prompt_builder
+        # Diffs plus a header line per file; the template is the same for both routes
+        chars = builder.diff_chars(file_diffs) + sum(len(item['file']) + 16 for item in file_diffs)
+        return min(-(-chars // PromptBuilder.CHARS_PER_TOKEN), builder.token_budget)
+
+    def route(self, file_diffs: List[Dict[str, str]]) -> Tuple[str, AIInterface, int]:
+        """
+        Choose the model for a set of changes.
+
+        Args:
+            file_diffs: List of dicts with 'file' and 'diff' keys.
+
+        Returns:
+            (route name, interface, estimated prompt tokens).
+        """
+        tokens = self.estimate_tokens(file_diffs)
+        if tokens <= self.fast_max_tokens and len(file_diffs) <= self.fast_max_files:
+            return self.FAST, self.fast, tokens
+        return self.STRONG, self.strong, tokens
+
+    def build_prompt(self, file_diffs: List[Dict[str, str]], template: Optional[str] = None, hint: Optional[str] = None) -> str:
+        """
+        Build the prompt the routed model would get.
+
+        Args:
+            file_diffs: List of dicts with 'file' and 'diff' keys.
+            template: Prompt template; GENERATION_PROMPT by default.
+            hint: Extra guidance from the user.
+
+        Returns:
+            The prompt text.
+        """
+        return self.route(file_diffs)[1].build_prompt(file_diffs, template, hint)
+
+    def generate_commit_message(self, file_diffs: List[Dict[str, str]], hint: Optional[str] = None, fresh: bool = False) -> Optional[str]:
+        """
+        Generate a commit message on the routed model.
+
+        Args:
+            file_diffs: List of dicts with 'file' and 'diff' keys.
+            hint: Extra guidance from the user.
+            fresh: Ask the model even if a cached response exists.
+
+        Returns:
+            Generated commit message or None if failed.
+        """
+        return self._routed(file_diffs, lambda ai: ai.generate_commit_message(file_diffs, hint=hint, fresh=fresh))
+
+    def stream_commit_message(
+        self,
+        file_diffs: List[Dict[str, str]],
+        on_text: Callable[[str], None],
+        hint: Optional[str] = None,
+        fresh: bool = False
+    ) -> Optional[str]:
+        """
+        Generate a commit message on the routed model, reporting text as it arrives.
+
+        Args:
+            file_diffs: List of dicts with 'file' and 'diff' keys.
+            on_text: Called with each chunk of response text.
+            hint: Extra guidance from the user.
+            fresh: Ask the model even if a cached response exists.
+
+        Returns:
+            Generated commit message or None if failed.
+        """
+        return self._routed(file_diffs, lambda ai: ai.stream_commit_message(file_diffs, on_text, hint=hint, fresh=fresh))
+
+    def generate_candidates(
+        self,
+        file_diffs: List[Dict[str, str]],
+        count: int,
+        on_text: Optional[Callable[[str], None]] = None,
+        hint: Optional[str] = None,
+        fresh: bool = False
+    ) -> List[str]:
+        """
+        Generate several alternative commit messages on the routed model.
+
+        Args:
+            file_diffs: List of dicts with 'file' and 'diff' keys.
+            count: Number of alternatives to ask for.
+            on_text: If given, the response is streamed to it as it arrives.
+            hint: Extra guidance from the user.
+            fresh: Ask the model even if a cached response exists.
+
+        Returns:
+            The candidate messages; empty if failed.
+        """
+        return self._routed(file_diffs, lambda ai: ai.generate_candidates(file_diffs, count, on_text, hint=hint, fresh=fresh)) or []
+
+    def repair_commit_message(self, message: str, errors: List[str]) -> Optional[str]:
+        """
+        Ask the fast model to correct a rejected message.
+
+        The repair prompt holds only the message and the errors, so it is
+        always small.
+
+        Args:
+            message: The rejected commit message.
+            errors: Why the validators rejected it.
+
+        Returns:
+            The corrected message, or None if failed (see last_error).
+        """
+        repaired = self.fast.repair_commit_message(message, errors)
+        self.last_error = self.fast.last_error
+        self._last = self.fast
+        self._record(self.FAST, self.fast, 0, repair=True)
+        return repaired
+
+    def settle_response(self, is_valid: bool) -> None:
+        """
+        Cache or drop the last response on the model that produced it.
+
+        Args:
+            is_valid: Whether the validation chain accepted the message.
+
+        Returns:
+            None
+        """
+        if self._last is not None:
+            self._last.settle_response(is_valid)
+
+    def _routed(self, file_diffs: List[Dict[str, str]], request: Callable[[AIInterface], Any]) -> Any:
+        """
+        Make a request on the routed model, falling back to the fast one.
+
+        Args:
+            file_diffs: List of dicts with 'file' and 'diff' keys.
+            request: Makes the request on a given interface.
+
+        Returns:
+            The request's result; falsy if it failed (see last_error).
+        """
+        route, ai, tokens = self.route(file_diffs)
+        started = time.perf_counter()
+        result = request(ai)
+        self.last_error = ai.last_error
+
+        if not result and ai is self.strong:
+            self._record(route, ai, tokens, started=started, error=self.last_error)
+            route, ai = self.FALLBACK, self.fast
+            started = time.perf_counter()
+            result = request(ai)
+            self.last_error = ai.last_error
+
+        self._last = ai
+        self._record(route, ai, tokens, started=started)
+        return result
+
+    def _record(self, route: str, ai: AIInterface, tokens: int, started: Optional[float] = None, **fields: Any) -> None:
+        """
+        Record the route a request took.
+
+        Args:
+            route: FAST, STRONG or FALLBACK.
+            ai: The interface used.
+            tokens: Estimated prompt tokens the route was chosen on.
+            started: perf_counter() value when the request began, if timed.
+            **fields: Extra values to record.
+
+        Returns:
+            None
+        """
+        if self.timings is not None:
+            seconds = time.perf_counter() - started if started is not None else 0.0
+            self.timings.add(f"route:{route}", seconds, start=started, model=ai.model_name, tokens=tokens, **fields)
@@ -0,0 +1,333 @@
+from typing import Dict, List, Optional, Tuple
+from core.diff_parser import DiffParser
+from core.file_triage import FileTriage
+from core.git_interface import GitInterface
+
+
+class PromptBuilder:
+
+    # Rough average for code and English; good enough for budgeting
+    CHARS_PER_TOKEN = 4
+
+    # Markers code generators put near the top of their output
+    GENERATED_MARKERS = ('@generated', 'DO NOT EDIT', 'auto-generated', 'autogenerated')
+
+    def __init__(self, token_budget: int = 8000):
+        """
+        Initialize PromptBuilder.
+
+        Args:
+            token_budget: Approximate token limit for the whole prompt.
+        """
+        self.token_budget = token_budget
+
+    @classmethod
+    def estimate_tokens(cls, text: str) -> int:
+        """
+        Estimate the token count of a text.
+
+        Args:
+            text: The text to measure.
+
+        Returns:
+            Approximate number of tokens.
+        """
+        return (len(text) + cls.CHARS_PER_TOKEN - 1) // cls.CHARS_PER_TOKEN
+
+    @classmethod
+    def prepare(cls, item: Dict[str, str]) -> Dict[str, str]:
+        """
+        Work out the parts of a file's prompt entry that depend only on that file.
+
+        Called as each file passes scanning, so this work overlaps with
+        reading and scanning the rest; build() does it for files not yet
+        prepared.
+
+        Args:
+            item: Dict with 'file' and 'diff' keys; updated in place.
+
+        Returns:
+            The item, with 'added', 'removed', 'omit_reason' and 'prompt_diff'.
+        """
+        added, removed = DiffParser.line_stats(item['diff'])
+        reason = cls._low_value_reason(item)
+
+        diff = item['diff'] if reason else cls._drop_whitespace_hunks(item['diff'])
+        if not reason and not diff.strip():
+            reason = "whitespace-only"
+
+        item.update(added=added, removed=removed, omit_reason=reason, prompt_diff=diff)
+        return item
+
+    def build(self, template: str, file_diffs: List[Dict[str, str]]) -> str:
+        """
+        Fill a prompt template, splitting the diff budget fairly across files.
+
+        Args:
+            template: Prompt with {files_summary} and {diffs} placeholders.
+            file_diffs: List of dicts with 'file' and 'diff' keys.
+
+        Returns:
+            The prompt text.
+        """
+        renames = self._find_renames(file_diffs)
+        summary_lines = []
+        sections = []
+
+        for index, item in enumerate(file_diffs):
+            if 'prompt_diff' not in item:
+                self.prepare(item)
+            reason = renames.get(index) or item['omit_reason']
+
+            # Binary files staged as stats only have no line counts
+            notes = [f"+{item['added']} -{item['removed']}"] if item['added'] is not None else []
+            if reason:
+                notes.append(f"{reason}; diff omitted")
+            summary_lines.append(f"- {item['file']} ({', '.join(notes)})")
+
+            if not reason:
+                sections.append((f"=== {item['file']} ===\n", item['prompt_diff']))
+
+        files_summary = "\n".join(summary_lines)
+
+        # The file list is always sent; diffs share whatever budget is left
+        overhead = len(template.format(files_summary=files_summary, diffs=''))
+        budget = max(self.token_budget * self.CHARS_PER_TOKEN - overhead, 0)
+        budget -= 2 * max(len(sections) - 1, 0)
+
+        allowances = self._fair_shares([len(header) + len(diff) for header, diff in sections], budget)
+        diffs_text = "\n\n".join([
+            header + self._fit(diff, allowance - len(header))
+            for (header, diff), allowance in zip(sections, allowances)
+            if allowance > len(header)
+        ])
+
+        return template.format(files_summary=files_summary, diffs=diffs_text)
+
+    def diff_chars(self, file_diffs: List[Dict[str, str]]) -> int:
+        """
+        Measure the diff text the prompt would need to include in full.
+
+        Args:
+            file_diffs: List of dicts with 'file' and 'diff' keys.
+
+        Returns:
+            Characters of all diffs that are not omitted.
+        """
+        return sum(self._entry_size(item) for item in file_diffs)
+
+    def group(self, file_diffs: List[Dict[str, str]], max_groups: int) -> List[Tuple[str, List[Dict[str, str]]]]:
+        """
+        Split files into groups by directory, each small enough to summarize.
+
+        Directories too large for one group are split by subdirectory;
+        neighbouring small ones are packed together. Groups are at least a
+        prompt budget in size, and larger when that is what it takes to stay
+        within max_groups.
+
+        Args:
+            file_diffs: List of dicts with 'file' and 'diff' keys.
+            max_groups: Most groups to return.
+
+        Returns:
+            List of (label, files) in path order; the label names the
+            group's directories.
+        """
+        items = sorted(file_diffs, key=lambda item: item['file'])
+        sizes = [self._entry_size(item) for item in items]
+        total = sum(sizes)
+        limit = max(self.token_budget * self.CHARS_PER_TOKEN, -(-total // max(max_groups, 1)))
+
+        while True:
+            groups = self._pack(self._directories(items, sizes, limit), limit)
+            if len(groups) <= max(max_groups, 1):
+                break
+            # Packing leaves gaps; allow larger groups until few enough
+            limit += limit // 4 + 1
+
+        return [
+            (labels[0] if len(labels) == 1 else f"{labels[0]} (+{len(labels) - 1} more)", [items[index] for index in members])
+            for labels, members, _ in groups
+        ]
+
+    @staticmethod
+    def _directories(items: List[Dict[str, str]], sizes: List[int], limit: int) -> List[Tuple[str, List[int], int]]:
+        """
+        Find the shallowest directories whose files fit a group.
+
+        Args:
+            items: Files sorted by path.
+            sizes: Size of each file's prompt entry.
+            limit: Largest group size.
+
+        Returns:
+            List of (label, file indices, size) in path order; a directory
+            over the limit is split by subdirectory, and its own files form
+            one entry.
+        """
+        leaves: List[Tuple[str, List[int], int]] = []
+
+        def split(prefix: str, indices: List[int]) -> None:
+            children: Dict[str, List[int]] = {}
+            for index in indices:
+                rest = items[index]['file'][len(prefix):]
+                children.setdefault(rest.split('/', 1)[0] + '/' if '/' in rest else '', []).append(index)
+            for child, members in children.items():
+                size = sum(sizes[index] for index in members)
+                if child and size > limit and len(members) > 1:
+                    split(prefix + child, members)
+                else:
+                    leaves.append((prefix + child or prefix or './', members, size))
+
+        split('', list(range(len(items))))
+        leaves.sort(key=lambda leaf: items[leaf[1][0]]['file'])
+        return leaves
+
+    @staticmethod
+    def _pack(leaves: List[Tuple[str, List[int], int]], limit: int) -> List[Tuple[List[str], List[int], int]]:
+        """
+        Pack neighbouring directories into groups up to a size limit.
+
+        Args:
+            leaves: Entries from _directories().
+            limit: Largest group size; a larger directory is a group alone.
+
+        Returns:
+            List of (labels, file indices, size).
+        """
+        groups: List[Tuple[List[str], List[int], int]] = []
+        for label, members, size in leaves:
+            if groups and groups[-1][2] + size <= limit:
+                labels, packed, packed_size = groups[-1]
+                groups[-1] = (labels + [label], packed + members, packed_size + size)
+            else:
+                groups.append(([label], members, size))
+        return groups
+
+    @classmethod
+    def _entry_size(cls, item: Dict[str, str]) -> int:
+        """
+        Measure what a file adds to a prompt with its full diff.
+
+        Args:
+            item: Dict with 'file' and 'diff' keys; prepared if not yet.
+
+        Returns:
+            Characters of its diff, or of its summary line if omitted.
+        """
+        if 'prompt_diff' not in item:
+            cls.prepare(item)
+        if item['omit_reason']:
+            return len(item['file']) + 32
+        return len(item['prompt_diff'])
+
+    def _find_renames(self, file_diffs: List[Dict[str, str]]) -> Dict[int, str]:
+        """
+        Pair deleted and added files with identical content.
+
+        Args:
+            file_diffs: List of dicts with 'file', 'base_blob' and 'blob' keys.
+
+        Returns:
+            Mapping of file index to a note naming the other side.
+        """
+        deleted = {}
+        for index, item in enumerate(file_diffs):
+            if item.get('blob') == GitInterface.NULL_BLOB and item.get('base_blob'):
+                deleted.setdefault(item['base_blob'], index)
+
+        renames = {}
+        for index, item in enumerate(file_diffs):
+            if item.get('base_blob') == GitInterface.NULL_BLOB and item.get('blob') in deleted:
+                source = deleted.pop(item['blob'])
+                renames[index] = f"renamed from {file_diffs[source]['file']}"
+                renames[source] = f"renamed to {item['file']}"
+        return renames
+
+    @classmethod
+    def _low_value_reason(cls, item: Dict[str, str]) -> Optional[str]:
+        """
+        Decide whether a file's diff is worth sending to the model.
+
+        Args:
+            item: Dict with 'file' and 'diff' keys, and 'kind' if triaged.
+
+        Returns:
+            Why the diff is omitted, or None to keep it.
+        """
+        # Triaged files were already checked by path and .gitattributes
+        reason = FileTriage.path_reason(item['file']) if 'kind' not in item else None
+        if reason:
+            return reason
+
+        head = item['diff'][:2000]
+        if any(marker in head for marker in cls.GENERATED_MARKERS):
+            return "generated"
+        if '\nBinary files ' in head or head.startswith('Binary files '):
+            return "binary"
+
+        return None
+
+    @staticmethod
+    def _drop_whitespace_hunks(diff: str) -> str:
+        """
+        Remove hunks that only change whitespace.
+
+        Args:
+            diff: Unified diff text for one file.
+
+        Returns:
+            The diff without whitespace-only hunks, or '' if none are left.
+        """
+        header, hunks = DiffParser.split_hunks(diff)
+        if not hunks:
+            return diff
+
+        kept = [hunk for hunk in hunks if not DiffParser.is_whitespace_only(hunk)]
+        if not kept:
+            return ''
+        if len(kept) == len(hunks):
+            return diff
+        return '\n'.join(header + [line for hunk in kept for line in hunk])
+
+    @staticmethod
+    def _fair_shares(sizes: List[int], budget: int) -> List[int]:
+        """
+        Split a budget so small items get all they need and large ones share the rest.
+
+        Args:
+            sizes: Wanted size of each item.
+            budget: Total size available.
+
+        Returns:
+            Allowed size of each item, in input order.
+        """
+        shares = [0] * len(sizes)
+        remaining = budget
+        order = sorted(range(len(sizes)), key=lambda index: sizes[index])
+
+        for position, index in enumerate(order):
+            share = remaining // (len(order) - position)
+            shares[index] = min(sizes[index], share)
+            remaining -= shares[index]
+
+        return shares
+
+    @staticmethod
+    def _fit(diff: str, limit: int) -> str:
+        """
+        Cut a diff to a character limit on a line boundary.
+
+        Args:
+            diff: Unified diff text.
+            limit: Maximum number of characters.
+
+        Returns:
+            The diff, with a truncation note if it was cut.
+        """
+        if len(diff) <= limit:
+            return diff
+
+        note = "\n... (truncated)"
+        cut = diff.rfind('\n', 0, max(limit - len(note), 0))
+        return (diff[:cut] if cut > 0 else '') + note
@@ -0,0 +1,62 @@
+import threading
+import time
+from typing import Dict, Optional
+from core.ai_provider import AIProvider
+
+
+# Wraps a provider shared by many callers (e.g. batch mode's repositories)
+# so that together they stay within the API's request rate and concurrency.
+class RateLimitedModel(AIProvider):
+
+    def __init__(self, model: AIProvider, max_concurrent: int = 4, requests_per_minute: float = 0.0):
+        """
+        Initialize RateLimitedModel.
+
+        Args:
+            model: The provider requests are passed to.
+            max_concurrent: Most requests in flight at once; a streamed
+                request holds its slot only until the request is sent.
+            requests_per_minute: Requests started per minute, evenly
+                spaced (0 for no limit). Retries count as requests.
+        """
+        self.model = model
+        self.max_concurrent = max(max_concurrent, 1)
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def generate_content(self, prompt: str, stream: bool = False, request_options: Optional[Dict] = None):
+        """
+        Produce a response once a slot and the rate limit allow it.
+
+        Args:
+            prompt: The generation prompt.
+            stream: Return an iterator of chunks instead of one response.
+            request_options: Passed to the wrapped provider.
+
+        Returns:
+            The wrapped provider's response.
+        """
+        with self._slots:
+            self._wait_turn()
+            return self.model.generate_content(prompt, stream=stream, request_options=request_options)
+
+    def _wait_turn(self) -> None:
+        """
+        Sleep until this request's start time under the rate limit.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
@@ -0,0 +1,76 @@
+import hashlib
+from typing import Optional
+from core.json_cache import JsonCache
+
+
+class ResponseCache(JsonCache):
+
+    def __init__(self, path: str, max_entries: int = 500, ttl: Optional[float] = 86400):
+        """
+        Initialize ResponseCache.
+
+        Args:
+            path: JSON file the cache is persisted to.
+            max_entries: Entries kept on save; least recently used go first.
+            ttl: Seconds a cached response stays valid, or None for no expiry.
+        """
+        super().__init__(path, max_entries=max_entries, ttl=ttl)
+
+    @classmethod
+    def make_key(cls, model_name: str, prompt_version: int, prompt: str) -> str:
+        """
+        Derive the cache key for one model request.
+
+        Args:
+            model_name: Model the prompt is sent to.
+            prompt_version: Version of the prompt template.
+            prompt: The full prompt text.
+
+        Returns:
+            The cache key.
+        """
+        # Line endings and trailing whitespace do not change the request
+        normalized = '\n'.join(line.rstrip() for line in prompt.replace('\r\n', '\n').split('\n')).strip()
+        material = "\0".join([str(cls.FORMAT_VERSION), model_name, str(prompt_version), normalized])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_key.
+
+        Returns:
+            The cached response text, or None on a miss.
+        """
+        value = self.get_value(key)
+        return value["text"] if value is not None else None
+
+    def put(self, key: str, text: str) -> None:
+        """
+        Store a response and persist the cache.
+
+        Args:
+            key: Cache key from make_key.
+            text: The response text.
+
+        Returns:
+            None
+        """
+        self.put_value(key, {"text": text})
+        self.save()
+
+    def discard(self, key: str) -> None:
+        """
+        Remove a response, e.g. one that failed validation, and persist the cache.
+
+        Args:
+            key: Cache key from make_key.
+
+        Returns:
+            None
+        """
+        if self._load().pop(key, None) is not None:
+            self.dirty = True
+            self.save()
@@ -0,0 +1,82 @@
+import random
+import time
+from typing import Callable, Optional, TypeVar
+from core.ai_provider import TransientAIError
+
+T = TypeVar('T')
+
+
+class RetryPolicy:
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Initialize RetryPolicy.
+
+        Args:
+            max_attempts: Attempts in total, including the first.
+            base_delay: Backoff ceiling in seconds after the first failure;
+                it doubles after each further failure.
+            max_delay: Longest wait between attempts; a service asking for
+                a longer wait ends the retries instead.
+            sleep: Function used to wait.
+            rng: Random source for jitter.
+        """
+        self.max_attempts = max(max_attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Work out how long to wait before the next attempt.
+
+        Args:
+            attempt: Number of attempts made so far (1 after the first).
+            retry_after: Seconds the service asked us to wait, if it said.
+
+        Returns:
+            Seconds to wait.
+        """
+        if retry_after is not None:
+            # Never earlier than asked; a little jitter still avoids a stampede
+            return retry_after + self.rng.uniform(0, min(self.base_delay, retry_after / 10 + 0.1))
+        # "Full jitter": spreads out clients that failed at the same moment
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def call(
+        self,
+        action: Callable[[], T],
+        on_retry: Optional[Callable[[int, TransientAIError, float], None]] = None
+    ) -> T:
+        """
+        Run an action, retrying transient failures with backoff.
+
+        Args:
+            action: The request to make.
+            on_retry: Called with (attempt, error, delay) before each wait.
+
+        Returns:
+            The action's result.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return action()
+            except TransientAIError as e:
+                if attempt >= self.max_attempts:
+                    raise
+                if e.retry_after is not None and e.retry_after > self.max_delay:
+                    raise
+                wait = self.delay(attempt, e.retry_after)
+                if on_retry is not None:
+                    on_retry(attempt, e, wait)
+                self.sleep(wait)
@@ -0,0 +1,188 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+
+class Timings:
+
+    # Bump whenever the trace layout written by to_dict() changes
+    TRACE_VERSION = 1
+
+    # Event fields summed by totals()
+    SIZE_FIELDS = ("bytes", "chars", "tokens", "files")
+
+    def __init__(self):
+        """
+        Initialize Timings; the run's clock starts now.
+
+        Args:
+            None
+        """
+        self.started = time.perf_counter()
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Scan workers get an empty recorder and send their events back
+        return {"started": self.started, "events": []}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Time a block of code as one event.
+
+        Args:
+            name: Phase name, e.g. 'collect_changes'.
+            **fields: Extra values to record, such as 'file' or 'bytes'.
+
+        Returns:
+            Context manager yielding the fields dict, so sizes known only
+            at the end of the block can still be added to it.
+        """
+        start = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            self.add(name, time.perf_counter() - start, start=start, **fields)
+
+    def add(self, name: str, seconds: float, start: Optional[float] = None, **fields: Any) -> None:
+        """
+        Record an event timed elsewhere.
+
+        Args:
+            name: Phase name.
+            seconds: Duration of the event.
+            start: perf_counter() value when the event began, if known.
+            **fields: Extra values to record.
+
+        Returns:
+            None
+        """
+        event = {
+            "phase": name,
+            "start_ms": round((start - self.started) * 1000, 3) if start is not None else None,
+            "ms": round(seconds * 1000, 3),
+        }
+        event.update(fields)
+        with self._lock:
+            self.events.append(event)
+
+    def merge(self, events: List[Dict[str, Any]]) -> None:
+        """
+        Add events recorded in another process.
+
+        Args:
+            events: Events from that process's Timings.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            # Another process's clock has a different origin
+            self.events.extend(dict(event, start_ms=None) for event in events)
+
+    def totals(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Aggregate events by phase.
+
+        Args:
+            None
+
+        Returns:
+            Mapping of phase name to its count, total and max milliseconds,
+            and the sum of every numeric size field ('bytes', 'chars', ...).
+        """
+        totals: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            events = list(self.events)
+
+        for event in events:
+            entry = totals.setdefault(event["phase"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] = round(entry["total_ms"] + event["ms"], 3)
+            entry["max_ms"] = max(entry["max_ms"], event["ms"])
+            for key, value in event.items():
+                if key in self.SIZE_FIELDS and isinstance(value, int):
+                    entry[key] = entry.get(key, 0) + value
+        return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Build the machine-readable trace.
+
+        Args:
+            None
+
+        Returns:
+            Dict with the trace version, total wall time, per-phase totals
+            and every event in the order it finished.
+        """
+        with self._lock:
+            events = list(self.events)
+        return {
+            "version": self.TRACE_VERSION,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "totals": self.totals(),
+            "events": events,
+        }
+
+    def write(self, path: str) -> None:
+        """
+        Write the trace as JSON.
+
+        Args:
+            path: File to write.
+
+        Returns:
+            None
+        """
+        import json
+
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(self.to_dict(), handle, indent=2)
+            handle.write("\n")
+
+    def report(self) -> str:
+        """
+        Format per-phase totals as a table.
+
+        Args:
+            None
+
+        Returns:
+            The table text, slowest phase first.
+        """
+        totals = self.totals()
+        rows = sorted(totals.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+
+        width = max([len(name) for name in totals] + [len('total wall time')])
+
+        lines = [f"{'phase':<{width}} {'count':>5} {'total ms':>10} {'max ms':>9}  sizes"]
+        for name, entry in rows:
+            sizes = ", ".join(f"{key} {entry[key]}" for key in self.SIZE_FIELDS if key in entry)
+            lines.append(f"{name:<{width}} {entry['count']:>5} {entry['total_ms']:>10.1f} {entry['max_ms']:>9.1f}  {sizes}".rstrip())
+        lines.append(f"{'total wall time':<{width}} {'':>5} {(time.perf_counter() - self.started) * 1000:>10.1f}")
+        return "\n".join(lines)
+
+
+def timed(timings: Optional[Timings], name: str, **fields: Any) -> ContextManager[Dict[str, Any]]:
+    """
+    Time a block as a phase when timings are being recorded.
+
+    Args:
+        timings: The run's Timings, or None when timings are off.
+        name: Phase name.
+        **fields: Extra values to record.
+
+    Returns:
+        Context manager yielding the fields dict; a no-op one when timings
+        is None.
+    """
+    if timings is None:
+        return nullcontext(fields)
+    return timings.phase(name, **fields)
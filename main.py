@@ -1,33 +1,61 @@
 import sys
-import os
 import argparse
+from typing import TYPE_CHECKING, Optional, Union
 
 from core.git_interface import GitInterface
-from core.ai_interface import AIInterface
-from validators.api_key_validator import APIKeyValidator, SensitiveDataValidator
-from validators.format_validator import ConventionalCommitValidator, LengthValidator, ContentValidator
-from services.validation_chain import ValidationChain
-from services.commit_service import CommitService
-from cli.commit_cli import CommitCLI
-from config import settings
+from core.timings import Timings
 
-def setup_validation_chain() -> ValidationChain:
+if TYPE_CHECKING:
+    from core.ai_interface import AIInterface
+    from core.ai_provider import AIProvider
+    from core.model_router import ModelRouter
+    from services.commit_service import CommitService
+    from services.daemon_client import RemoteCommitService
+    from services.validation_chain import ValidationChain
+
+# Everything else is imported inside the functions that use it: loading
+# settings (.env), the validators and the AI SDK is wasted work on the
+# no-staged-changes fast path in main(), which pre-commit hooks hit most.
+
+def setup_validation_chain(use_cache: bool = True, timings: Optional[Timings] = None) -> 'ValidationChain':
     """
     Setup validation chain with all validators.
     
     Args:
-        None
+        use_cache: Whether to reuse scan results of unchanged blobs.
+        timings: Records per-validator timings, if given.
 
     Returns:
         An instance of ValidationChain with validators added.
     """
-    chain = ValidationChain()
+    from config import settings
+    from services.scan_cache import ScanCache
+    from services.validation_chain import ValidationChain
+    from validators.api_key_validator import APIKeyValidator, SensitiveDataValidator
+    from validators.entropy_validator import EntropyValidator
+    from validators.format_validator import ConventionalCommitValidator, LengthValidator, ContentValidator
+
+    scan_cache = None
+    if use_cache and settings.SCAN_CACHE:
+        scan_cache = ScanCache(settings.SCAN_CACHE_PATH, max_entries=settings.SCAN_CACHE_MAX_ENTRIES)
+
+    chain = ValidationChain(
+        added_lines_only=settings.SCAN_ADDED_LINES_ONLY,
+        scan_cache=scan_cache,
+        timings=timings
+    )
 
     if settings.CHECK_API_KEYS:
         chain.add_validator(APIKeyValidator())
     
     if settings.CHECK_SENSITIVE_DATA:
         chain.add_validator(SensitiveDataValidator())
+
+    if settings.CHECK_ENTROPY:
+        chain.add_validator(EntropyValidator(
+            thresholds={'hex': settings.ENTROPY_HEX_THRESHOLD, 'base64': settings.ENTROPY_BASE64_THRESHOLD},
+            min_length=settings.ENTROPY_MIN_LENGTH
+        ))
     
     if settings.ENFORCE_CONVENTIONAL_COMMITS:
         chain.add_validator(ConventionalCommitValidator())
@@ -49,8 +77,14 @@ def load_config() -> tuple:
     Returns:
         A tuple (api_key, model_name).
     """
+    from config import settings
+
     api_key = settings.GEMINI_API_KEY
     model_name = settings.GEMINI_MODEL
+
+    # The local stand-in model needs no key
+    if settings.AI_BACKEND == 'local':
+        return api_key or 'local', model_name
     
     if not api_key:
         print("✗ GEMINI_API_KEY not found")
@@ -73,9 +107,480 @@ def parse_arguments() -> argparse.Namespace:
     """
     parser = argparse.ArgumentParser(description="AI Commit Message Generator")
     parser.add_argument('--push', '-p', action='store_true', help='Push after commit')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore cached scan results and AI responses')
+    parser.add_argument('--stream', '-s', action='store_true', help='Show the message as it is generated')
+    parser.add_argument('--candidates', '-c', type=int, metavar='N', help='Generate N messages in one request and offer the best (default: CANDIDATES)')
+    parser.add_argument('--timings', action='store_true', help='Print how long each phase took')
+    parser.add_argument('--trace', metavar='FILE', help='Write per-phase timings and sizes as JSON')
+    parser.add_argument('--json', action='store_true', help='Run without prompts; print the message, findings and timings as JSON')
+    parser.add_argument('--stdin', action='store_true', help='With --json: read a unified diff from stdin instead of the staged changes')
+    parser.add_argument('--daemon', '-d', action='store_true', help='Use (and start if needed) a warm background daemon')
+    parser.add_argument('--stop-daemon', action='store_true', help="Stop this repository's daemon")
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    scan = commands.add_parser('scan', help='Scan committed files for secrets')
+    scan.add_argument('--history', action='store_true', help='Scan every file version in history, not just the current commit')
+    scan.add_argument('--rev', action='append', metavar='REV', help='Revision to scan from with --history (repeatable; default: all refs)')
+    scan.add_argument('--workers', type=int, metavar='N', help='Worker processes (default: SCAN_WORKERS)')
+    scan.add_argument('--max-blob-size', type=int, metavar='BYTES', help='Skip file versions larger than this (default: 1 MiB)')
+    scan.add_argument('--checkpoint', metavar='FILE', help='Resume file (default: under the scan cache directory)')
+    scan.add_argument('--restart', action='store_true', help='Ignore the checkpoint and scan everything again')
+
+    batch = commands.add_parser('batch', help='Generate messages for many repositories without prompting (JSON lines out)')
+    batch.add_argument('repos', nargs='*', metavar='REPO', help='Repository paths')
+    batch.add_argument('--from-file', metavar='FILE', help="Read repository paths from FILE, one per line ('-' for stdin)")
+    batch.add_argument('--jobs', '-j', type=int, metavar='N', help='Repositories processed at once (default: BATCH_JOBS)')
+    batch.add_argument('--max-requests', type=int, metavar='N', help='Model requests in flight at once (default: BATCH_MAX_REQUESTS)')
+    batch.add_argument('--rate', type=float, metavar='RPM', help='Model requests per minute, 0 for no limit (default: BATCH_REQUESTS_PER_MINUTE)')
+    batch.add_argument('--commit', action='store_true', help='Commit each generated message')
+    batch.add_argument('--push', action='store_true', help='Commit and push')
     return parser.parse_args()
 
 
+def build_ai_interface(
+    api_key: str,
+    model_name: str,
+    use_cache: bool = True,
+    timings: Optional[Timings] = None,
+    model: Optional['AIProvider'] = None,
+    fast_model: Optional['AIProvider'] = None
+) -> Union['AIInterface', 'ModelRouter']:
+    """
+    Build the AI interface from settings.
+
+    Args:
+        api_key: Gemini API key.
+        model_name: Gemini model name.
+        use_cache: Whether to reuse cached responses.
+        timings: Records prompt and request timings, if given.
+        model: Provider to use, e.g. one shared across repositories; built
+            from settings if not given.
+        fast_model: Provider for GEMINI_FAST_MODEL, likewise.
+
+    Returns:
+        A configured AIInterface, or a ModelRouter in front of two of them
+        when GEMINI_FAST_MODEL is set.
+    """
+    from config import settings
+    from core.ai_interface import AIInterface
+    from core.model_router import ModelRouter
+    from core.prompt_builder import PromptBuilder
+    from core.response_cache import ResponseCache
+    from core.retry_policy import RetryPolicy
+
+    response_cache = None
+    if use_cache and settings.RESPONSE_CACHE:
+        response_cache = ResponseCache(
+            settings.RESPONSE_CACHE_PATH,
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            ttl=settings.RESPONSE_CACHE_TTL
+        )
+
+    def make(name: str, provider: Optional['AIProvider'], timeout: float, max_attempts: int) -> AIInterface:
+        return AIInterface(
+            api_key,
+            name,
+            response_cache=response_cache,
+            prompt_builder=PromptBuilder(token_budget=settings.PROMPT_TOKEN_BUDGET),
+            timeout=timeout,
+            model=provider or build_model(api_key, name),
+            timings=timings,
+            retry_policy=RetryPolicy(
+                max_attempts=max_attempts,
+                base_delay=settings.AI_RETRY_BASE_DELAY,
+                max_delay=settings.AI_RETRY_MAX_DELAY
+            ),
+            map_reduce_threshold=settings.MAP_REDUCE_THRESHOLD,
+            map_concurrency=settings.MAP_REDUCE_CONCURRENCY
+        )
+
+    fast_name = settings.GEMINI_FAST_MODEL
+    if not fast_name or fast_name == model_name:
+        return make(model_name, model, settings.AI_TIMEOUT, settings.AI_MAX_ATTEMPTS)
+
+    # The latency budget is the strong model's deadline: one attempt, then
+    # the fast model (with the usual timeout and retries) takes over
+    budget = settings.ROUTE_LATENCY_BUDGET
+    if budget > 0:
+        strong = make(model_name, model, budget, 1)
+    else:
+        strong = make(model_name, model, settings.AI_TIMEOUT, settings.AI_MAX_ATTEMPTS)
+    return ModelRouter(
+        make(fast_name, fast_model, settings.AI_TIMEOUT, settings.AI_MAX_ATTEMPTS),
+        strong,
+        fast_max_tokens=settings.ROUTE_FAST_MAX_TOKENS,
+        fast_max_files=settings.ROUTE_FAST_MAX_FILES,
+        timings=timings
+    )
+
+
+def build_model(api_key: str, model_name: str) -> 'AIProvider':
+    """
+    Build the AI provider selected by AI_BACKEND.
+
+    Args:
+        api_key: Gemini API key.
+        model_name: Gemini model name.
+
+    Returns:
+        The provider for the configured backend.
+    """
+    from config import settings
+
+    if settings.AI_BACKEND == 'local':
+        from core.local_model import LocalModel
+        return LocalModel()
+
+    if settings.AI_BACKEND == 'http':
+        from core.gemini_http_model import GeminiHttpModel
+        return GeminiHttpModel(api_key, model_name, base_url=settings.GEMINI_BASE_URL, timeout=settings.AI_TIMEOUT)
+
+    from core.gemini_sdk_model import GeminiSDKModel
+    return GeminiSDKModel(api_key, model_name)
+
+
+def build_commit_service(git: GitInterface, use_cache: bool, timings: Optional[Timings]) -> Optional['CommitService']:
+    """
+    Build the commit service from settings.
+
+    Args:
+        git: Git interface for the current repository.
+        use_cache: Whether to reuse cached scan results and AI responses.
+        timings: Records per-phase timings, if given.
+
+    Returns:
+        The CommitService, or None if the configuration is incomplete.
+    """
+    from config import settings
+    from services.commit_service import CommitService
+
+    api_key, model_name = load_config()
+    if not api_key:
+        return None
+
+    # Dependency injection; the AI client is only built once changes pass the scan
+    chain = setup_validation_chain(use_cache=use_cache, timings=timings)
+    return CommitService(
+        git,
+        None,
+        chain,
+        scan_workers=settings.SCAN_WORKERS,
+        parallel_scan_threshold=settings.PARALLEL_SCAN_THRESHOLD,
+        ai_factory=lambda: build_ai_interface(api_key, model_name, use_cache=use_cache, timings=timings),
+        timings=timings,
+        candidates=settings.CANDIDATES,
+        repair_attempts=settings.REPAIR_ATTEMPTS
+    )
+
+
+def run(git: GitInterface, args: argparse.Namespace, timings: Optional[Timings]) -> int:
+    """
+    Run the commit workflow once staged changes are known to exist.
+
+    Args:
+        git: Git interface for the current repository.
+        args: Parsed command-line arguments.
+        timings: Records per-phase timings, if given.
+
+    Returns:
+        Exit code (0 for success, 1 for failure).
+    """
+    from cli.commit_cli import CommitCLI
+
+    service = connect_daemon(git, args) if args.daemon else None
+    if service is None:
+        service = build_commit_service(git, use_cache=not args.no_cache, timings=timings)
+    if service is None:
+        return 1
+
+    cli = CommitCLI(service, should_push=args.push, stream=args.stream, candidates=args.candidates)
+    return cli.run()
+
+
+def run_headless(git: GitInterface, args: argparse.Namespace, timings: Timings) -> int:
+    """
+    Generate a message without prompting, for CI and bots.
+
+    Args:
+        git: Git interface for the current repository.
+        args: Parsed command-line arguments.
+        timings: Records per-phase timings for the JSON output.
+
+    Returns:
+        Exit code from HeadlessCLI (0, or one per kind of failure).
+    """
+    import contextlib
+    from cli.headless_cli import HeadlessCLI
+
+    # Decoded without universal newlines: a bare '\r' is file content, not a line end
+    diff = sys.stdin.buffer.read().decode('utf-8', errors='replace').replace('\r\n', '\n') if args.stdin else None
+
+    # Only the JSON result goes to stdout; anything else printed on the way
+    # (configuration errors, warnings) goes to stderr
+    output = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        service = build_commit_service(git, use_cache=not args.no_cache, timings=timings)
+        cli = HeadlessCLI(service, timings, candidates=args.candidates, output=output)
+        if diff is None and service is not None and not git.has_staged_changes():
+            return cli.emit({
+                "status": "no_changes", "message": None, "alternatives": [], "files": [], "findings": [],
+                "errors": ["No staged changes found."],
+            })
+        return cli.run(diff)
+
+
+def connect_daemon(git: GitInterface, args: argparse.Namespace) -> Optional['RemoteCommitService']:
+    """
+    Connect to this repository's warm daemon, starting it if needed.
+
+    Args:
+        git: Git interface for the current repository.
+        args: Parsed command-line arguments.
+
+    Returns:
+        A service backed by the daemon, or None to run in-process instead.
+    """
+    import socket
+
+    if not hasattr(socket, 'AF_UNIX'):
+        print("⚠ Daemon mode needs Unix sockets; running without it")
+        return None
+
+    from services.daemon_client import DaemonUnavailable, RemoteCommitService
+
+    service = RemoteCommitService(git, git.get_repo_root(), use_cache=not args.no_cache)
+    try:
+        service.connect()
+    except (OSError, DaemonUnavailable) as e:
+        print(f"⚠ Daemon unavailable ({e}); running without it")
+        return None
+    return service
+
+
+def serve(git: GitInterface) -> int:
+    """
+    Run the warm daemon for the current repository in the foreground.
+
+    Args:
+        git: Git interface for the current repository.
+
+    Returns:
+        Exit code.
+    """
+    from services.daemon_client import code_fingerprint, socket_path
+
+    # Before settings are imported: loading .env changes the environment
+    # the fingerprint covers, and clients compute theirs without it
+    fingerprint = code_fingerprint()
+
+    from config import settings
+    from services.daemon import CommitDaemon
+
+    repo_root = git.get_repo_root()
+    if not load_config()[0]:
+        return 1
+
+    daemon = CommitDaemon(
+        lambda use_cache: build_commit_service(git, use_cache=use_cache, timings=None),
+        repo_root,
+        socket_path(repo_root),
+        fingerprint,
+        idle_timeout=settings.DAEMON_IDLE_TIMEOUT
+    )
+    return daemon.serve()
+
+
+def stop_daemon(git: GitInterface) -> int:
+    """
+    Stop the current repository's daemon, if one is running.
+
+    Args:
+        git: Git interface for the current repository.
+
+    Returns:
+        Exit code (0 whether or not a daemon was running, 1 if its socket
+        belongs to another user).
+    """
+    from services.daemon_client import DaemonUnavailable, RemoteCommitService
+
+    try:
+        stopped = RemoteCommitService(git, git.get_repo_root()).stop()
+    except DaemonUnavailable as e:
+        print(f"✗ {e}")
+        return 1
+    print("✓ Daemon stopped" if stopped else "✓ No daemon running")
+    return 0
+
+
+def scan_repository(git: GitInterface, args: argparse.Namespace) -> int:
+    """
+    Scan committed file versions for secrets, resuming an interrupted scan.
+
+    Args:
+        git: Git interface for the current repository.
+        args: Parsed command-line arguments.
+
+    Returns:
+        Exit code (0 if nothing was found, 1 otherwise).
+    """
+    import hashlib
+    import os
+    from config import settings
+    from services.history_scanner import HistoryScanner, ScanCheckpoint
+
+    repo_root = git.get_repo_root()
+    chain = setup_validation_chain(use_cache=False)
+    revisions = (args.rev or ['--all']) if args.history else ['--no-walk', 'HEAD']
+
+    # One checkpoint per repository and set of revisions
+    repo_key = hashlib.sha256(os.path.realpath(repo_root).encode('utf-8')).hexdigest()[:16]
+    revisions_key = hashlib.sha256('\n'.join(sorted(revisions)).encode('utf-8')).hexdigest()[:16]
+    checkpoint_path = args.checkpoint or os.path.join(
+        os.path.dirname(settings.SCAN_CACHE_PATH),
+        'history',
+        f"{repo_key}-{revisions_key}.txt"
+    )
+    checkpoint = ScanCheckpoint(checkpoint_path, chain.fingerprint())
+    resumed = checkpoint.open(restart=args.restart)
+    if resumed:
+        print(f"↻ Resuming: {resumed} file versions already scanned", file=sys.stderr)
+
+    def on_finding(blob: str, path: str, findings: list) -> None:
+        # Matched text is never kept or printed: scan output ends up in CI logs
+        print(f"\r🔒 {path} (blob {blob})")
+        for finding_type, line in findings:
+            print(f"  {finding_type} ({path}:{line})")
+
+    def on_progress(stats: dict) -> None:
+        rate = stats["bytes"] / max(stats["seconds"], 1e-9) / 1e6
+        print(f"\r🔍 {stats['blobs']} scanned, {stats['bytes'] / 1e6:.1f} MB, {rate:.1f} MB/s", end="", file=sys.stderr, flush=True)
+
+    scanner = HistoryScanner(
+        git,
+        chain,
+        checkpoint,
+        workers=settings.SCAN_WORKERS if args.workers is None else args.workers,
+        max_blob_size=args.max_blob_size or HistoryScanner.MAX_BLOB_SIZE,
+        on_finding=on_finding,
+        on_progress=on_progress
+    )
+    try:
+        stats = scanner.scan(revisions)
+    except KeyboardInterrupt:
+        print(f"\n✗ Interrupted; run again to resume ({checkpoint_path})", file=sys.stderr)
+        return 1
+    except RuntimeError as e:
+        print(f"\n✗ {e}", file=sys.stderr)
+        return 1
+
+    rate = stats["bytes"] / max(stats["seconds"], 1e-9) / 1e6
+    print(f"\r✓ Scanned {stats['blobs']} file versions ({stats['bytes'] / 1e6:.1f} MB) in {stats['seconds']:.1f}s, {rate:.1f} MB/s; "
+          f"skipped {stats['resumed']} already scanned, {stats['binary']} binary, {stats['too_large']} too large", file=sys.stderr)
+    if stats["with_findings"]:
+        print(f"✗ Secrets found in {stats['with_findings']} file version(s); "
+              f"find the commits with: git log --all --find-object=<blob>")
+        return 1
+    return 0
+
+
+def run_batch(args: argparse.Namespace, timings: Optional[Timings]) -> int:
+    """
+    Generate messages for many repositories concurrently, without prompting.
+
+    One JSON object per repository is printed to stdout as it finishes.
+
+    Args:
+        args: Parsed command-line arguments.
+        timings: Records per-phase timings across all repositories, if given.
+
+    Returns:
+        Exit code (0 if every repository with changes got a valid message,
+        1 otherwise).
+    """
+    import json
+    from config import settings
+    from core.rate_limited_model import RateLimitedModel
+    from services.batch_runner import BatchRunner
+    from services.commit_service import CommitService
+
+    repos = list(args.repos)
+    if args.from_file:
+        try:
+            with (sys.stdin if args.from_file == '-' else open(args.from_file, 'r', encoding='utf-8')) as handle:
+                repos.extend(line.strip() for line in handle if line.strip())
+        except OSError as e:
+            print(f"✗ {e}", file=sys.stderr)
+            return 1
+    if not repos:
+        print("✗ No repositories given", file=sys.stderr)
+        return 1
+
+    api_key, model_name = load_config()
+    if not api_key:
+        return 1
+
+    # Shared by every repository: one client and connection pool, one
+    # request budget, and validators compiled once. Caches are left out;
+    # they are not safe to write from several threads.
+    def shared_model(name: str) -> RateLimitedModel:
+        return RateLimitedModel(
+            build_model(api_key, name),
+            max_concurrent=args.max_requests or settings.BATCH_MAX_REQUESTS,
+            requests_per_minute=settings.BATCH_REQUESTS_PER_MINUTE if args.rate is None else args.rate
+        )
+
+    # The fast model, when routing is on, has its own limits: quotas are per model
+    model = shared_model(model_name)
+    fast_model = shared_model(settings.GEMINI_FAST_MODEL) if settings.GEMINI_FAST_MODEL else None
+    chain = setup_validation_chain(use_cache=False, timings=timings)
+
+    def make_service(repo: str) -> CommitService:
+        return CommitService(
+            GitInterface(timings=timings, repo_path=repo),
+            None,
+            chain,
+            ai_factory=lambda: build_ai_interface(
+                api_key, model_name, use_cache=False, timings=timings, model=model, fast_model=fast_model
+            ),
+            timings=timings,
+            candidates=settings.CANDIDATES,
+            repair_attempts=settings.REPAIR_ATTEMPTS
+        )
+
+    def on_result(result: dict) -> None:
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+
+    runner = BatchRunner(make_service, jobs=args.jobs or settings.BATCH_JOBS, commit=args.commit, push=args.push, on_result=on_result)
+    results = runner.run(repos)
+
+    counts: dict = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    print("✓ " + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())), file=sys.stderr)
+    return 1 if any(status in counts for status in ('blocked', 'invalid', 'ai_failure', 'failed')) else 0
+
+
+def report_timings(timings: Timings, args: argparse.Namespace) -> None:
+    """
+    Print and/or save the run's timings.
+
+    Args:
+        timings: The run's recorded timings.
+        args: Parsed command-line arguments.
+
+    Returns:
+        None
+    """
+    if args.timings:
+        print("\n" + timings.report(), file=sys.stderr)
+    if args.trace:
+        try:
+            timings.write(args.trace)
+        except OSError as e:
+            print(f"✗ Could not write trace: {e}", file=sys.stderr)
+
+
 def main() -> int:
     """
     Main entry point.
@@ -87,19 +592,39 @@ def main() -> int:
         Exit code (0 for success, 1 for failure).
     """
     args = parse_arguments()
-    
-    api_key, model_name = load_config()
-    if not api_key:
+    # Headless runs always report timings in their output
+    timings = Timings() if args.timings or args.trace or args.json or args.stdin else None
+    git = GitInterface(timings=timings)
+
+    if args.serve:
+        return serve(git)
+    if args.stop_daemon:
+        return stop_daemon(git)
+    if args.command == 'scan':
+        return scan_repository(git, args)
+    if args.command == 'batch':
+        try:
+            return run_batch(args, timings)
+        finally:
+            if timings is not None:
+                report_timings(timings, args)
+
+    if args.json or args.stdin:
+        try:
+            return run_headless(git, args, timings)
+        finally:
+            report_timings(timings, args)
+
+    # Fast path for hook runs with nothing staged: no settings, no AI SDK
+    if not git.has_staged_changes():
+        print("✗ No staged changes found.")
         return 1
-    
-    # Dependency injection
-    git = GitInterface()
-    ai = AIInterface(api_key, model_name)
-    chain = setup_validation_chain()
-    service = CommitService(git, ai, chain)
-    cli = CommitCLI(service, should_push=args.push)
-    
-    return cli.run()
+
+    try:
+        return run(git, args, timings)
+    finally:
+        if timings is not None:
+            report_timings(timings, args)
 
 
 if __name__ == '__main__':
@@ -1,4 +1,21 @@
-from services.validation_chain import ValidationChain
-from services.commit_service import CommitService
+from importlib import import_module
 
-__all__ = ['ValidationChain', 'CommitService']
\ No newline at end of file
+# Exports resolve on first access, so the daemon's thin client can import
+# services.daemon_client without loading validators, caches or the AI stack.
+_EXPORTS = {
+    'ScanCache': 'services.scan_cache',
+    'ValidationChain': 'services.validation_chain',
+    'CommitService': 'services.commit_service',
+    'CommitDaemon': 'services.daemon',
+    'RemoteCommitService': 'services.daemon_client',
+    'HistoryScanner': 'services.history_scanner',
+    'BatchRunner': 'services.batch_runner',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module 'services' has no attribute {name!r}")
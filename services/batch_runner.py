@@ -0,0 +1,130 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+from services.commit_service import CommitService
+
+
+class BatchRunner:
+
+    # Outcomes that count as success; "no_changes" is reported but not a failure
+    SUCCESS_STATUSES = ('generated', 'committed', 'pushed')
+
+    def __init__(
+        self,
+        make_service: Callable[[str], CommitService],
+        jobs: int = 8,
+        commit: bool = False,
+        push: bool = False,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        """
+        Initialize BatchRunner.
+
+        Args:
+            make_service: Builds the commit service for a repository path;
+                services may share an AI provider and validation chain but
+                not caches.
+            jobs: Repositories processed at once.
+            commit: Commit each generated message.
+            push: Push after committing.
+            on_result: Called with each repository's result as it finishes.
+        """
+        self.make_service = make_service
+        self.jobs = max(jobs, 1)
+        self.commit = commit or push
+        self.push = push
+        self.on_result = on_result
+
+    def run(self, repos: List[str]) -> List[Dict[str, Any]]:
+        """
+        Generate (and optionally commit) a message in every repository.
+
+        Each repository runs on its own thread; an error, a security block
+        or an invalid message in one is recorded in its result and does not
+        affect the others.
+
+        Args:
+            repos: Repository paths.
+
+        Returns:
+            One result per repository, in input order: 'repo', 'status'
+            ('generated', 'committed', 'pushed', 'no_changes', 'blocked',
+            'invalid', 'ai_failure' or 'failed'), 'ok', 'message',
+            'alternatives', 'files', 'errors' and 'seconds'.
+        """
+        results: List[Dict[str, Any]] = [{} for _ in repos]
+        with ThreadPoolExecutor(max_workers=min(self.jobs, max(len(repos), 1))) as pool:
+            futures = {pool.submit(self._run_one, repo): index for index, repo in enumerate(repos)}
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+                if self.on_result is not None:
+                    self.on_result(result)
+        return results
+
+    def _run_one(self, repo: str) -> Dict[str, Any]:
+        """
+        Process one repository, turning any error into a failed result.
+
+        Args:
+            repo: Repository path.
+
+        Returns:
+            The repository's result.
+        """
+        started = time.monotonic()
+        result: Dict[str, Any] = {
+            "repo": repo, "status": "failed", "message": None, "alternatives": [], "files": 0, "errors": [],
+        }
+        try:
+            result.update(self._process(repo))
+        except Exception as e:
+            result["errors"] = [str(e) or type(e).__name__]
+        result["ok"] = result["status"] in self.SUCCESS_STATUSES
+        result["seconds"] = round(time.monotonic() - started, 3)
+        return result
+
+    def _process(self, repo: str) -> Dict[str, Any]:
+        """
+        Collect, scan, generate and optionally commit in one repository.
+
+        Args:
+            repo: Repository path.
+
+        Returns:
+            The result fields decided so far.
+        """
+        service = self.make_service(repo)
+        # Fails fast, with git's message, for a path that is not a repository
+        service.git.get_repo_root()
+        if not service.git.has_staged_changes():
+            return {"status": "no_changes"}
+
+        ok, file_diffs, errors = service.collect_changes()
+        if not ok:
+            return {"status": "blocked" if service.blocked else "failed", "errors": errors}
+
+        ok, message, alternatives, errors = service.generate_candidates(file_diffs)
+        outcome: Dict[str, Any] = {"files": len(file_diffs), "message": message, "alternatives": alternatives}
+        if not ok or not message:
+            # A rejected message is still returned; no message means the model failed
+            outcome.update(status="invalid" if message else "ai_failure", errors=errors or ["No message generated"])
+            return outcome
+        if not self.commit:
+            outcome["status"] = "generated"
+            return outcome
+
+        committed, output = service.execute_commit(message)
+        if not committed:
+            outcome.update(status="failed", errors=[f"Commit failed: {output}"])
+            return outcome
+        if not self.push:
+            outcome["status"] = "committed"
+            return outcome
+
+        pushed, output = service.execute_push()
+        if not pushed:
+            outcome.update(status="failed", errors=[f"Committed, but push failed: {output}"])
+            return outcome
+        outcome["status"] = "pushed"
+        return outcome
@@ -0,0 +1,64 @@
+import re
+from typing import List
+
+
+# Orders commit message candidates that already passed validation: a
+# specific type beats the catch-all 'modify', a scope adds context, and a
+# subject near IDEAL_SUBJECT_LENGTH is informative without being verbose.
+class CandidateRanker:
+
+    # Higher is more specific; unknown types rank with 'modify'
+    TYPE_SPECIFICITY = {
+        'fix': 5, 'feat': 5, 'revert': 5,
+        'refactor': 4, 'test': 4, 'docs': 4, 'build': 4, 'ci': 4,
+        'style': 3,
+        'modify': 0,
+    }
+
+    SUBJECT = re.compile(r'^(\w+)(\((.+?)\))?!?:\s*(.*)$')
+
+    def __init__(self, ideal_subject_length: int = 50):
+        """
+        Initialize CandidateRanker.
+
+        Args:
+            ideal_subject_length: Subject length that scores best.
+        """
+        self.ideal_subject_length = ideal_subject_length
+
+    def score(self, message: str) -> float:
+        """
+        Score one commit message.
+
+        Args:
+            message: A valid commit message.
+
+        Returns:
+            The score; higher is better.
+        """
+        subject = message.split('\n')[0].strip()
+        match = self.SUBJECT.match(subject)
+        if not match:
+            return float('-inf')
+
+        commit_type, _, scope, description = match.groups()
+        score = float(self.TYPE_SPECIFICITY.get(commit_type, 0))
+        if scope:
+            score += 1.0
+        # Lose a point per 10 characters away from the ideal length
+        score -= abs(len(subject) - self.ideal_subject_length) / 10
+        if len(description.split()) < 3:
+            score -= 2.0
+        return score
+
+    def rank(self, messages: List[str]) -> List[str]:
+        """
+        Order messages best first.
+
+        Args:
+            messages: Valid commit messages, in the model's order.
+
+        Returns:
+            The messages sorted by score; ties keep the model's order.
+        """
+        return sorted(messages, key=self.score, reverse=True)
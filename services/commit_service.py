@@ -1,6 +1,12 @@
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, Iterable, Iterator, List, Dict, Tuple, Optional
 from core.git_interface import GitInterface
 from core.ai_interface import AIInterface
+from core.diff_parser import DiffParser
+from core.file_triage import FileTriage
+from core.prompt_builder import PromptBuilder
+from core.timings import Timings, timed
+from services.candidate_ranker import CandidateRanker
+from services.pipeline import read_ahead
 from services.validation_chain import ValidationChain
 
 class CommitService:
@@ -8,12 +14,43 @@ class CommitService:
     def __init__(
         self,
         git_interface: GitInterface,
-        ai_interface: AIInterface,
-        validation_chain: ValidationChain
+        ai_interface: Optional[AIInterface],
+        validation_chain: ValidationChain,
+        scan_workers: int = 1,
+        parallel_scan_threshold: int = 0,
+        ai_factory: Optional[Callable[[], AIInterface]] = None,
+        timings: Optional[Timings] = None,
+        ranker: Optional[CandidateRanker] = None,
+        candidates: int = 1,
+        repair_attempts: int = 0
     ):
         self.git = git_interface
-        self.ai = ai_interface
+        self._ai = ai_interface
+        self.ai_factory = ai_factory
         self.validation_chain = validation_chain
+        self.scan_workers = scan_workers
+        self.parallel_scan_threshold = parallel_scan_threshold
+        self.timings = timings
+        self.ranker = ranker or CandidateRanker()
+        self.candidates = candidates
+        self.repair_attempts = repair_attempts
+        # Whether the last collect_changes was stopped by the security scan
+        self.blocked = False
+
+    @property
+    def ai(self) -> AIInterface:
+        """
+        The AI interface, built by ai_factory on first use.
+
+        Args:
+            None
+
+        Returns:
+            The AIInterface instance.
+        """
+        if self._ai is None and self.ai_factory is not None:
+            self._ai = self.ai_factory()
+        return self._ai
 
     def collect_changes(self) -> Tuple[bool, List[Dict[str, str]], List[str]]:
         """
@@ -25,56 +62,280 @@ class CommitService:
         Returns:
             A tuple (is_successful, changes, errors).
         """
+        self.blocked = False
         try:
-            if not self.git.has_staged_changes():
+            # One numstat pass classifies every file. Binary files are listed
+            # with their stats and never diffed; generated and vendored files
+            # are diffed and scanned like source, but the prompt only gets
+            # their stats
+            with timed(self.timings, "triage") as fields:
+                entries = FileTriage(self.git).triage()
+                triaged = {entry["file"]: entry for entry in entries}
+                file_diffs = [FileTriage.stats_item(entry) for entry in entries if entry["kind"] == FileTriage.BINARY]
+                fields.update(files=len(entries), stats_only=sum(entry["kind"] != FileTriage.SOURCE for entry in entries))
+            if not entries:
                 return False, [], ["No staged changes found."]
 
-            staged_files = self.git.get_staged_files()
-            if not staged_files:
-                return False, [], ["No staged files found."]
+            is_safe, errors = True, []
+            if len(file_diffs) < len(entries):
+                # One git process streams the other files' patch from a
+                # reader thread; each file is scanned as it arrives and, once
+                # it passes, prepared for the prompt while later files are
+                # still in flight
+                staged = read_ahead(self.git.iter_staged_diffs(pathspecs=FileTriage.pathspecs(entries)))
+                with timed(self.timings, "collect_changes") as fields:
+                    try:
+                        is_safe, errors = self.validation_chain.validate_diffs(
+                            self._tee(self._scanned(staged, triaged), file_diffs),
+                            workers=self.scan_workers,
+                            parallel_threshold=self.parallel_scan_threshold,
+                            on_passed=self._prepare
+                        )
+                    finally:
+                        staged.close()
+                    fields.update(files=len(file_diffs), blocked=not is_safe)
+
+            if not is_safe:
+                self.blocked = True
+                return False, [], errors
+
+            # Back into git order, with files triage did not see last
+            order = {path: index for index, path in enumerate(triaged)}
+            file_diffs.sort(key=lambda item: order.get(item["file"], len(order)))
+            return True, file_diffs, []
+
+        except Exception as e:
+            return False, [], [str(e)]
+
+    def collect_from_diff(self, diff: str) -> Tuple[bool, List[Dict[str, str]], List[str]]:
+        """
+        Collect changes from a unified diff instead of the repository.
+
+        Files are triaged by path as for staged changes (there are no
+        attributes to read): every non-binary file is scanned, and only
+        source files are diffed in the prompt.
 
-            file_diffs = []
-            for file_path in staged_files:
-                try:
-                    diff = self.git.get_file_diff(file_path)
-                    if diff:
-                        # Security check on diff
-                        is_safe, errors = self.validation_chain.validate_diff(diff)
-                        if not is_safe:
-                            return False, [], errors
+        Args:
+            diff: Unified diff text, e.g. piped from git diff.
 
-                        file_diffs.append({"file": file_path, "diff": diff})
-                except Exception as e:
-                    return False, [], [f"Failed to read {file_path}: {str(e)}"]
+        Returns:
+            A tuple (is_successful, changes, errors).
+        """
+        self.blocked = False
+        try:
+            with timed(self.timings, "collect_changes", source="diff") as fields:
+                file_diffs = []
+                scanned = []
+                for path, file_diff in DiffParser.split_files(diff):
+                    is_binary = '\nBinary files ' in file_diff or '\nGIT binary patch' in file_diff
+                    kind, reason = FileTriage.classify(path, is_binary, {})
+                    if kind == FileTriage.BINARY:
+                        item = FileTriage.stats_item({"file": path, "added": None, "removed": None, "kind": kind, "reason": reason})
+                    else:
+                        item = {"file": path, "diff": file_diff, "base_blob": "", "blob": "", "kind": kind}
+                        if reason:
+                            item["omit_reason"] = reason
+                        scanned.append(item)
+                    file_diffs.append(item)
+
+                is_safe, errors = self.validation_chain.validate_diffs(
+                    scanned,
+                    workers=self.scan_workers,
+                    parallel_threshold=self.parallel_scan_threshold,
+                    on_passed=self._prepare
+                )
+                stats_only = sum(item["kind"] != FileTriage.SOURCE for item in file_diffs)
+                fields.update(files=len(file_diffs), stats_only=stats_only, bytes=len(diff), blocked=not is_safe)
+
+            if not is_safe:
+                self.blocked = True
+                return False, [], errors
+            if not file_diffs:
+                return False, [], ["No changes found in the diff."]
 
             return True, file_diffs, []
 
         except Exception as e:
             return False, [], [str(e)]
 
-    def generate_commit_message(self, file_diffs: List[Dict[str, str]]) -> Tuple[bool, Optional[str], List[str]]:
+    @staticmethod
+    def _scanned(items: Iterable[Dict[str, str]], triaged: Dict[str, Dict[str, str]]) -> Iterator[Dict[str, str]]:
+        """
+        Drop binary files and tag the rest with their triage.
+
+        Args:
+            items: Staged diff records.
+            triaged: Entry of each staged file, from triage.
+
+        Returns:
+            Iterator over the records to scan.
+        """
+        for item in items:
+            entry = triaged.get(item["file"])
+            if entry is None:
+                item["kind"] = FileTriage.SOURCE
+            elif entry["kind"] == FileTriage.BINARY:
+                continue
+            else:
+                item["kind"] = entry["kind"]
+                if entry["reason"]:
+                    item["omit_reason"] = entry["reason"]
+            yield item
+
+    @staticmethod
+    def _prepare(item: Dict[str, str]) -> Dict[str, str]:
+        """
+        Prepare the prompt entry of a file that passed scanning.
+
+        Args:
+            item: Scanned record, tagged with its 'kind'; updated in place.
+
+        Returns:
+            The item: prepared in full for source files, reduced to its
+            stats (the diff is dropped) for generated and vendored ones.
+        """
+        if item.get("kind", FileTriage.SOURCE) == FileTriage.SOURCE:
+            return PromptBuilder.prepare(item)
+        added, removed = DiffParser.line_stats(item["diff"])
+        item.update(diff="", prompt_diff="", added=added, removed=removed)
+        return item
+
+    @staticmethod
+    def _tee(items: Iterable[Dict[str, str]], seen: List[Dict[str, str]]) -> Iterator[Dict[str, str]]:
+        """
+        Pass items through, keeping each one.
+
+        Args:
+            items: Items to pass through.
+            seen: List each item is appended to as it is read.
+
+        Returns:
+            Iterator over the same items.
+        """
+        for item in items:
+            seen.append(item)
+            yield item
+
+    def generate_commit_message(
+        self,
+        file_diffs: List[Dict[str, str]],
+        on_text: Optional[Callable[[str], None]] = None,
+        hint: Optional[str] = None,
+        fresh: bool = False
+    ) -> Tuple[bool, Optional[str], List[str]]:
         """
         Generate and validate commit message.
         
         Args:
             file_diffs (List[Dict[str, str]]): List of file diffs.
+            on_text: If given, the response is streamed and each chunk of
+                text is passed to it as it arrives.
+            hint: Extra guidance from the user for the model.
+            fresh: Ask the model again instead of using a cached response,
+                e.g. to regenerate a message the user rejected.
 
         Returns:
             A tuple (is_successful, commit_message, errors).
         """
         try:
-            message = self.ai.generate_commit_message(file_diffs)
+            if on_text is not None:
+                message = self.ai.stream_commit_message(file_diffs, on_text, hint=hint, fresh=fresh)
+            else:
+                message = self.ai.generate_commit_message(file_diffs, hint=hint, fresh=fresh)
             if not message:
-                return False, None, ["AI generation failed"]
+                reason = getattr(self.ai, 'last_error', None)
+                return False, None, [f"AI generation failed: {reason}" if reason else "AI generation failed"]
             
             is_valid, errors = self.validation_chain.validate_message(message)
+            self.ai.settle_response(is_valid)
             if not is_valid:
-                return False, message, errors
+                return self._repair(message, errors)
             
             return True, message, []
         except Exception as e:
             return False, None, [str(e)]
 
+    def generate_candidates(
+        self,
+        file_diffs: List[Dict[str, str]],
+        count: Optional[int] = None,
+        on_text: Optional[Callable[[str], None]] = None,
+        hint: Optional[str] = None,
+        fresh: bool = False
+    ) -> Tuple[bool, Optional[str], List[str], List[str]]:
+        """
+        Generate several commit messages in one request and pick the best valid one.
+
+        Args:
+            file_diffs (List[Dict[str, str]]): List of file diffs.
+            count: Number of candidates to ask for; the configured number
+                if None. With one, this is generate_commit_message.
+            on_text: If given, the response is streamed and each chunk of
+                text is passed to it as it arrives.
+            hint: Extra guidance from the user for the model.
+            fresh: Ask the model again instead of using a cached response.
+
+        Returns:
+            A tuple (is_successful, best_message, alternatives, errors);
+            alternatives are the other valid candidates, best first.
+        """
+        count = count or self.candidates
+        if count <= 1:
+            is_successful, message, errors = self.generate_commit_message(file_diffs, on_text, hint, fresh)
+            return is_successful, message, [], errors
+
+        try:
+            candidates = self.ai.generate_candidates(file_diffs, count, on_text, hint=hint, fresh=fresh)
+            if not candidates:
+                reason = getattr(self.ai, 'last_error', None)
+                return False, None, [], [f"AI generation failed: {reason}" if reason else "AI generation failed"]
+
+            valid = []
+            first_errors: List[str] = []
+            with timed(self.timings, "rank_candidates", candidates=len(candidates)) as fields:
+                for candidate in candidates:
+                    is_valid, errors = self.validation_chain.validate_message(candidate)
+                    if is_valid:
+                        valid.append(candidate)
+                    elif not first_errors:
+                        first_errors = errors
+                fields["valid"] = len(valid)
+                self.ai.settle_response(bool(valid))
+
+                ranked = self.ranker.rank(valid)
+            if not ranked:
+                is_successful, message, errors = self._repair(candidates[0], first_errors)
+                return is_successful, message, [], errors
+            return True, ranked[0], ranked[1:], []
+        except Exception as e:
+            return False, None, [], [str(e)]
+
+    def _repair(self, message: str, errors: List[str]) -> Tuple[bool, Optional[str], List[str]]:
+        """
+        Ask the model to fix a rejected message, up to repair_attempts times.
+
+        Args:
+            message: The rejected commit message.
+            errors: Why the validators rejected it.
+
+        Returns:
+            A tuple (is_successful, commit_message, errors); on failure, the
+            last rejected message and its errors.
+        """
+        for attempt in range(1, self.repair_attempts + 1):
+            with timed(self.timings, "repair", attempt=attempt) as fields:
+                repaired = self.ai.repair_commit_message(message, errors)
+                if not repaired:
+                    fields["ok"] = False
+                    break
+                is_valid, repaired_errors = self.validation_chain.validate_message(repaired)
+                self.ai.settle_response(is_valid)
+                fields["ok"] = is_valid
+            if is_valid:
+                return True, repaired, []
+            message, errors = repaired, repaired_errors
+        return False, message, errors
+
     def execute_commit(self, message: str) -> Tuple[bool, str]:
         """
         Execute git commit.
@@ -86,7 +347,9 @@ class CommitService:
             A tuple (is_successful, output_message).
         """
         try:
-            return (True, "Success") if self.git.commit(message) else (False, "Failed")
+            with timed(self.timings, "execute_commit"):
+                committed = self.git.commit(message)
+            return (True, "Success") if committed else (False, "Failed")
         except Exception as e:
             return False, str(e)        
 
@@ -101,6 +364,7 @@ class CommitService:
             A tuple (is_successful, output_message).
         """
         try:
-            return self.git.push()
+            with timed(self.timings, "execute_push"):
+                return self.git.push()
         except Exception as e:
             return False, str(e)
\ No newline at end of file
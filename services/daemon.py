@@ -0,0 +1,220 @@
+import os
+import socket
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from services.commit_service import CommitService
+from services.daemon_client import DaemonUnavailable, peer_uid, read_message, secure_runtime_directories, send_message
+
+
+class CommitDaemon:
+
+    # Seconds a connected client may take to send its next request
+    REQUEST_TIMEOUT = 120.0
+
+    def __init__(
+        self,
+        service_factory: Callable[[bool], CommitService],
+        repo_root: str,
+        socket_path: str,
+        fingerprint: str,
+        idle_timeout: float = 900.0
+    ):
+        """
+        Initialize CommitDaemon.
+
+        Args:
+            service_factory: Builds a CommitService; the argument says
+                whether it may use the scan and response caches.
+            repo_root: The one repository this daemon serves.
+            socket_path: Unix socket to listen on.
+            fingerprint: code_fingerprint() of the code the daemon runs.
+            idle_timeout: Seconds without a connection before exiting.
+        """
+        self.service_factory = service_factory
+        self.repo_root = os.path.realpath(repo_root)
+        self.socket_path = socket_path
+        self.fingerprint = fingerprint
+        self.idle_timeout = idle_timeout
+        self.services: Dict[bool, CommitService] = {}
+        self.stopping = False
+        # (id, service, changes) of the last collect, so a client can
+        # regenerate on a new connection without collecting again
+        self.session: Optional[Tuple[int, CommitService, List[Dict[str, str]]]] = None
+
+    def service(self, use_cache: bool) -> CommitService:
+        """
+        Get the warm service, building it on first use.
+
+        Args:
+            use_cache: Whether it may use the scan and response caches.
+
+        Returns:
+            The CommitService.
+        """
+        if use_cache not in self.services:
+            self.services[use_cache] = self.service_factory(use_cache)
+        return self.services[use_cache]
+
+    def serve(self) -> int:
+        """
+        Serve clients until stopped or idle for idle_timeout seconds.
+
+        Args:
+            None
+
+        Returns:
+            Exit code (0 after a normal shutdown, 1 if the socket is taken
+            or its directory is not private).
+        """
+        # Warm up before listening, so the first client does not pay for it
+        service = self.service(True)
+        _ = service.ai
+
+        try:
+            secure_runtime_directories()
+        except (OSError, DaemonUnavailable):
+            return 1
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            if not self._claim_socket(listener):
+                return 1
+            listener.listen(8)
+            listener.settimeout(self.idle_timeout)
+
+            # One client at a time: commits in one repository do not overlap,
+            # and the AI client's kept-alive connection stays on this thread
+            while not self.stopping:
+                try:
+                    connection, _ = listener.accept()
+                except socket.timeout:
+                    break
+                with connection:
+                    # Only the user who owns the daemon may use it
+                    uid = peer_uid(connection)
+                    if uid is not None and uid != os.getuid():
+                        continue
+                    connection.settimeout(self.REQUEST_TIMEOUT)
+                    self._handle(connection)
+            return 0
+        finally:
+            listener.close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def _claim_socket(self, listener: socket.socket) -> bool:
+        """
+        Bind the socket path, clearing it if a previous daemon died.
+
+        Args:
+            listener: Unbound Unix socket.
+
+        Returns:
+            True if bound, False if another daemon is listening.
+        """
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+                return False
+            except OSError:
+                os.unlink(self.socket_path)
+            finally:
+                probe.close()
+
+        try:
+            listener.bind(self.socket_path)
+        except OSError:
+            return False
+        os.chmod(self.socket_path, 0o600)
+        return True
+
+    def _handle(self, connection: socket.socket) -> None:
+        """
+        Answer one client's requests until it disconnects.
+
+        Args:
+            connection: The client connection.
+
+        Returns:
+            None
+        """
+        stream = connection.makefile('rb')
+        collected: Optional[List[Dict[str, str]]] = None
+        service: Optional[CommitService] = None
+        try:
+            while True:
+                request = read_message(stream)
+                if request is None:
+                    return
+                op = request.get("op")
+
+                if op == "hello":
+                    send_message(connection, self._hello(request))
+                elif op == "stop":
+                    self.stopping = True
+                    send_message(connection, {"ok": True})
+                    return
+                elif op == "collect":
+                    self._use_environment(request.get("env") or {})
+                    service = self.service(bool(request.get("use_cache", True)))
+                    ok, collected, errors = service.collect_changes()
+                    session = (self.session[0] + 1) if self.session else 1
+                    self.session = (session, service, collected)
+                    send_message(connection, {"ok": ok, "files": [item["file"] for item in collected], "errors": errors, "session": session})
+                elif op == "generate":
+                    if service is None and self.session and self.session[0] == request.get("session"):
+                        _, service, collected = self.session
+                    if service is None or not collected:
+                        send_message(connection, {"ok": False, "message": None, "alternatives": [], "errors": ["No changes collected"]})
+                        continue
+                    on_text = (lambda text: send_message(connection, {"text": text})) if request.get("stream") else None
+                    ok, message, alternatives, errors = service.generate_candidates(
+                        collected,
+                        request.get("candidates"),
+                        on_text=on_text,
+                        hint=request.get("hint"),
+                        fresh=bool(request.get("fresh"))
+                    )
+                    send_message(connection, {"ok": ok, "message": message, "alternatives": alternatives, "errors": errors})
+                else:
+                    send_message(connection, {"ok": False, "errors": [f"Unknown request: {op}"]})
+        except (OSError, ValueError):
+            # Client went away or sent garbage; serve the next one
+            return
+        finally:
+            stream.close()
+
+    @staticmethod
+    def _use_environment(variables: Dict[str, str]) -> None:
+        """
+        Run git with the client's GIT_* variables instead of the daemon's own.
+
+        A pre-commit hook, for one, points GIT_INDEX_FILE at the index being
+        committed; the daemon's values are from whichever client started it.
+
+        Args:
+            variables: The client's GIT_* variables.
+
+        Returns:
+            None
+        """
+        for name in [name for name in os.environ if name.startswith('GIT_') and name not in variables]:
+            del os.environ[name]
+        os.environ.update(variables)
+
+    def _hello(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Check that a client is talking to the right daemon.
+
+        Args:
+            request: The client's hello, with 'repo' and 'fingerprint'.
+
+        Returns:
+            The reply; not ok if the repository or code differs.
+        """
+        if os.path.realpath(request.get("repo") or '') != self.repo_root:
+            return {"ok": False, "error": f"daemon serves {self.repo_root}"}
+        if request.get("fingerprint") != self.fingerprint:
+            return {"ok": False, "error": "daemon runs different code or settings"}
+        return {"ok": True, "pid": os.getpid()}
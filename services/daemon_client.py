@@ -0,0 +1,489 @@
+import hashlib
+import json
+import os
+import re
+import socket
+import stat
+import struct
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from core.git_interface import GitInterface
+
+# Everything here stays cheap to import: a client run should cost one local
+# connection plus model time, with settings, validators and the AI SDK kept
+# warm in the daemon (services/daemon.py).
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(PACKAGE_ROOT, 'main.py')
+SETTINGS = os.path.join(PACKAGE_ROOT, 'config', 'settings.py')
+
+# Names of the environment variables settings.py reads; found in its source
+# because importing it would load .env into this process's environment
+SETTING_NAME = re.compile(r"os\.getenv\('(\w+)'")
+
+# Git variables holding paths, made absolute before they are sent: the
+# daemon runs in the repository root, the client maybe in a subdirectory
+GIT_PATH_VARIABLES = ('GIT_DIR', 'GIT_WORK_TREE', 'GIT_INDEX_FILE', 'GIT_OBJECT_DIRECTORY', 'GIT_COMMON_DIR')
+
+
+def runtime_directories() -> List[str]:
+    """
+    List the directories holding daemon sockets, outermost first.
+
+    Args:
+        None
+
+    Returns:
+        Directories that must exist and be private to this user.
+    """
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime:
+        return [os.path.join(runtime, 'lazzycommit')]
+    shared = os.path.join(os.environ.get('TMPDIR') or '/tmp', f"lazzycommit-{os.getuid()}")
+    return [shared, os.path.join(shared, 'lazzycommit')]
+
+
+def socket_path(repo_root: str) -> str:
+    """
+    Locate the daemon socket for a repository.
+
+    Each repository gets its own daemon, so caches, settings and in-flight
+    requests never mix between repositories.
+
+    Args:
+        repo_root: Top-level directory of the repository.
+
+    Returns:
+        Path of the Unix socket, in a directory only this user can access
+        (see secure_runtime_directories).
+    """
+    digest = hashlib.sha256(os.path.realpath(repo_root).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(runtime_directories()[-1], f"{digest}.sock")
+
+
+def secure_runtime_directories() -> None:
+    """
+    Create the socket directories, or check that nobody else controls them.
+
+    Under a shared /tmp another user could create the directory first and
+    plant a socket, so an existing directory must be a real directory (not
+    a symlink) owned by this user; it is then made private if it is not.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    Raises:
+        DaemonUnavailable: If a directory belongs to someone else.
+    """
+    for directory in runtime_directories():
+        try:
+            os.mkdir(directory, 0o700)
+        except FileExistsError:
+            pass
+        info = os.lstat(directory)
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+            raise DaemonUnavailable(f"{directory} is not a directory owned by you")
+        if stat.S_IMODE(info.st_mode) & 0o077:
+            os.chmod(directory, 0o700)
+
+
+def peer_uid(connection: socket.socket) -> Optional[int]:
+    """
+    Find the user on the other end of a Unix socket.
+
+    Args:
+        connection: Connected Unix socket.
+
+    Returns:
+        The peer's user ID, or None where SO_PEERCRED is not supported
+        (the directory checks are then the only protection).
+    """
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return None
+    credentials = connection.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    _, uid, _ = struct.unpack('3i', credentials)
+    return uid
+
+
+def settings_environment() -> Dict[str, str]:
+    """
+    Collect the environment variables that override settings.
+
+    Args:
+        None
+
+    Returns:
+        Each set variable read by config/settings.py, with its value.
+    """
+    try:
+        with open(SETTINGS, 'r', encoding='utf-8') as handle:
+            names = set(SETTING_NAME.findall(handle.read()))
+    except OSError:
+        return {}
+    return {name: os.environ[name] for name in sorted(names) if name in os.environ}
+
+
+def git_environment() -> Dict[str, str]:
+    """
+    Collect this invocation's git environment, e.g. GIT_INDEX_FILE in a hook.
+
+    Args:
+        None
+
+    Returns:
+        Every GIT_* variable, with path variables made absolute.
+    """
+    variables = {}
+    for name, value in os.environ.items():
+        if name.startswith('GIT_'):
+            variables[name] = os.path.abspath(value) if name in GIT_PATH_VARIABLES and value else value
+    return variables
+
+
+def code_fingerprint() -> str:
+    """
+    Fingerprint the code, .env files and settings variables a daemon was started with.
+
+    Must run before settings are imported, which loads .env into the
+    environment.
+
+    Args:
+        None
+
+    Returns:
+        Hex digest that changes when any source file, .env or a setting set
+        in the environment changes.
+    """
+    stamps = []
+    for directory in ('', 'cli', 'config', 'core', 'services', 'validators'):
+        path = os.path.join(PACKAGE_ROOT, directory)
+        try:
+            entries = sorted(os.scandir(path), key=lambda entry: entry.name)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.endswith('.py') or entry.name == '.env':
+                stamps.append(f"{directory}/{entry.name}:{entry.stat().st_mtime_ns}")
+    stamps.append(json.dumps(settings_environment(), sort_keys=True))
+    return hashlib.sha256("\n".join(stamps).encode('utf-8')).hexdigest()
+
+
+def send_message(connection: socket.socket, message: Dict[str, Any]) -> None:
+    """
+    Send one newline-delimited JSON message.
+
+    Args:
+        connection: Connected socket.
+        message: Message to send.
+
+    Returns:
+        None
+    """
+    connection.sendall(json.dumps(message).encode('utf-8') + b"\n")
+
+
+def read_message(stream) -> Optional[Dict[str, Any]]:
+    """
+    Read one newline-delimited JSON message.
+
+    Args:
+        stream: Binary file object over the socket.
+
+    Returns:
+        The message, or None if the other side closed the connection.
+    """
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line.decode('utf-8'))
+
+
+class DaemonUnavailable(Exception):
+    pass
+
+
+class RemoteCommitService:
+
+    # Seconds to wait for a freshly started daemon to accept connections
+    START_TIMEOUT = 15.0
+
+    def __init__(self, git_interface: GitInterface, repo_root: str, use_cache: bool = True):
+        """
+        Initialize RemoteCommitService.
+
+        Args:
+            git_interface: Git interface for committing and pushing locally.
+            repo_root: Top-level directory of the repository.
+            use_cache: Whether the daemon may use its scan and response caches.
+        """
+        self.git = git_interface
+        self.repo_root = os.path.realpath(repo_root)
+        self.use_cache = use_cache
+        self.socket_path = socket_path(self.repo_root)
+        self._connection: Optional[socket.socket] = None
+        self._stream = None
+        # Daemon-side id of the collected changes, for regenerating later
+        self.session: Optional[int] = None
+
+    def connect(self) -> None:
+        """
+        Connect to this repository's daemon, starting or replacing it if needed.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        Raises:
+            DaemonUnavailable: If no daemon can be reached or started.
+        """
+        fingerprint = code_fingerprint()
+        if self._try_connect():
+            reply = self._request({"op": "hello", "repo": self.repo_root, "fingerprint": fingerprint})
+            if reply.get("ok"):
+                return
+            # Started from older code or settings: replace it
+            self._request({"op": "stop"})
+            self.close()
+            self._wait_for_exit()
+
+        process = subprocess.Popen(
+            [sys.executable, MAIN, '--serve'],
+            cwd=self.repo_root,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        deadline = time.monotonic() + self.START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self._try_connect():
+                reply = self._request({"op": "hello", "repo": self.repo_root, "fingerprint": fingerprint})
+                if reply.get("ok"):
+                    return
+                raise DaemonUnavailable(reply.get("error") or "daemon rejected the connection")
+            if process.poll() is not None:
+                raise DaemonUnavailable(f"daemon exited with status {process.returncode}")
+            time.sleep(0.02)
+        raise DaemonUnavailable("daemon did not start in time")
+
+    def stop(self) -> bool:
+        """
+        Ask this repository's daemon to exit.
+
+        Args:
+            None
+
+        Returns:
+            True if a daemon was running.
+
+        Raises:
+            DaemonUnavailable: If the socket belongs to another user.
+        """
+        if not self._try_connect():
+            return False
+        self._request({"op": "stop"})
+        self.close()
+        return True
+
+    def close(self) -> None:
+        """
+        Close the connection to the daemon.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if self._connection is not None:
+            self._stream.close()
+            self._connection.close()
+        self._connection = None
+        self._stream = None
+
+    def collect_changes(self) -> Tuple[bool, List[Dict[str, str]], List[str]]:
+        """
+        Have the daemon collect and scan the staged changes.
+
+        Args:
+            None
+
+        Returns:
+            A tuple (is_successful, changes, errors); changes only carry
+            'file' names, the diffs stay in the daemon.
+        """
+        try:
+            if self._connection is None:
+                self.connect()
+            reply = self._request({"op": "collect", "use_cache": self.use_cache, "env": git_environment()})
+        except (OSError, ValueError, DaemonUnavailable) as e:
+            return False, [], [f"Daemon error: {e}"]
+        self.session = reply.get("session")
+        return reply.get("ok", False), [{"file": name} for name in reply.get("files", [])], reply.get("errors", [])
+
+    def generate_commit_message(
+        self,
+        file_diffs: List[Dict[str, str]],
+        on_text: Optional[Callable[[str], None]] = None
+    ) -> Tuple[bool, Optional[str], List[str]]:
+        """
+        Have the daemon generate and validate the message for the collected changes.
+
+        Args:
+            file_diffs: Changes from collect_changes (the daemon keeps the diffs).
+            on_text: If given, the response is streamed and each chunk of
+                text is passed to it as it arrives.
+
+        Returns:
+            A tuple (is_successful, commit_message, errors).
+        """
+        is_successful, message, _, errors = self.generate_candidates(file_diffs, 1, on_text)
+        return is_successful, message, errors
+
+    def generate_candidates(
+        self,
+        file_diffs: List[Dict[str, str]],
+        count: Optional[int] = None,
+        on_text: Optional[Callable[[str], None]] = None,
+        hint: Optional[str] = None,
+        fresh: bool = False
+    ) -> Tuple[bool, Optional[str], List[str], List[str]]:
+        """
+        Have the daemon generate candidates for the collected changes and pick the best.
+
+        Can be called again to regenerate: the daemon still holds the
+        changes and their prompt from collect_changes.
+
+        Args:
+            file_diffs: Changes from collect_changes (the daemon keeps the diffs).
+            count: Number of candidates; the daemon's configured number if None.
+            on_text: If given, the response is streamed and each chunk of
+                text is passed to it as it arrives.
+            hint: Extra guidance from the user for the model.
+            fresh: Ask the model again instead of using a cached response.
+
+        Returns:
+            A tuple (is_successful, best_message, alternatives, errors).
+        """
+        try:
+            if self._connection is None:
+                self.connect()
+            reply = self._request({
+                "op": "generate",
+                "session": self.session,
+                "candidates": count,
+                "hint": hint,
+                "fresh": fresh,
+                "stream": on_text is not None
+            }, on_text)
+        except (OSError, ValueError, DaemonUnavailable) as e:
+            return False, None, [], [f"Daemon error: {e}"]
+        finally:
+            # Free the daemon for other clients while the user reviews the message
+            self.close()
+        return reply.get("ok", False), reply.get("message"), reply.get("alternatives", []), reply.get("errors", [])
+
+    def execute_commit(self, message: str) -> Tuple[bool, str]:
+        """
+        Execute git commit.
+
+        Args:
+            message: Commit message.
+
+        Returns:
+            A tuple (is_successful, output_message).
+        """
+        try:
+            return (True, "Success") if self.git.commit(message) else (False, "Failed")
+        except Exception as e:
+            return False, str(e)
+
+    def execute_push(self) -> Tuple[bool, str]:
+        """
+        Execute git push.
+
+        Args:
+            None
+
+        Returns:
+            A tuple (is_successful, output_message).
+        """
+        try:
+            return self.git.push()
+        except Exception as e:
+            return False, str(e)
+
+    def _try_connect(self) -> bool:
+        """
+        Connect to the socket if a daemon of this user is listening on it.
+
+        Args:
+            None
+
+        Returns:
+            True if connected.
+
+        Raises:
+            DaemonUnavailable: If the socket directory or the daemon
+                belongs to another user.
+        """
+        secure_runtime_directories()
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.connect(self.socket_path)
+            uid = peer_uid(connection)
+        except OSError:
+            connection.close()
+            return False
+        if uid is not None and uid != os.getuid():
+            connection.close()
+            raise DaemonUnavailable(f"socket {self.socket_path} is served by another user")
+        self._connection = connection
+        self._stream = connection.makefile('rb')
+        return True
+
+    def _request(self, message: Dict[str, Any], on_text: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Send a request and wait for its reply.
+
+        Args:
+            message: The request.
+            on_text: Called with each streamed text event before the reply.
+
+        Returns:
+            The reply message.
+        """
+        if self._connection is None:
+            raise DaemonUnavailable("not connected")
+        send_message(self._connection, message)
+        while True:
+            reply = read_message(self._stream)
+            if reply is None:
+                self.close()
+                raise DaemonUnavailable("daemon closed the connection")
+            if "text" in reply:
+                if on_text is not None:
+                    on_text(reply["text"])
+                continue
+            return reply
+
+    def _wait_for_exit(self) -> None:
+        """
+        Wait for a stopped daemon to release its socket.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        deadline = time.monotonic() + self.START_TIMEOUT
+        while os.path.exists(self.socket_path) and time.monotonic() < deadline:
+            time.sleep(0.01)
@@ -0,0 +1,390 @@
+import json
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+from core.git_interface import GitInterface
+from services.validation_chain import ValidationChain
+
+# Set in each worker process by _init_worker
+_worker_chain: Optional[ValidationChain] = None
+
+
+def _init_worker(chain: ValidationChain) -> None:
+    global _worker_chain
+    _worker_chain = chain
+
+
+def _scan_batch(batch: List[Tuple[str, str, bytes]]) -> List[Tuple[str, str, List[Tuple[str, int]]]]:
+    return [(blob, path, _worker_chain.scan_text(HistoryScanner.decode(content))) for blob, path, content in batch]
+
+
+class ScanCheckpoint:
+
+    # Version 1 stored the matched text of each finding
+    FORMAT_VERSION = 2
+
+    def __init__(self, path: str, fingerprint: str, flush_interval: float = 2.0):
+        """
+        Initialize ScanCheckpoint.
+
+        The file is a JSON header line followed by one line per scanned
+        blob, appended as scans finish, so an interrupted scan loses at most
+        flush_interval seconds of work. Findings are kept as their type and
+        line only, never the matched text, and the file is readable by its
+        owner only.
+
+        Args:
+            path: Checkpoint file.
+            fingerprint: ValidationChain.fingerprint() of the scan; a
+                checkpoint from other patterns is discarded.
+            flush_interval: Seconds between writes to disk.
+        """
+        self.path = path
+        self.fingerprint = fingerprint
+        self.flush_interval = flush_interval
+        # Raw 20-byte (32 in SHA-256 repositories) IDs: a few million of
+        # them still fit in memory
+        self.scanned: Set[bytes] = set()
+        # Blob ID -> (path, findings) of each scanned blob with findings
+        self.findings: Dict[str, Tuple[str, List[Tuple[str, int]]]] = {}
+        self._file = None
+        self._flushed = time.monotonic()
+
+    def open(self, restart: bool = False) -> int:
+        """
+        Load the checkpoint, or start a new one.
+
+        Args:
+            restart: Ignore any existing checkpoint.
+
+        Returns:
+            Number of blobs already scanned.
+        """
+        header = json.dumps({"version": self.FORMAT_VERSION, "fingerprint": self.fingerprint})
+        if not restart and self._load(header):
+            self._file = self._open_private(os.O_APPEND)
+            return len(self.scanned)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        self._file = self._open_private(os.O_TRUNC)
+        self._file.write(header + "\n")
+        self._file.flush()
+        return 0
+
+    def __contains__(self, blob: str) -> bool:
+        return bytes.fromhex(blob) in self.scanned
+
+    def add(self, blob: str, path: str, findings: List[Tuple[str, int]]) -> None:
+        """
+        Record a scanned blob.
+
+        Args:
+            blob: Blob object ID.
+            path: Path the blob was scanned under.
+            findings: (type, line) of each finding, if any.
+
+        Returns:
+            None
+        """
+        self.scanned.add(bytes.fromhex(blob))
+        if findings:
+            self.findings[blob] = (path, findings)
+            self._file.write(f"{blob}\t{json.dumps({'path': path, 'findings': findings})}\n")
+        else:
+            self._file.write(f"{blob}\n")
+        if time.monotonic() - self._flushed >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write recorded blobs to disk.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if self._file is not None:
+            self._file.flush()
+        self._flushed = time.monotonic()
+
+    def close(self) -> None:
+        """
+        Flush and close the checkpoint file.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open_private(self, flag: int) -> TextIO:
+        """
+        Open the checkpoint for writing, readable by its owner only.
+
+        Args:
+            flag: os.O_APPEND to continue the file or os.O_TRUNC to start over.
+
+        Returns:
+            The open text file.
+        """
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | flag, 0o600)
+        # The mode only applies to a new file; a checkpoint written by an
+        # older version may still be world-readable
+        if hasattr(os, 'fchmod'):
+            os.fchmod(fd, 0o600)
+        return os.fdopen(fd, 'a' if flag == os.O_APPEND else 'w', encoding='utf-8')
+
+    def _load(self, header: str) -> bool:
+        """
+        Read a checkpoint written by a scan with the same patterns.
+
+        Args:
+            header: The header line this scan writes.
+
+        Returns:
+            True if the checkpoint exists and matches.
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as handle:
+                if handle.readline().rstrip('\n') != header:
+                    return False
+                for line in handle:
+                    blob, _, details = line.rstrip('\n').partition('\t')
+                    # A line cut short by an interruption is simply rescanned
+                    if len(blob) not in (40, 64) or not line.endswith('\n'):
+                        continue
+                    if details:
+                        entry = json.loads(details)
+                        findings = [(finding_type, int(line)) for finding_type, line in entry["findings"]]
+                        self.findings[blob] = (entry["path"], findings)
+                    self.scanned.add(bytes.fromhex(blob))
+        except (OSError, ValueError, KeyError, TypeError):
+            self.scanned = set()
+            self.findings = {}
+            return False
+        return True
+
+
+class HistoryScanner:
+
+    # Larger file versions are mostly data dumps and are skipped
+    MAX_BLOB_SIZE = 1024 * 1024
+
+    # Content handed to a worker at once; amortizes process round trips
+    BATCH_BYTES = 1024 * 1024
+
+    # Leading bytes checked for NUL to recognize binary files, as git does
+    BINARY_CHECK_BYTES = 8000
+
+    def __init__(
+        self,
+        git_interface: GitInterface,
+        validation_chain: ValidationChain,
+        checkpoint: ScanCheckpoint,
+        workers: int = 1,
+        max_blob_size: int = MAX_BLOB_SIZE,
+        on_finding: Optional[Callable[[str, str, List[Tuple[str, int]]], None]] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        """
+        Initialize HistoryScanner.
+
+        Args:
+            git_interface: Git interface for the repository.
+            validation_chain: Chain whose security validators are run.
+            checkpoint: Opened checkpoint; blobs in it are skipped, every
+                scanned blob is added to it, and scan() closes it.
+            workers: Worker processes (0 for one per CPU, 1 scans in-process).
+            max_blob_size: Skip blobs larger than this many bytes.
+            on_finding: Called with (blob, path, findings) for each blob
+                with findings, including those the checkpoint holds for
+                blobs this scan meets; each finding is its (type, line).
+            on_progress: Called about once a second with the running stats.
+        """
+        self.git = git_interface
+        self.validation_chain = validation_chain
+        self.checkpoint = checkpoint
+        self.workers = workers or os.cpu_count() or 1
+        self.max_blob_size = max_blob_size
+        self.on_finding = on_finding
+        self.on_progress = on_progress
+
+    def scan(self, revisions: List[str]) -> Dict[str, Any]:
+        """
+        Scan every file version reachable from the revisions.
+
+        Memory stays bounded: blobs stream from git, and at most two batches
+        per worker are in flight.
+
+        Args:
+            revisions: Revisions for git rev-list, e.g. ['--all'].
+
+        Returns:
+            Stats: blobs scanned and bytes read, blobs skipped (already
+            scanned, too large, binary), blobs with findings and elapsed
+            seconds.
+        """
+        stats: Dict[str, Any] = {
+            "blobs": 0, "bytes": 0, "resumed": 0, "too_large": 0, "binary": 0, "with_findings": 0, "seconds": 0.0,
+        }
+        started = time.monotonic()
+        reported = started
+        pool = self._start_pool() if self.workers > 1 else None
+        in_flight: Deque[Any] = deque()
+        batch: List[Tuple[str, str, bytes]] = []
+        batch_bytes = 0
+        # Checkpointed findings of skipped blobs; wanted() runs on git's
+        # feeder thread, so they are reported from this one
+        resumed: Deque[Tuple[str, str, List[Tuple[str, int]]]] = deque()
+
+        def wanted() -> Iterator[Tuple[str, str]]:
+            for blob, size, path in self.git.iter_history_blobs(revisions):
+                if blob in self.checkpoint:
+                    stats["resumed"] += 1
+                    stored = self.checkpoint.findings.get(blob)
+                    if stored is not None:
+                        resumed.append((blob, path, stored[1]))
+                elif size > self.max_blob_size:
+                    stats["too_large"] += 1
+                else:
+                    yield blob, path
+
+        contents = self.git.iter_blob_contents(wanted())
+        try:
+            for blob, path, content in contents:
+                while resumed:
+                    self._report(stats, *resumed.popleft())
+                stats["bytes"] += len(content)
+                if b'\0' in content[:self.BINARY_CHECK_BYTES]:
+                    stats["binary"] += 1
+                    self.checkpoint.add(blob, path, [])
+                    continue
+
+                batch.append((blob, path, content))
+                batch_bytes += len(content)
+                if batch_bytes >= self.BATCH_BYTES:
+                    self._dispatch(batch, pool, in_flight, stats)
+                    batch = []
+                    batch_bytes = 0
+
+                if self.on_progress is not None and time.monotonic() - reported >= 1.0:
+                    reported = time.monotonic()
+                    stats["seconds"] = reported - started
+                    self.on_progress(stats)
+
+            if batch:
+                self._dispatch(batch, pool, in_flight, stats)
+            while in_flight:
+                self._record(in_flight.popleft().result(), stats)
+            while resumed:
+                self._report(stats, *resumed.popleft())
+        finally:
+            contents.close()
+            if pool is not None:
+                for future in in_flight:
+                    future.cancel()
+                pool.shutdown(wait=True)
+            self.checkpoint.close()
+
+        stats["seconds"] = time.monotonic() - started
+        return stats
+
+    @staticmethod
+    def decode(content: bytes) -> str:
+        """
+        Decode file content for scanning.
+
+        Args:
+            content: Raw blob content.
+
+        Returns:
+            The text, with undecodable bytes replaced.
+        """
+        return content.decode('utf-8', errors='replace')
+
+    def _start_pool(self) -> Any:
+        """
+        Start the worker processes.
+
+        Args:
+            None
+
+        Returns:
+            The ProcessPoolExecutor, with its workers running.
+        """
+        # Imported here so single-worker scans skip loading multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.validation_chain,))
+        # Fork the workers now: forked later, they would inherit the pipe
+        # feeding "git cat-file --batch", which then never sees end of input
+        pool.submit(int).result()
+        return pool
+
+    def _dispatch(self, batch: List[Tuple[str, str, bytes]], pool: Any, in_flight: Deque[Any], stats: Dict[str, Any]) -> None:
+        """
+        Scan a batch in-process or hand it to the worker pool.
+
+        Args:
+            batch: (blob, path, content) entries.
+            pool: The worker pool, or None to scan in-process.
+            in_flight: Futures of batches being scanned, oldest first.
+            stats: Running stats.
+
+        Returns:
+            None
+        """
+        if pool is None:
+            self._record([
+                (blob, path, self.validation_chain.scan_text(self.decode(content)))
+                for blob, path, content in batch
+            ], stats)
+            return
+
+        # Bound memory: wait for the oldest batch before queueing too many
+        while len(in_flight) >= self.workers * 2:
+            self._record(in_flight.popleft().result(), stats)
+        in_flight.append(pool.submit(_scan_batch, batch))
+
+    def _record(self, results: List[Tuple[str, str, List[Tuple[str, int]]]], stats: Dict[str, Any]) -> None:
+        """
+        Checkpoint scanned blobs and report findings.
+
+        Args:
+            results: (blob, path, findings) entries.
+            stats: Running stats.
+
+        Returns:
+            None
+        """
+        for blob, path, findings in results:
+            stats["blobs"] += 1
+            self.checkpoint.add(blob, path, findings)
+            if findings:
+                self._report(stats, blob, path, findings)
+
+    def _report(self, stats: Dict[str, Any], blob: str, path: str, findings: List[Tuple[str, int]]) -> None:
+        """
+        Count and pass on a blob with findings.
+
+        Args:
+            stats: Running stats.
+            blob: Blob object ID.
+            path: Path the blob was found at.
+            findings: (type, line) of each finding.
+
+        Returns:
+            None
+        """
+        stats["with_findings"] += 1
+        if self.on_finding is not None:
+            self.on_finding(blob, path, findings)
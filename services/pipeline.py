@@ -0,0 +1,71 @@
+import queue
+import threading
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar('T')
+
+# Marks the end of the producer's items on the queue
+_DONE = object()
+
+
+class _Failure:
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def read_ahead(items: Iterable[T], maxsize: int = 8) -> Iterator[T]:
+    """
+    Iterate in a background thread, keeping a few items ready ahead of use.
+
+    Reading the next file's diff from git overlaps with whatever the consumer
+    does with the current one. The producer's exceptions are re-raised here.
+
+    Args:
+        items: Iterable to read from, e.g. GitInterface.iter_staged_diffs().
+        maxsize: Most items buffered before the producer waits.
+
+    Returns:
+        Iterator over the same items, in order.
+    """
+    buffer: 'queue.Queue' = queue.Queue(maxsize=max(maxsize, 1))
+    stopped = threading.Event()
+
+    def offer(value) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        iterator = iter(items)
+        try:
+            for item in iterator:
+                if not offer(item):
+                    break
+            else:
+                offer(_DONE)
+        except BaseException as e:
+            offer(_Failure(e))
+        finally:
+            # Lets generators such as iter_staged_diffs stop their git process
+            close = getattr(iterator, 'close', None)
+            if callable(close):
+                close()
+
+    producer = threading.Thread(target=produce, name='read-ahead', daemon=True)
+    producer.start()
+    try:
+        while True:
+            value = buffer.get()
+            if value is _DONE:
+                return
+            if isinstance(value, _Failure):
+                raise value.error
+            yield value
+    finally:
+        stopped.set()
+        producer.join()
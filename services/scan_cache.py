@@ -0,0 +1,71 @@
+import hashlib
+from typing import Dict, List, Optional, Tuple
+from core.json_cache import JsonCache
+
+
+class ScanCache(JsonCache):
+
+    # Version 2 stored findings with the full matched text; a version
+    # change empties the file on the next save
+    FORMAT_VERSION = 3
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        """
+        Initialize ScanCache.
+
+        Args:
+            path: JSON file the cache is persisted to.
+            max_entries: Entries kept on save; least recently used go first.
+        """
+        super().__init__(path, max_entries=max_entries)
+
+    @classmethod
+    def make_key(cls, fingerprint: str, item: Dict[str, str]) -> Optional[str]:
+        """
+        Derive the cache key for one staged file.
+
+        Args:
+            fingerprint: Hash of the active validator configuration.
+            item: Dict with 'file', 'base_blob' and 'blob' keys.
+
+        Returns:
+            The cache key, or None if the item has no blob IDs.
+        """
+        blob = item.get("blob")
+        base_blob = item.get("base_blob")
+        if not blob or not base_blob:
+            return None
+
+        # The scanned diff depends on both sides; the path appears in findings
+        material = "\0".join([str(cls.FORMAT_VERSION), fingerprint, item["file"], base_blob, blob])
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[bool, List[str]]]:
+        """
+        Look up a cached scan result.
+
+        Args:
+            key: Cache key from make_key.
+
+        Returns:
+            A tuple (is_valid, errors), or None on a miss.
+        """
+        value = self.get_value(key)
+        if value is None:
+            return None
+        return value["valid"], list(value["errors"])
+
+    def put(self, key: str, is_valid: bool, errors: List[str]) -> None:
+        """
+        Store a scan result.
+
+        Args:
+            key: Cache key from make_key.
+            is_valid: Whether the scan passed.
+            errors: Findings reported by the scan, already redacted by
+                the validators.
+
+        Returns:
+            None
+        """
+        self.put_value(key, {"valid": is_valid, "errors": list(errors)})
@@ -1,10 +1,42 @@
-from typing import List, Tuple
+import hashlib
+import json
+import os
+from bisect import bisect_right
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from core.diff_parser import DiffParser
+from core.timings import Timings, timed
+from services.scan_cache import ScanCache
 from validators.base import CommitValidator
 
+# Chain held by each scan worker process, set once by the pool initializer
+_worker_chain: Optional['ValidationChain'] = None
+
+
+def _init_worker(chain: 'ValidationChain') -> None:
+    global _worker_chain
+    _worker_chain = chain
+
+
+def _validate_in_worker(diff_content: str, file_path: str) -> Tuple[Tuple[bool, List[str]], List[Dict[str, Any]]]:
+    # Timing events go back with the result; the parent merges them
+    if _worker_chain.timings is not None:
+        _worker_chain.timings = Timings()
+    result = _worker_chain.validate_diff(diff_content, file_path)
+    return result, _worker_chain.timings.events if _worker_chain.timings is not None else []
+
+
 class ValidationChain:
 
-    def __init__(self):
+    def __init__(
+        self,
+        added_lines_only: bool = False,
+        scan_cache: Optional[ScanCache] = None,
+        timings: Optional[Timings] = None
+    ):
         self.validators: List[CommitValidator] = []
+        self.added_lines_only = added_lines_only
+        self.scan_cache = scan_cache
+        self.timings = timings
     
     def add_validator(self, validator: CommitValidator) -> 'ValidationChain':
         """
@@ -31,27 +63,317 @@ class ValidationChain:
         """
         errors = []
         for validator in self.validators:
-            is_valid, reason = validator.validate(message)
+            with timed(self.timings, f"validate_message:{type(validator).__name__}"):
+                is_valid, reason = validator.validate(message)
             if not is_valid and reason:
                 errors.append(reason)
         
         return len(errors) == 0, errors
 
-    def validate_diff(self, diff_content: str) -> Tuple[bool, List[str]]:
+    def validate_diff(self, diff_content: str, file_path: Optional[str] = None) -> Tuple[bool, List[str]]:
         """
         Validate diff content (security checks only).
 
         Args:
             diff: The commit diff to validate.
+            file_path: Path of the file the diff belongs to, for finding locations.
 
         Returns:
             A tuple (is_valid, reason_if_invalid).
         """
+        if self.added_lines_only:
+            return self._validate_added_lines(diff_content, file_path)
+
         errors = []
         for validator in self.validators:
             # Only run security validators on diff
             if hasattr(validator, 'PATTERNS'):
-                is_valid, reason = validator.validate(diff_content)
+                with timed(self.timings, f"validate:{type(validator).__name__}", file=file_path, bytes=self._size(diff_content)):
+                    is_valid, reason = validator.validate(diff_content)
                 if not is_valid and reason:
                     errors.append(reason)
         return len(errors) == 0, errors
+
+    def _validate_added_lines(self, diff_content: str, file_path: Optional[str]) -> Tuple[bool, List[str]]:
+        """
+        Run security checks on the lines a diff adds, reporting where each finding is.
+
+        Args:
+            diff_content: The commit diff to validate.
+            file_path: Path of the file the diff belongs to.
+
+        Returns:
+            A tuple (is_valid, reason_if_invalid).
+        """
+        with timed(self.timings, "parse_added_lines", file=file_path, bytes=self._size(diff_content)):
+            runs = DiffParser.added_runs(diff_content)
+        if not runs:
+            return True, []
+
+        # Each run of adjacent added lines is scanned as one text, so a
+        # pattern can span its lines but never lines the diff keeps apart;
+        # offsets are mapped back to lines
+        texts = []
+        for run in runs:
+            starts = []
+            offset = 0
+            for _, line in run:
+                starts.append(offset)
+                offset += len(line) + 1
+            texts.append((run, starts, '\n'.join(line for _, line in run)))
+        size = sum(self._size(text) for _, _, text in texts) if self.timings is not None else None
+
+        errors = []
+        for validator in self.validators:
+            if not hasattr(validator, 'PATTERNS'):
+                continue
+
+            detected = []
+            with timed(self.timings, f"validate:{type(validator).__name__}", file=file_path, bytes=size):
+                for run, starts, text in texts:
+                    for finding_type, match, position in validator.scan(text):
+                        line_number = run[bisect_right(starts, position) - 1][0]
+                        location = f"{file_path}:{line_number}" if file_path else f"line {line_number}"
+                        detected.append(f"{finding_type}: {validator.redact(match)} ({location})")
+
+            if detected:
+                findings_list = "\n  ".join(detected)
+                errors.append(f"🔒 BLOCKED:\n  {findings_list}")
+
+        return len(errors) == 0, errors
+
+    def scan_text(self, text: str) -> List[Tuple[str, int]]:
+        """
+        Run the security checks on whole file content.
+
+        Args:
+            text: The content to scan.
+
+        Returns:
+            (type, line number) of each finding; the matched text is left
+            out so that callers cannot store it by accident.
+        """
+        detected = []
+        for validator in self.validators:
+            if not hasattr(validator, 'PATTERNS'):
+                continue
+            for finding_type, _, position in validator.scan(text):
+                detected.append((finding_type, text.count('\n', 0, position) + 1))
+        return detected
+
+    def _size(self, text: str) -> Optional[int]:
+        """
+        Measure a text in UTF-8 bytes for timing records.
+
+        Args:
+            text: The text to measure.
+
+        Returns:
+            Its size in bytes, or None when timings are off.
+        """
+        return len(text.encode('utf-8')) if self.timings is not None else None
+
+    def fingerprint(self) -> str:
+        """
+        Hash the configuration that decides diff scan results.
+
+        Args:
+            None
+
+        Returns:
+            Hex digest that changes whenever patterns or scan settings do.
+        """
+        security = [
+            [
+                type(validator).__name__,
+                validator.PATTERNS,
+                getattr(validator, 'ANCHORS', {}),
+                getattr(validator, 'FLAGS', 0),
+                getattr(validator, 'thresholds', None),
+                getattr(validator, 'min_length', None),
+            ]
+            for validator in self.validators
+            if hasattr(validator, 'PATTERNS')
+        ]
+        material = json.dumps([self.added_lines_only, security], sort_keys=True)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def validate_diffs(
+        self,
+        file_diffs: Iterable[Dict[str, str]],
+        workers: int = 1,
+        parallel_threshold: int = 0,
+        on_passed: Optional[Callable[[Dict[str, str]], None]] = None
+    ) -> Tuple[bool, List[str]]:
+        """
+        Validate the diffs of many files as they arrive.
+
+        Files are scanned serially until parallel_threshold characters have
+        been seen; later files fan out to a process pool. Input stops being
+        consumed at the first blocked file.
+
+        Args:
+            file_diffs: Iterable of dicts with 'file' and 'diff' keys, and
+                optionally 'base_blob'/'blob' IDs for the scan cache.
+            workers: Number of worker processes (0 for one per CPU).
+            parallel_threshold: Diff size in characters scanned serially
+                before the pool is used.
+            on_passed: Called in this thread with each file that passes,
+                as soon as its scan finishes.
+
+        Returns:
+            A tuple (is_valid, reason_if_invalid) for the first blocked file
+            in order, the same whatever the worker count.
+        """
+        workers = workers or os.cpu_count() or 1
+        fingerprint = self.fingerprint() if self.scan_cache is not None else None
+
+        results: Dict[int, Tuple[bool, List[str]]] = {}
+        keys: Dict[int, str] = {}
+        pool: Optional[_ScanPool] = None
+        serial_size = 0
+
+        def record(index: int, item: Dict[str, str], result: Tuple[bool, List[str]]) -> None:
+            results[index] = result
+            if result[0] and on_passed is not None:
+                on_passed(item)
+
+        try:
+            for index, item in enumerate(file_diffs):
+                key = ScanCache.make_key(fingerprint, item) if fingerprint else None
+                cached = self.scan_cache.get(key) if key else None
+                if key:
+                    keys[index] = key
+
+                if cached is not None:
+                    record(index, item, cached)
+                elif pool is None and (workers <= 1 or serial_size + len(item["diff"]) < parallel_threshold):
+                    serial_size += len(item["diff"])
+                    record(index, item, self.validate_diff(item["diff"], item["file"]))
+                else:
+                    if pool is None:
+                        pool = _ScanPool(self, workers)
+                    pool.submit(index, item)
+
+                if pool is not None:
+                    for done_index, done_item, result in pool.harvest():
+                        record(done_index, done_item, result)
+
+                # Files after a blocked one cannot change the outcome
+                blocked = [done for done, (is_valid, _) in results.items() if not is_valid]
+                if blocked:
+                    if pool is not None:
+                        pool.cancel_after(min(blocked))
+                    break
+
+            if pool is not None:
+                for done_index, done_item, result in pool.harvest(wait=True):
+                    record(done_index, done_item, result)
+        finally:
+            if pool is not None:
+                pool.close()
+
+        if self.scan_cache is not None:
+            for index, (is_valid, errors) in results.items():
+                if index in keys:
+                    self.scan_cache.put(keys[index], is_valid, errors)
+            self.scan_cache.save()
+
+        for index in sorted(results):
+            is_valid, errors = results[index]
+            if not is_valid:
+                return False, errors
+        return True, []
+
+
+class _ScanPool:
+
+    def __init__(self, chain: ValidationChain, workers: int):
+        """
+        Start worker processes for diff scanning.
+
+        Args:
+            chain: Chain each worker validates with.
+            workers: Number of worker processes.
+        """
+        # Imported here so runs that never fan out skip loading multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(chain,))
+        self.timings = chain.timings
+        self.pending: Dict[int, Tuple[Any, Dict[str, str]]] = {}
+        self.blocked_index: Optional[int] = None
+
+    def submit(self, index: int, item: Dict[str, str]) -> None:
+        """
+        Queue one file for scanning.
+
+        Args:
+            index: Position of the file in the change set.
+            item: Dict with 'file' and 'diff' keys.
+
+        Returns:
+            None
+        """
+        future = self.executor.submit(_validate_in_worker, item["diff"], item["file"])
+        self.pending[index] = (future, item)
+
+    def harvest(self, wait: bool = False) -> Iterator[Tuple[int, Dict[str, str], Tuple[bool, List[str]]]]:
+        """
+        Collect finished scans, cancelling files after any blocked one.
+
+        Args:
+            wait: Block until every outstanding scan has finished.
+
+        Returns:
+            Iterator of (index, item, (is_valid, reason_if_invalid)).
+        """
+        from concurrent.futures import as_completed
+
+        futures = {future: index for index, (future, _) in self.pending.items()}
+        finished = as_completed(futures) if wait else [future for future in futures if future.done()]
+
+        for future in finished:
+            index = futures[future]
+            _, item = self.pending.pop(index)
+            if future.cancelled():
+                continue
+
+            result, events = future.result()
+            if self.timings is not None:
+                self.timings.merge(events)
+            if not result[0]:
+                # Earlier files still run so the reported file matches a serial scan
+                self.cancel_after(index)
+            yield index, item, result
+
+    def cancel_after(self, index: int) -> None:
+        """
+        Cancel scans of files after a blocked one.
+
+        Args:
+            index: Position of the blocked file.
+
+        Returns:
+            None
+        """
+        if self.blocked_index is not None and self.blocked_index <= index:
+            return
+        self.blocked_index = index
+        for later, (future, _) in self.pending.items():
+            if later > index:
+                future.cancel()
+
+    def close(self) -> None:
+        """
+        Shut the worker processes down.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        for future, _ in self.pending.values():
+            future.cancel()
+        self.executor.shutdown(wait=True)
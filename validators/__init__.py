@@ -1,11 +1,15 @@
 from validators.base import CommitValidator
+from validators.scanner import PatternScanner
 from validators.api_key_validator import APIKeyValidator, SensitiveDataValidator
+from validators.entropy_validator import EntropyValidator
 from validators.format_validator import ConventionalCommitValidator, LengthValidator, ContentValidator
 
 __all__ = [
     'CommitValidator',
+    'PatternScanner',
     'APIKeyValidator',
     'SensitiveDataValidator',
+    'EntropyValidator',
     'ConventionalCommitValidator',
     'LengthValidator',
     'ContentValidator',
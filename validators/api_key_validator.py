@@ -1,6 +1,7 @@
 import re
-from typing import Tuple
+from typing import List, Tuple
 from validators.base import CommitValidator
+from validators.scanner import PatternScanner
 
 class APIKeyValidator(CommitValidator):
 
@@ -26,6 +27,42 @@ class APIKeyValidator(CommitValidator):
         'Heroku API Key': r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}',
     } 
 
+    # Literal every match of a pattern starts with (after an optional quote);
+    # patterns without one are scanned in full
+    ANCHORS = {
+        'AWS Access Key': 'AKIA',
+        'AWS Secret Key': 'aws',
+        'GitHub Token': 'ghp_',
+        'GitHub OAuth': 'gho_',
+        'Google API Key': 'AIza',
+        'Google OAuth': 'ya29.',
+        'Slack Token': 'xox',
+        'Slack Webhook': 'https://hooks.slack.com/services/',
+        'Private Key': '-----BEGIN ',
+        'Generic API Key': 'api',
+        'Generic Secret': 'secret',
+        'JWT Token': 'eyJ',
+        'Password in Code': 'password',
+        'Stripe API Key': 'sk_live_',
+        'Twilio API Key': 'SK',
+        'Square Access Token': 'sq0atp-',
+        'PayPal/Braintree': 'access_token$production$',
+    }
+
+    FLAGS = re.IGNORECASE | re.MULTILINE
+
+    def scan(self, content: str) -> List[Tuple[str, str, int]]:
+        """
+        Find API keys and secrets in the content.
+
+        Args:
+            content: The content to scan.
+
+        Returns:
+            List of (key_type, matched_text, offset).
+        """
+        return PatternScanner.get(self.PATTERNS, self.FLAGS, self.ANCHORS).scan(content)
+
     def validate(self, content: str) -> Tuple[bool, str]:
         """
         Check for API keys and secrets in the content.
@@ -38,10 +75,8 @@ class APIKeyValidator(CommitValidator):
         """
         detected = []
     
-        for key_type, pattern in self.PATTERNS.items():
-            matches = re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE)
-            for match in matches:
-                detected.append(f"{key_type}: {match.group()}")
+        for key_type, match, _ in self.scan(content):
+            detected.append(f"{key_type}: {self.redact(match)}")
         
         if detected:
             keys_list = "\n  ".join(detected)
@@ -57,6 +92,22 @@ class SensitiveDataValidator(CommitValidator):
         'SSN': r'\b\d{3}-\d{2}-\d{4}\b',
     }
 
+    ANCHORS = {}
+
+    FLAGS = 0
+
+    def scan(self, content: str) -> List[Tuple[str, str, int]]:
+        """
+        Find sensitive data in the content.
+
+        Args:
+            content: The content to scan.
+
+        Returns:
+            List of (data_type, matched_text, offset).
+        """
+        return PatternScanner.get(self.PATTERNS, self.FLAGS, self.ANCHORS).scan(content)
+
     def validate(self, content: str) -> Tuple[bool, str]:
         """
         Check for sensitive data like credit cards and SSNs in the content.
@@ -69,10 +120,8 @@ class SensitiveDataValidator(CommitValidator):
         """
         detected = []
     
-        for data_type, pattern in self.PATTERNS.items():
-            matches = re.finditer(pattern, content)
-            for match in matches:
-                detected.append(f"{data_type}: {match.group()}")
+        for data_type, match, _ in self.scan(content):
+            detected.append(f"{data_type}: {self.redact(match)}")
         
         if detected:
             data_list = "\n  ".join(detected)
@@ -15,4 +15,18 @@ class CommitValidator(ABC):
         Returns:
             (is_valid, reason_if_invalid)
         """
-        pass
\ No newline at end of file
+        pass
+
+    @staticmethod
+    def redact(match: str) -> str:
+        """
+        Mask a matched secret before it is shown or stored anywhere.
+
+        Args:
+            match: The matched text.
+
+        Returns:
+            Its first few characters (at most a quarter of it, enough for a
+            prefix such as 'ghp_') followed by '…' and its length.
+        """
+        return f"{match[:min(4, len(match) // 4)]}…[{len(match)} chars]"
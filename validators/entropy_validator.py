@@ -0,0 +1,199 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from validators.base import CommitValidator
+
+
+class EntropyValidator(CommitValidator):
+
+    # Characters of base64 (standard and URL-safe) and hex tokens
+    TOKEN_CHARACTERS = r'[A-Za-z0-9+/_\-]'
+
+    # Runs of those characters long enough to be a credential (the length
+    # follows min_length)
+    PATTERNS = {
+        'High-Entropy String': TOKEN_CHARACTERS + r'{20,}={0,2}',
+    }
+
+    ANCHORS = {}
+
+    FLAGS = 0
+
+    # Bits per character above which a token counts as random, by character
+    # set (hex tops out at 4 bits, base64 at 6)
+    DEFAULT_THRESHOLDS = {
+        'hex': 3.0,
+        'base64': 4.5,
+    }
+
+    # Text just before a token that marks it as a content digest, not a secret
+    DIGEST_MARKERS = (
+        'sha1', 'sha256', 'sha384', 'sha512', 'md5', 'integrity', 'digest', 'checksum', 'hash', 'commit', 'h1:', '@',
+    )
+
+    # Hex tokens of these lengths are digests: MD5, SHA-1 and git object IDs
+    # (pinned revisions, lockfile entries), SHA-256 and SHA-512. They are
+    # public, and a line like `expected = "<64 hex>"` has no marker to go by
+    DIGEST_LENGTHS = (32, 40, 64, 128)
+
+    # Token batches at least this large use NumPy, when installed; below it
+    # the import costs more than it saves
+    VECTORIZE_MIN_TOKENS = 512
+
+    DIGIT = re.compile(r'\d')
+    HEX = re.compile(r'[0-9a-fA-F]+')
+
+    def __init__(self, thresholds: Optional[Dict[str, float]] = None, min_length: int = 20):
+        """
+        Initialize EntropyValidator.
+
+        Args:
+            thresholds: Shannon entropy in bits per character above which a
+                token is reported, keyed by 'hex' and 'base64'.
+            min_length: Shortest token considered.
+        """
+        self.thresholds = {**self.DEFAULT_THRESHOLDS, **(thresholds or {})}
+        self.min_length = min_length
+        self.token_regex = re.compile(self.TOKEN_CHARACTERS + '{%d,}={0,2}' % min_length)
+
+    def scan(self, content: str) -> List[Tuple[str, str, int]]:
+        """
+        Find random-looking tokens in the content.
+
+        Args:
+            content: The content to scan.
+
+        Returns:
+            List of (finding_type, token, offset).
+        """
+        tokens = []
+        offsets = []
+        limits = []
+        for match in self.token_regex.finditer(content):
+            token = match.group()
+            charset = self._charset(token)
+            if charset is None:
+                continue
+            start = match.start()
+            context = content[max(start - 16, 0):start].lower()
+            if any(marker in context for marker in self.DIGEST_MARKERS):
+                continue
+            tokens.append(token)
+            offsets.append(start)
+            limits.append(self.thresholds[charset])
+
+        if not tokens:
+            return []
+
+        entropies = self.entropies(tokens)
+        return [
+            ('High-Entropy String', token, offset)
+            for token, offset, limit, entropy in zip(tokens, offsets, limits, entropies)
+            if entropy > limit
+        ]
+
+    def validate(self, content: str) -> Tuple[bool, str]:
+        """
+        Check for random-looking strings such as unprefixed keys and tokens.
+
+        Args:
+            content: The content to validate.
+
+        Returns:
+            (is_valid, reason_if_invalid)
+        """
+        detected = []
+
+        for finding_type, match, _ in self.scan(content):
+            detected.append(f"{finding_type}: {self.redact(match)}")
+
+        if detected:
+            findings_list = "\n  ".join(detected)
+            return False, f"🔒 BLOCKED:\n  {findings_list}"
+
+        return True, ""
+
+    @classmethod
+    def entropies(cls, tokens: List[str]) -> List[float]:
+        """
+        Compute the Shannon entropy of many ASCII tokens.
+
+        Args:
+            tokens: Non-empty ASCII strings.
+
+        Returns:
+            Entropy of each token in bits per character.
+        """
+        if len(tokens) >= cls.VECTORIZE_MIN_TOKENS:
+            try:
+                return cls._entropies_vectorized(tokens)
+            except ImportError:
+                pass
+        return [cls._entropy(token) for token in tokens]
+
+    @staticmethod
+    def _entropy(token: str) -> float:
+        """
+        Compute the Shannon entropy of one token.
+
+        Args:
+            token: A non-empty string.
+
+        Returns:
+            Entropy in bits per character.
+        """
+        length = len(token)
+        return math.log2(length) - sum(count * math.log2(count) for count in Counter(token).values()) / length
+
+    @staticmethod
+    def _entropies_vectorized(tokens: List[str]) -> List[float]:
+        """
+        Compute the Shannon entropy of many ASCII tokens in one pass with NumPy.
+
+        Characters of all tokens are tagged with their token's index and
+        counted together, so the work is a sort and a few reductions however
+        many tokens there are.
+
+        Args:
+            tokens: Non-empty ASCII strings.
+
+        Returns:
+            Entropy of each token in bits per character.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        import numpy as np
+
+        lengths = np.fromiter((len(token) for token in tokens), dtype=np.int64, count=len(tokens))
+        characters = np.frombuffer(''.join(tokens).encode('ascii'), dtype=np.uint8).astype(np.int64)
+        rows = np.repeat(np.arange(len(tokens), dtype=np.int64), lengths)
+
+        # Occurrences of each (token, character) pair
+        pairs, counts = np.unique(rows * 128 + characters, return_counts=True)
+        # H = log2(n) - sum(c * log2(c)) / n for each token
+        weighted = np.bincount(pairs // 128, weights=counts * np.log2(counts), minlength=len(tokens))
+        return (np.log2(lengths) - weighted / lengths).tolist()
+
+    @classmethod
+    def _charset(cls, token: str) -> Optional[str]:
+        """
+        Classify a token by the character set it is drawn from.
+
+        Args:
+            token: A run of base64/hex characters.
+
+        Returns:
+            'hex', 'base64', or None for tokens that look like numbers,
+            words, identifiers (no digits, or a single letter case) or hex
+            digests and git object IDs.
+        """
+        body = token.rstrip('=')
+        if body.isdigit() or not cls.DIGIT.search(body):
+            return None
+        if cls.HEX.fullmatch(body):
+            return 'hex' if len(body) not in cls.DIGEST_LENGTHS else None
+        if body.lower() == body or body.upper() == body:
+            return None
+        return 'base64'
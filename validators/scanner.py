@@ -0,0 +1,160 @@
+import re
+import string
+from typing import Dict, List, Optional, Tuple
+
+
+class PatternScanner:
+
+    # Anchored patterns may start at most this many characters before their
+    # anchor literal (an optional opening quote)
+    ANCHOR_LOOKBEHIND = 1
+
+    # Non-ASCII characters that IGNORECASE matches against ASCII letters
+    CASE_FOLDS = {'\u0130': 'i', '\u0131': 'i', '\u017f': 's', '\u212a': 'k'}
+
+    # Length-preserving case folding for text where str.lower() is not
+    FOLD_TABLE = str.maketrans({
+        **{char: char.lower() for char in string.ascii_uppercase},
+        **CASE_FOLDS,
+    })
+
+    # Compiled scanners, keyed by pattern set, flags and anchors
+    _cache: Dict[tuple, 'PatternScanner'] = {}
+
+    def __init__(self, patterns: Dict[str, str], flags: int = 0, anchors: Optional[Dict[str, str]] = None):
+        """
+        Compile a set of named patterns for repeated scanning.
+
+        Args:
+            patterns: Mapping of finding name to regex.
+            flags: Regex flags shared by every pattern.
+            anchors: Mapping of finding name to a literal every match contains
+                within ANCHOR_LOOKBEHIND characters of its start.
+        """
+        anchors = anchors or {}
+        self.ignore_case = bool(flags & re.IGNORECASE)
+        self.names = list(patterns)
+        self.regexes: Dict[str, re.Pattern] = {
+            name: re.compile(pattern, flags) for name, pattern in patterns.items()
+        }
+        self.anchors: Dict[str, str] = {
+            name: anchors[name].lower() if self.ignore_case else anchors[name]
+            for name in self.names if name in anchors
+        }
+
+    @classmethod
+    def get(cls, patterns: Dict[str, str], flags: int = 0, anchors: Optional[Dict[str, str]] = None) -> 'PatternScanner':
+        """
+        Get a compiled scanner, compiling it only the first time it is used.
+
+        Args:
+            patterns: Mapping of finding name to regex.
+            flags: Regex flags shared by every pattern.
+            anchors: Mapping of finding name to its anchor literal.
+
+        Returns:
+            A PatternScanner for the given patterns.
+        """
+        key = (tuple(patterns.items()), flags, tuple(sorted((anchors or {}).items())))
+        scanner = cls._cache.get(key)
+        if scanner is None:
+            scanner = cls._cache[key] = cls(patterns, flags, anchors)
+        return scanner
+
+    def scan(self, content: str) -> List[Tuple[str, str, int]]:
+        """
+        Find every pattern match in the content.
+
+        Args:
+            content: The text to scan.
+
+        Returns:
+            List of (name, matched_text, offset), grouped by pattern in
+            declaration order, then by position - the same as one finditer
+            per pattern.
+        """
+        hits = self._find_anchors(content)
+        found = []
+
+        for name in self.names:
+            regex = self.regexes[name]
+            if name in self.anchors:
+                matches = self._match_at(regex, content, hits[name])
+            else:
+                matches = regex.finditer(content)
+            for match in matches:
+                found.append((name, match.group(), match.start()))
+
+        return found
+
+    def _find_anchors(self, content: str) -> Dict[str, List[int]]:
+        """
+        Locate anchor literals with plain substring search.
+
+        Args:
+            content: The text to scan.
+
+        Returns:
+            Mapping of anchored pattern name to sorted anchor positions.
+        """
+        haystack = self._fold_case(content) if self.ignore_case else content
+        found: Dict[str, List[int]] = {}
+        hits: Dict[str, List[int]] = {}
+
+        for name, literal in self.anchors.items():
+            if literal not in found:
+                positions = []
+                position = haystack.find(literal)
+                while position != -1:
+                    positions.append(position)
+                    # Resume one character later so overlapping anchors are not missed
+                    position = haystack.find(literal, position + 1)
+                found[literal] = positions
+            hits[name] = found[literal]
+
+        return hits
+
+    def _fold_case(self, content: str) -> str:
+        """
+        Lowercase text without shifting positions, matching IGNORECASE for ASCII literals.
+
+        Args:
+            content: The text to fold.
+
+        Returns:
+            Folded text of the same length as the content.
+        """
+        folded = content.lower()
+        if content.isascii():
+            return folded
+        if len(folded) != len(content):
+            return content.translate(self.FOLD_TABLE)
+        for char, ascii_char in self.CASE_FOLDS.items():
+            if char in folded:
+                folded = folded.replace(char, ascii_char)
+        return folded
+
+    def _match_at(self, regex: re.Pattern, content: str, positions: List[int]) -> List:
+        """
+        Match a pattern only around its anchor positions.
+
+        Args:
+            regex: The compiled pattern.
+            content: The text to scan.
+            positions: Sorted anchor positions for this pattern.
+
+        Returns:
+            Non-overlapping matches, as finditer would report them.
+        """
+        matches = []
+        last_end = 0
+
+        for position in positions:
+            for start in range(max(position - self.ANCHOR_LOOKBEHIND, last_end), position + 1):
+                match = regex.match(content, start)
+                if match:
+                    matches.append(match)
+                    last_end = max(match.end(), start + 1)
+                    break
+
+        return matches